@@ -1,19 +1,35 @@
 """Advanced Notion Kanban Board - Production Quality."""
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
-from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey, DateTime
+from pydantic import BaseModel, Field
+from typing import Optional, List, Union
+from sqlalchemy import (
+    create_engine, event, inspect, text, Column, Integer, String, Text, ForeignKey, DateTime, Index, JSON, DDL,
+    delete, func, insert, select, update,
+)
+from sqlalchemy.sql import column as sql_column, table as sql_table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from contextlib import contextmanager
+import argparse
+import html
+import os
+
+from app import changes, metrics, moves, profiling, queries, ranking, seed, slow_queries, snapshot
+from app.cache import BoardCache
+from app.responses import FastJSONResponse, dumps, json_body_response, stream_response
+from app.events import EventBroadcaster
+from app.sqlite_profile import apply_sqlite_profile
 
 # Database setup
 Base = declarative_base()
-DATABASE_URL = "sqlite:///./kanban.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./kanban.db")
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+apply_sqlite_profile(engine)
+metrics.instrument_engine(engine)
+slow_queries.install(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -23,9 +39,12 @@ class BoardColumn(Base):
     title = Column(String(255), nullable=False)
     position = Column(Integer, nullable=False)
     color = Column(String(7), default="#e9e9e7")
+    card_count = Column(Integer, nullable=False, default=0, server_default="0")  # Kept in sync by card writes
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    cards = relationship("Card", back_populates="column", cascade="all, delete-orphan", order_by="Card.position")
+    cards = relationship(
+        "Card", back_populates="column", cascade="all, delete-orphan", passive_deletes=True, order_by="Card.position"
+    )
 
 
 class Card(Base):
@@ -33,16 +52,82 @@ class Card(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    column_id = Column(Integer, ForeignKey("columns.id"), nullable=False)
+    column_id = Column(Integer, ForeignKey("columns.id", ondelete="CASCADE"), nullable=False)
     position = Column(Integer, nullable=False)
+    rank = Column(String(64), nullable=True)  # Sort key in rank ordering mode
     color = Column(String(7), default="#ffffff")
-    tags = Column(String(500), nullable=True)  # Comma-separated tags
+    tags = Column(String(500), nullable=True)  # Legacy comma-separated tags, see migrate_legacy_tags
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     column = relationship("BoardColumn", back_populates="cards")
+    __table_args__ = (
+        Index("ix_cards_column_id_position", "column_id", "position"),
+        Index("ix_cards_column_id_rank", "column_id", "rank"),
+    )
+
+
+class Change(Base):
+    __tablename__ = "changes"
+    version = Column(Integer, primary_key=True)  # Board version
+    entity = Column(String(16), nullable=False)  # "card" or "column"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(16), nullable=False)  # create, update, move or delete
+    data = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+
+class BoardStat(Base):
+    __tablename__ = "board_stats"
+    id = Column(Integer, primary_key=True)  # Single row, see STATS_ROW
+    total_columns = Column(Integer, nullable=False, default=0)
+    total_cards = Column(Integer, nullable=False, default=0)
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
+    card_count = Column(Integer, nullable=False, default=0)  # Kept in sync by set_card_tags
+
+
+class CardTag(Base):
+    __tablename__ = "card_tags"
+    card_id = Column(Integer, ForeignKey("cards.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True)
+    __table_args__ = (Index("ix_card_tags_tag_id_card_id", "tag_id", "card_id"),)
+
+
+# Full-text index over card titles, descriptions and tags; rowid is the card id
+event.listen(Base.metadata, "after_create", DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5("
+    "title, description, tags, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+))
+event.listen(Base.metadata, "before_drop", DDL("DROP TABLE IF EXISTS cards_fts"))
+
+
+def upgrade_schema(bind):
+    """Add the columns and indexes newer code needs to tables of an older database.
+
+    ``create_all`` creates missing tables but never alters existing ones.
+    """
+    inspector = inspect(bind)
+    existing = {table: {c["name"] for c in inspector.get_columns(table)} for table in ("columns", "cards")}
+    with bind.begin() as connection:
+        if "rank" not in existing["cards"]:
+            connection.exec_driver_sql("ALTER TABLE cards ADD COLUMN rank VARCHAR(64)")
+        if "card_count" not in existing["columns"]:
+            connection.exec_driver_sql("ALTER TABLE columns ADD COLUMN card_count INTEGER NOT NULL DEFAULT 0")
+            # Backfill the counter that writes maintain from now on
+            connection.execute(update(BoardColumn).values(card_count=(
+                select(func.count(Card.id)).where(Card.column_id == BoardColumn.id).scalar_subquery()
+            )))
+        for index in Card.__table__.indexes:
+            index.create(connection, checkfirst=True)
 
 
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 
 
 @contextmanager
@@ -54,6 +139,248 @@ def get_db():
         db.close()
 
 
+# Push committed changes to open boards
+broadcaster = EventBroadcaster()
+changes.on_commit(SessionLocal, broadcaster.publish_changes)
+
+
+# Tags
+def split_tags(tags):
+    """Return the distinct, trimmed tags of a list or comma-separated string."""
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return list(dict.fromkeys(t.strip()[:100] for t in tags or [] if t and t.strip()))
+
+
+def card_tag_names(db, card_ids=None):
+    """Map card ids to their sorted tag names with a single join."""
+    query = db.query(CardTag.card_id, Tag.name).join(Tag, Tag.id == CardTag.tag_id)
+    if card_ids is not None:
+        query = query.filter(CardTag.card_id.in_(card_ids))
+    names = {}
+    for card_id, name in query.order_by(CardTag.card_id, Tag.name):
+        names.setdefault(card_id, []).append(name)
+    return names
+
+
+def tag_ids_for(db, names):
+    """Map tag names to ids, creating the missing tags."""
+    ids = dict(db.query(Tag.name, Tag.id).filter(Tag.name.in_(names)).all())
+    missing = [Tag(name=name, card_count=0) for name in names if name not in ids]
+    if missing:
+        db.add_all(missing)
+        db.flush()
+        ids.update((tag.name, tag.id) for tag in missing)
+    return ids
+
+
+def set_card_tags(db, card_id, tags):
+    """Replace a card's tags, keeping the per-tag card counters in step."""
+    names = split_tags(tags)
+    current = dict(
+        db.query(Tag.name, Tag.id).join(CardTag, CardTag.tag_id == Tag.id).filter(CardTag.card_id == card_id).all()
+    )
+    removed = [tag_id for name, tag_id in current.items() if name not in names]
+    if removed:
+        db.query(CardTag).filter(CardTag.card_id == card_id, CardTag.tag_id.in_(removed)).delete(
+            synchronize_session=False
+        )
+        db.query(Tag).filter(Tag.id.in_(removed)).update(
+            {Tag.card_count: Tag.card_count - 1}, synchronize_session=False
+        )
+    added = tag_ids_for(db, [name for name in names if name not in current])
+    if added:
+        db.add_all(CardTag(card_id=card_id, tag_id=tag_id) for tag_id in added.values())
+        db.query(Tag).filter(Tag.id.in_(added.values())).update(
+            {Tag.card_count: Tag.card_count + 1}, synchronize_session=False
+        )
+    return sorted(names)
+
+
+def remove_cards_tags(db, card_ids):
+    """Unlink every tag from the given cards (a list or a subquery)."""
+    removed = db.query(CardTag.tag_id, func.count()).filter(CardTag.card_id.in_(card_ids)).group_by(CardTag.tag_id)
+    for tag_id, count in removed.all():
+        db.query(Tag).filter(Tag.id == tag_id).update(
+            {Tag.card_count: Tag.card_count - count}, synchronize_session=False
+        )
+    db.query(CardTag).filter(CardTag.card_id.in_(card_ids)).delete(synchronize_session=False)
+
+
+def tagged_card_ids(tags, match="all"):
+    """Select the ids of cards having all (or any) of the given tags."""
+    names = split_tags(tags)
+    query = select(CardTag.card_id).join(Tag, Tag.id == CardTag.tag_id).where(Tag.name.in_(names))
+    if match == "all":
+        return query.group_by(CardTag.card_id).having(func.count() == len(names))
+    return query.distinct()
+
+
+def migrate_legacy_tags(db, batch_size=500):
+    """Move comma-separated Card.tags strings into the tags tables."""
+    migrated = 0
+    while True:
+        rows = db.query(Card.id, Card.tags).filter(Card.tags.isnot(None)).limit(batch_size).all()
+        if not rows:
+            return migrated
+        for card_id, tags in rows:
+            set_card_tags(db, card_id, tags)
+        db.query(Card).filter(Card.id.in_([row.id for row in rows])).update(
+            {Card.tags: None}, synchronize_session=False
+        )
+        db.commit()
+        migrated += len(rows)
+
+
+# Full-text search
+cards_fts = sql_table(
+    "cards_fts", sql_column("rowid"), sql_column("title"), sql_column("description"), sql_column("tags")
+)
+SEARCH_WEIGHTS = (10.0, 1.0, 5.0)  # bm25 weights for title, description, tags
+# Control characters snippet() wraps matches in; they become <mark> tags once the text is escaped
+MATCH_START, MATCH_END = "\x02", "\x03"
+
+
+def index_card(db, card, tags):
+    """Write a card's searchable text to the full-text index."""
+    unindex_cards(db, [card.id])
+    db.execute(insert(cards_fts).values(
+        rowid=card.id, title=card.title, description=card.description or "", tags=" ".join(tags)
+    ))
+
+
+def unindex_cards(db, card_ids):
+    """Remove cards (a list or a subquery of ids) from the full-text index."""
+    db.execute(delete(cards_fts).where(cards_fts.c.rowid.in_(card_ids)))
+
+
+def rebuild_search_index(db):
+    """Rebuild the full-text index from the cards and tags tables."""
+    db.execute(text("DELETE FROM cards_fts"))
+    db.execute(text(
+        "INSERT INTO cards_fts (rowid, title, description, tags) "
+        "SELECT c.id, c.title, coalesce(c.description, ''), coalesce(group_concat(t.name, ' '), '') "
+        "FROM cards c LEFT JOIN card_tags ct ON ct.card_id = c.id LEFT JOIN tags t ON t.id = ct.tag_id "
+        "GROUP BY c.id"
+    ))
+
+
+def fts_query(q):
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix."""
+    words = ['"' + word.replace('"', '""') + '"' for word in q.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+def highlight(snippet):
+    """HTML-escape a search snippet and wrap its matches in ``<mark>`` tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+
+# Board statistics, kept up to date by every write
+STATS_ROW = 1
+
+
+def count_stats(db):
+    """Count columns, cards and tags from scratch."""
+    tags = dict(
+        db.query(Tag.name, func.count(CardTag.card_id)).join(CardTag, CardTag.tag_id == Tag.id).group_by(Tag.name).all()
+    )
+    return {
+        "total_columns": db.query(func.count(BoardColumn.id)).scalar(),
+        "total_cards": db.query(func.count(Card.id)).scalar(),
+        "column_counts": dict(db.query(Card.column_id, func.count(Card.id)).group_by(Card.column_id).all()),
+        "tags": tags,
+    }
+
+
+def recompute_stats(db):
+    """Rewrite every stored counter from a full count; returns the counts."""
+    counts = count_stats(db)
+    stats = db.get(BoardStat, STATS_ROW) or BoardStat(id=STATS_ROW)
+    stats.total_columns = counts["total_columns"]
+    stats.total_cards = counts["total_cards"]
+    db.add(stats)
+    column_counts = select(func.count(Card.id)).where(Card.column_id == BoardColumn.id).scalar_subquery()
+    db.query(BoardColumn).update({BoardColumn.card_count: column_counts}, synchronize_session=False)
+    tag_counts = select(func.count(CardTag.card_id)).where(CardTag.tag_id == Tag.id).scalar_subquery()
+    db.query(Tag).update({Tag.card_count: tag_counts}, synchronize_session=False)
+    return counts
+
+
+def verify_stats(db):
+    """Return the stored counters that drifted, as {name: (stored, actual)}."""
+    counts = count_stats(db)
+    stats = db.get(BoardStat, STATS_ROW)
+    stored_columns = dict(db.query(BoardColumn.id, BoardColumn.card_count).all())
+    drift = {}
+    for name in ("total_columns", "total_cards"):
+        stored = getattr(stats, name) if stats else None
+        if stored != counts[name]:
+            drift[name] = (stored, counts[name])
+    for column_id, stored in stored_columns.items():
+        actual = counts["column_counts"].get(column_id, 0)
+        if stored != actual:
+            drift[f"column:{column_id}"] = (stored, actual)
+    stored_tags = dict(db.query(Tag.name, Tag.card_count).filter(Tag.card_count != 0).all())
+    for tag in stored_tags.keys() | counts["tags"].keys():
+        if stored_tags.get(tag, 0) != counts["tags"].get(tag, 0):
+            drift[f"tag:{tag}"] = (stored_tags.get(tag, 0), counts["tags"].get(tag, 0))
+    return drift
+
+
+def update_stats(db, columns=0, cards=0):
+    """Apply a write's effect to the stored totals, in the same transaction.
+
+    Call it after the write itself.  If the statistics were never initialised
+    they are counted once from scratch instead.
+    """
+    updated = db.query(BoardStat).filter(BoardStat.id == STATS_ROW).update(
+        {
+            BoardStat.total_columns: BoardStat.total_columns + columns,
+            BoardStat.total_cards: BoardStat.total_cards + cards,
+        },
+        synchronize_session=False,
+    )
+    if not updated:
+        db.flush()
+        recompute_stats(db)
+
+
+def board_stats(db, columns=None):
+    """Read the maintained statistics: one row plus the columns and tags.
+
+    ``columns`` are the rows of ``load_columns`` when the caller has them.
+    """
+    stats = db.get(BoardStat, STATS_ROW)
+    if stats is None:
+        counts = count_stats(db)
+        totals = (counts["total_columns"], counts["total_cards"])
+        tags = counts["tags"]
+    else:
+        totals = (stats.total_columns, stats.total_cards)
+        tags = dict(db.query(Tag.name, Tag.card_count).filter(Tag.card_count > 0).all())
+    total_columns, total_cards = totals
+    return {
+        "total_columns": total_columns,
+        "total_cards": total_cards,
+        "cards_per_column": total_cards / total_columns if total_columns > 0 else 0,
+        "columns": [
+            {
+                "id": c["id"],
+                "title": c["title"],
+                "card_count": c["card_count"],
+                "share": c["card_count"] / total_cards if total_cards else 0,
+            }
+            for c in (load_columns(db) if columns is None else columns)
+        ],
+        "tags": dict(sorted(tags.items(), key=lambda item: (-item[1], item[0]))),
+    }
+
+
 # Pydantic models
 class ColumnCreate(BaseModel):
     title: str
@@ -69,13 +396,13 @@ class CardCreate(BaseModel):
     title: str
     description: Optional[str] = None
     column_id: int
-    tags: Optional[str] = None
+    tags: Optional[Union[List[str], str]] = None  # List or comma-separated
 
 
 class CardUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    tags: Optional[str] = None
+    tags: Optional[Union[List[str], str]] = None
 
 
 class CardMove(BaseModel):
@@ -83,6 +410,12 @@ class CardMove(BaseModel):
     position: int
 
 
+class CardsMove(BaseModel):
+    card_ids: List[int] = Field(..., min_items=1, max_items=10000)
+    column_id: int
+    position: Optional[int] = None  # None appends the cards to the column
+
+
 # FastAPI app
 app = FastAPI(title="Notion Kanban Board API", version="1.0.0")
 
@@ -93,21 +426,68 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+if profiling.PROFILE_TOKEN:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Request and SQL metrics in the Prometheus text format."""
+    return metrics.metrics_response()
+
+
+@app.on_event("startup")
+async def start_events():
+    await broadcaster.start()
+
+
+@app.on_event("startup")
+def prepare_database():
+    with get_db() as db:
+        migrate_legacy_tags(db)
+        if db.query(func.count(Card.id)).scalar() != db.execute(select(func.count()).select_from(cards_fts)).scalar():
+            rebuild_search_index(db)
+            db.commit()
+
+
+@app.on_event("shutdown")
+async def stop_events():
+    await broadcaster.stop()
 
 
 # Column Endpoints
+def column_dict(c):
+    return {
+        "id": c.id,
+        "title": c.title,
+        "position": c.position,
+        "color": c.color,
+        "card_count": c.card_count,
+        "updated_at": c.updated_at.isoformat() if c.updated_at else None
+    }
+
+
+COLUMN_FIELDS = ("id", "title", "position", "color", "card_count", "updated_at")
+
+
+def load_columns(db):
+    return queries.isoformat_fields(queries.column_rows(db, BoardColumn, COLUMN_FIELDS), ["updated_at"])
+
+
+def adjust_card_count(db, column_id, delta):
+    """Update a column's card counter in the caller's transaction."""
+    db.query(BoardColumn).filter(BoardColumn.id == column_id).update(
+        {BoardColumn.card_count: BoardColumn.card_count + delta}, synchronize_session=False
+    )
+
+
 @app.get("/api/columns")
 def get_columns():
+    # A few rows with their maintained card counters; the cards are not needed
     with get_db() as db:
-        columns = db.query(BoardColumn).order_by(BoardColumn.position).all()
-        return [{
-            "id": c.id,
-            "title": c.title,
-            "position": c.position,
-            "color": c.color,
-            "card_count": len(c.cards),
-            "updated_at": c.updated_at.isoformat() if c.updated_at else None
-        } for c in columns]
+        return FastJSONResponse(load_columns(db))
 
 
 @app.post("/api/columns")
@@ -116,6 +496,9 @@ def create_column(column: ColumnCreate):
         max_position = db.query(BoardColumn).count()
         db_column = BoardColumn(title=column.title, color=column.color, position=max_position)
         db.add(db_column)
+        db.flush()
+        update_stats(db, columns=1)
+        changes.record_change(db, Change, "column", "create", db_column.id, column_dict(db_column))
         db.commit()
         db.refresh(db_column)
         return {
@@ -137,6 +520,9 @@ def update_column(column_id: int, column: ColumnUpdate):
             db_column.title = column.title
         if column.color:
             db_column.color = column.color
+        changes.record_change(
+            db, Change, "column", "update", column_id, {"title": db_column.title, "color": db_column.color}
+        )
         db.commit()
         db.refresh(db_column)
         return {"id": db_column.id, "title": db_column.title, "color": db_column.color}
@@ -148,41 +534,173 @@ def delete_column(column_id: int):
         column = db.query(BoardColumn).filter(BoardColumn.id == column_id).first()
         if not column:
             raise HTTPException(status_code=404, detail="Column not found")
+        column_cards = select(Card.id).where(Card.column_id == column_id)
+        remove_cards_tags(db, column_cards)
+        unindex_cards(db, column_cards)
+        # One statement instead of loading and deleting every card
+        db.execute(delete(Card).where(Card.column_id == column_id), execution_options={"synchronize_session": False})
         db.delete(column)
+        update_stats(db, columns=-1, cards=-column.card_count)
+        changes.record_change(db, Change, "column", "delete", column_id)
         db.commit()
         return {"message": "Column deleted successfully"}
 
 
 # Card Endpoints
-@app.get("/api/cards")
-def get_cards():
+def card_dict(c, position=None, tags=()):
+    return {
+        "id": c.id,
+        "title": c.title,
+        "description": c.description,
+        "column_id": c.column_id,
+        "position": c.position if position is None else position,
+        "color": c.color,
+        "tags": list(tags),
+        "created_at": c.created_at.isoformat() if c.created_at else None,
+        "updated_at": c.updated_at.isoformat() if c.updated_at else None
+    }
+
+
+CARD_FIELDS = ("id", "title", "description", "column_id", "position", "color", "created_at", "updated_at")
+
+
+def load_cards(db, column_ids=None):
+    cards = queries.card_rows(db, Card, CARD_FIELDS, column_ids)
+    return shape_cards(db, cards, all_cards=column_ids is None)
+
+
+def shape_cards(db, cards, all_cards=False, card_ids=None):
+    """Add tags to card rows and format their dates like card_dict.
+
+    ``card_ids``, e.g. the subquery that selected the cards, replaces a list of
+    their ids in the tag lookup.
+    """
+    if card_ids is None and not all_cards:
+        card_ids = [c["id"] for c in cards]
+    tag_names = card_tag_names(db, card_ids)
+    for card in cards:
+        # Same key order as card_dict
+        created_at, updated_at = card.pop("created_at"), card.pop("updated_at")
+        card["tags"] = tag_names.get(card["id"], [])
+        card["created_at"] = created_at.isoformat() if created_at else None
+        card["updated_at"] = updated_at.isoformat() if updated_at else None
+    return cards
+
+
+def serialize_cards(view, column_id=None):
+    result = []
+    for column in sorted(view.by_column) if column_id is None else [column_id]:
+        for index, card in enumerate(view.column_cards(column)):
+            # Ranks only order cards; the position is the index in the column.
+            result.append({**card, "position": index} if ranking.rank_mode() else card)
+    return result
+
+
+def tagged_cards(db, tags, match="all", column_id=None):
+    """Load the cards with all (or any) of the given tags through the tag index."""
+    card_ids = tagged_card_ids(tags, match)
+    statement = queries.card_rows_statement(Card, CARD_FIELDS, None if column_id is None else [column_id])
+    cards = shape_cards(db, queries.fetch_dicts(db, statement.where(Card.id.in_(card_ids)), CARD_FIELDS),
+                        card_ids=card_ids)
+    if ranking.rank_mode():
+        # Ranks only order cards; the position is the index among the results.
+        column_sizes = {}
+        for card in cards:
+            card["position"] = column_sizes.get(card["column_id"], 0)
+            column_sizes[card["column_id"]] = card["position"] + 1
+    return cards
+
+
+# Board cache: reads are served from memory, writes go through on commit
+board_cache = BoardCache(load_columns, load_cards)
+changes.on_commit(SessionLocal, board_cache.apply_changes)
+
+
+def board_view(db):
+    """Return the current board view, reloading from the database on a miss."""
+    snapshot.begin_read_snapshot(db)
+    return board_cache.view(db, changes.current_version(db, Change))
+
+
+def read_board():
     with get_db() as db:
-        cards = db.query(Card).order_by(Card.column_id, Card.position).all()
-        return [{
-            "id": c.id,
-            "title": c.title,
-            "description": c.description,
-            "column_id": c.column_id,
-            "position": c.position,
-            "color": c.color,
-            "tags": c.tags.split(",") if c.tags else [],
-            "created_at": c.created_at.isoformat() if c.created_at else None,
-            "updated_at": c.updated_at.isoformat() if c.updated_at else None
-        } for c in cards]
+        return board_view(db)
+
+
+@app.get("/api/cache")
+def get_cache_stats():
+    """Board cache hit/miss counters."""
+    return board_cache.stats()
+
+
+def stream_cards(column_id=None):
+    """Yield chunks of cards with their tags from one read snapshot."""
+    with get_db() as db:
+        snapshot.begin_read_snapshot(db)
+        for chunk in queries.iter_card_chunks(db, Card, CARD_FIELDS, column_id):
+            yield shape_cards(db, chunk)
+
+
+@app.get("/api/cards")
+def get_cards(
+    tag: Optional[List[str]] = Query(None),
+    match: str = Query("all", regex="^(all|any)$"),
+    column_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=queries.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    per_column: Optional[int] = Query(None, ge=1, le=queries.MAX_PAGE_SIZE),
+    stream: Optional[str] = Query(None, regex="^(json|ndjson)$"),
+):
+    """Get all cards, optionally only those with all (or any) of the given tags.
+    
+    ``limit``/``cursor`` and ``per_column`` page through the cards instead,
+    see ``queries.paged_cards``.  ``stream`` sends them all as a JSON array
+    or NDJSON, a chunk at a time.
+    """
+    if (limit or per_column or stream) and tag:
+        raise HTTPException(status_code=400, detail="Tag filters cannot be combined with paging or streaming")
+    if stream:
+        return stream_response(stream_cards(column_id), stream)
+    if limit or per_column:
+        with get_db() as db:
+            snapshot.begin_read_snapshot(db)
+            try:
+                cards, headers = queries.paged_cards(
+                    db, Card, BoardColumn, limit, cursor, per_column, column_id, CARD_FIELDS
+                )
+            except queries.InvalidCursor as error:
+                raise HTTPException(status_code=400, detail=str(error))
+            return FastJSONResponse(shape_cards(db, cards), headers=headers)
+    if tag:
+        with get_db() as db:
+            return FastJSONResponse(tagged_cards(db, tag, match, column_id))
+    view = read_board()
+    # Encoded once per view and column; a column only serializes its own cards
+    key = f"cards_json:{ranking.ORDERING_MODE}:{'' if column_id is None else column_id}"
+    return json_body_response(view.derived(key, lambda: dumps(serialize_cards(view, column_id))))
 
 
 @app.post("/api/cards")
 def create_card(card: CardCreate):
     with get_db() as db:
+        if db.get(BoardColumn, card.column_id) is None:
+            raise HTTPException(status_code=404, detail="Column not found")
         max_position = db.query(Card).filter(Card.column_id == card.column_id).count()
         db_card = Card(
             title=card.title,
             description=card.description,
             column_id=card.column_id,
-            position=max_position,
-            tags=card.tags
+            position=max_position
         )
+        if ranking.rank_mode():
+            db_card.rank = ranking.rank_between(ranking.last_rank(db, Card, card.column_id), None)
         db.add(db_card)
+        adjust_card_count(db, card.column_id, 1)
+        db.flush()
+        tags = set_card_tags(db, db_card.id, card.tags)
+        index_card(db, db_card, tags)
+        update_stats(db, cards=1)
+        changes.record_change(db, Change, "card", "create", db_card.id, card_dict(db_card, tags=tags))
         db.commit()
         db.refresh(db_card)
         return {
@@ -191,7 +709,7 @@ def create_card(card: CardCreate):
             "description": db_card.description,
             "column_id": db_card.column_id,
             "position": db_card.position,
-            "tags": db_card.tags.split(",") if db_card.tags else []
+            "tags": tags
         }
 
 
@@ -206,14 +724,19 @@ def update_card(card_id: int, card: CardUpdate):
         if card.description is not None:
             db_card.description = card.description
         if card.tags is not None:
-            db_card.tags = card.tags
+            tags = set_card_tags(db, card_id, card.tags)
+        else:
+            tags = card_tag_names(db, [card_id]).get(card_id, [])
+        index_card(db, db_card, tags)
+        db.flush()
+        changes.record_change(db, Change, "card", "update", card_id, card_dict(db_card, tags=tags))
         db.commit()
         db.refresh(db_card)
         return {
             "id": db_card.id,
             "title": db_card.title,
             "description": db_card.description,
-            "tags": db_card.tags.split(",") if db_card.tags else []
+            "tags": tags
         }
 
 
@@ -224,58 +747,197 @@ def delete_card(card_id: int):
         if not card:
             raise HTTPException(status_code=404, detail="Card not found")
         db.delete(card)
+        adjust_card_count(db, card.column_id, -1)
+        remove_cards_tags(db, [card_id])
+        unindex_cards(db, [card_id])
+        update_stats(db, cards=-1)
+        changes.record_change(db, Change, "card", "delete", card_id, {"column_id": card.column_id})
         db.commit()
         return {"message": "Card deleted successfully"}
 
 
 @app.patch("/api/cards/{card_id}/move")
-def move_card(card_id: int, move: CardMove):
+def move_card(card_id: int, move: CardMove, background_tasks: BackgroundTasks):
     with get_db() as db:
         card = db.query(Card).filter(Card.id == card_id).first()
         if not card:
             raise HTTPException(status_code=404, detail="Card not found")
+        if move.column_id != card.column_id and db.get(BoardColumn, move.column_id) is None:
+            raise HTTPException(status_code=404, detail="Column not found")
         
         old_column_id = card.column_id
         old_position = card.position
-        
-        # Update card position
+        moved_from = {"from_column_id": old_column_id, "from_position": old_position}
+        tags = card_tag_names(db, [card_id]).get(card_id, [])
+        if old_column_id != move.column_id:
+            adjust_card_count(db, old_column_id, -1)
+            adjust_card_count(db, move.column_id, 1)
+        
+        if ranking.rank_mode():
+            # Only the moved card is written; its rank sits between its new neighbours.
+            card.rank = ranking.rank_for_position(db, Card, move.column_id, move.position, exclude_id=card_id)
+            card.column_id = move.column_id
+            card.position = move.position
+            changes.record_change(db, Change, "card", "move", card_id, {**card_dict(card, tags=tags), **moved_from})
+            db.commit()
+            if ranking.needs_rebalance(card.rank):
+                background_tasks.add_task(ranking.rebalance_column_task, engine, Card, card.column_id)
+                background_tasks.add_task(board_cache.invalidate)
+            return {"id": card.id, "column_id": card.column_id, "position": card.position}
+        
+        # One statement per column shifts the neighbours without loading them;
+        # "evaluate" keeps any already loaded in the session in step
+        if old_column_id != move.column_id:
+            db.execute(
+                update(Card)
+                .where(Card.column_id == old_column_id, Card.position > old_position)
+                .values(position=Card.position - 1),
+                execution_options={"synchronize_session": "evaluate"},
+            )
+        db.execute(
+            update(Card)
+            .where(Card.column_id == move.column_id, Card.position >= move.position, Card.id != card_id)
+            .values(position=Card.position + 1),
+            execution_options={"synchronize_session": "evaluate"},
+        )
         card.column_id = move.column_id
         card.position = move.position
         
-        # Reorder cards in old column
-        if old_column_id != move.column_id:
-            cards_in_old = db.query(Card).filter(
-                Card.column_id == old_column_id,
-                Card.position > old_position
-            ).all()
-            for c in cards_in_old:
-                c.position -= 1
-        
-        # Reorder cards in new column
-        cards_in_new = db.query(Card).filter(
-            Card.column_id == move.column_id,
-            Card.position >= move.position,
-            Card.id != card_id
-        ).all()
-        for c in cards_in_new:
-            c.position += 1
-        
+        changes.record_change(db, Change, "card", "move", card_id, {**card_dict(card, tags=tags), **moved_from})
         db.commit()
         db.refresh(card)
         return {"id": card.id, "column_id": card.column_id, "position": card.position}
 
 
+@app.patch("/api/cards/move")
+def move_cards(move: CardsMove):
+    """Move several cards, in the given order, to a column and position in one commit."""
+    with get_db() as db:
+        if db.get(BoardColumn, move.column_id) is None:
+            raise HTTPException(status_code=404, detail="Column not found")
+        sources = db.execute(
+            select(Card.column_id, func.count()).where(Card.id.in_(move.card_ids)).group_by(Card.column_id)
+        ).all()
+        try:
+            cards = moves.move_cards(
+                db, Card, Change, move.card_ids, move.column_id, move.position,
+                fields=CARD_FIELDS, shape=lambda rows: shape_cards(db, rows),
+            )
+        except moves.CardsNotFound as error:
+            raise HTTPException(status_code=404, detail=str(error))
+        for column_id, count in sources:
+            if column_id != move.column_id:
+                adjust_card_count(db, column_id, -count)
+                adjust_card_count(db, move.column_id, count)
+        db.commit()
+        return FastJSONResponse(cards)
+
+
 @app.get("/api/stats")
 def get_stats():
     """Get board statistics."""
     with get_db() as db:
-        total_columns = db.query(BoardColumn).count()
-        total_cards = db.query(Card).count()
-        return {
-            "total_columns": total_columns,
-            "total_cards": total_cards,
-            "cards_per_column": total_cards / total_columns if total_columns > 0 else 0
-        }
+        return FastJSONResponse(board_stats(db))
+
+
+@app.get("/api/board")
+def get_board(request: Request, per_column: Optional[int] = Query(None, ge=1, le=queries.MAX_PAGE_SIZE)):
+    """Get columns, cards and stats from a single read transaction.
+    
+    With ``per_column`` only the first cards of each column are included;
+    ``cursors`` maps each column with more cards to its next page cursor.
+    """
+    with get_db() as db:
+        if per_column:
+            # Only the first page of each column: read it directly rather
+            # than loading the whole board into the cache
+            snapshot.begin_read_snapshot(db)
+            columns = load_columns(db)
+            cards, cursors = queries.first_cards_per_column(
+                db, Card, [c["id"] for c in columns], per_column, CARD_FIELDS
+            )
+            body = dumps({
+                "version": changes.current_version(db, Change),
+                "columns": columns,
+                "cards": shape_cards(db, cards),
+                "stats": board_stats(db, columns),
+                "cursors": {str(column_id): c for column_id, c in cursors.items() if c},
+            })
+            etag = snapshot.make_etag(body)
+        else:
+            view = board_view(db)
+
+            def encode():
+                columns = load_columns(db)
+                body = dumps({
+                    "version": view.version,
+                    "columns": columns,
+                    "cards": serialize_cards(view),
+                    "stats": board_stats(db, columns),
+                })
+                return body, snapshot.make_etag(body)
+
+            body, etag = view.derived(f"board_json:{ranking.ORDERING_MODE}", encode)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if snapshot.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return json_body_response(body, headers)
+
+
+@app.get("/api/changes")
+def get_changes(since: int = 0, limit: int = Query(changes.MAX_CHANGES, ge=1, le=changes.MAX_CHANGES)):
+    """Get the changes made after board version ``since``, oldest first."""
+    with get_db() as db:
+        return FastJSONResponse(changes.changes_since(db, Change, since, limit))
+
+
+@app.get("/api/events")
+async def stream_events():
+    """Stream committed board changes as server-sent events."""
+    return StreamingResponse(
+        broadcaster.sse_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/search")
+def search_cards(q: str, limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)):
+    """Full-text search over titles, descriptions and tags, best matches first.
+    
+    The snippets are HTML: the card text is escaped and matches are wrapped
+    in ``<mark>`` tags.
+    """
+    match = fts_query(q)
+    if not match:
+        return {"query": q, "results": [], "has_more": False}
+    with get_db() as db:
+        rows = db.execute(text(
+            "SELECT c.id, c.title, c.column_id, c.position, "
+            "snippet(cards_fts, 0, :start, :end, '…', 12) AS title_snippet, "
+            "snippet(cards_fts, 1, :start, :end, '…', 24) AS description_snippet, "
+            "bm25(cards_fts, :w_title, :w_description, :w_tags) AS score "
+            "FROM cards_fts JOIN cards c ON c.id = cards_fts.rowid "
+            "WHERE cards_fts MATCH :match ORDER BY score LIMIT :limit OFFSET :offset"
+        ), {
+            "match": match, "limit": limit + 1, "offset": offset, "start": MATCH_START, "end": MATCH_END,
+            "w_title": SEARCH_WEIGHTS[0], "w_description": SEARCH_WEIGHTS[1], "w_tags": SEARCH_WEIGHTS[2],
+        }).mappings().all()
+        tag_names = card_tag_names(db, [row["id"] for row in rows[:limit]])
+    return {
+        "query": q,
+        "results": [
+            {
+                **row,
+                "title_snippet": highlight(row["title_snippet"]),
+                "description_snippet": highlight(row["description_snippet"]),
+                "score": -row["score"],
+                "tags": tag_names.get(row["id"], []),
+            }
+            for row in rows[:limit]
+        ],
+        "has_more": len(rows) > limit,
+    }
 
 
 # Advanced Frontend HTML
@@ -615,6 +1277,11 @@ async def root():
             margin-top: 20px;
         }
         
+        .load-more {
+            width: 100%;
+            margin-top: 4px;
+        }
+        
         .empty-state {
             text-align: center;
             color: #9b9a97;
@@ -743,17 +1410,28 @@ async def root():
         let cards = [];
         let draggedCard = null;
         
-        // Load data and stats
+        let boardEtag = null;
+        let boardVersion = 0;
+        
+        // Cards are loaded a page per column; nextCursors holds the columns with more
+        const PAGE_SIZE = 50;
+        let nextCursors = {};
+        
+        // Load columns, cards and stats in one consistent snapshot
         async function loadData() {
             try {
-                const [colsRes, cardsRes, statsRes] = await Promise.all([
-                    fetch('/api/columns'),
-                    fetch('/api/cards'),
-                    fetch('/api/stats')
-                ]);
-                columns = await colsRes.json();
-                cards = await cardsRes.json();
-                const stats = await statsRes.json();
+                const res = await fetch(`/api/board?per_column=${PAGE_SIZE}`, {
+                    cache: 'no-store',
+                    headers: boardEtag ? { 'If-None-Match': boardEtag } : {}
+                });
+                if (res.status === 304) return;
+                boardEtag = res.headers.get('ETag');
+                const board = await res.json();
+                boardVersion = board.version;
+                columns = board.columns;
+                cards = board.cards;
+                nextCursors = board.cursors || {};
+                const stats = board.stats;
                 
                 document.getElementById('stats').textContent = 
                     `${stats.total_columns} columns · ${stats.total_cards} cards`;
@@ -764,6 +1442,136 @@ async def root():
             }
         }
         
+        // Fetch the next page of a partially loaded column
+        async function loadMore(columnId) {
+            const cursor = nextCursors[columnId];
+            if (!cursor) return;
+            try {
+                const res = await fetch(
+                    `/api/cards?column_id=${columnId}&limit=${PAGE_SIZE}&cursor=${encodeURIComponent(cursor)}`
+                );
+                if (!res.ok) return loadData();
+                const page = await res.json();
+                const next = res.headers.get('X-Next-Cursor');
+                if (next) nextCursors[columnId] = next;
+                else delete nextCursors[columnId];
+                const known = new Set(cards.map(c => c.id));
+                cards = cards.concat(page.filter(c => !known.has(c.id)));
+                cards.sort((a, b) => a.column_id - b.column_id || a.position - b.position);
+                renderBoard();
+            } catch (error) {
+                console.error('Error loading cards:', error);
+            }
+        }
+        
+        // Whether a card at this position falls inside the loaded part of its column
+        function isLoaded(columnId, position) {
+            return !nextCursors[columnId] ||
+                position < cards.filter(c => c.column_id === columnId).length;
+        }
+        
+        function adjustCardCount(columnId, delta) {
+            const col = columns.find(c => c.id === columnId);
+            if (col) col.card_count += delta;
+        }
+        
+        // Apply only the changes made since the last sync
+        async function syncChanges() {
+            try {
+                const res = await fetch(`/api/changes?since=${boardVersion}`);
+                const feed = await res.json();
+                if (feed.reset) return loadData();
+                applyChanges(feed.changes);
+                if (feed.has_more) return syncChanges();
+            } catch (error) {
+                console.error('Error syncing changes:', error);
+            }
+        }
+        
+        // Apply changes not seen yet; pushes and syncs may overlap
+        function applyChanges(list) {
+            let applied = false;
+            list.forEach(change => {
+                if (change.version <= boardVersion) return;
+                applyChange(change);
+                boardVersion = change.version;
+                applied = true;
+            });
+            if (!applied) return;
+            
+            // Columns may be partially loaded, so count from card_count rather than cards
+            const totalCards = columns.reduce((total, col) => total + col.card_count, 0);
+            document.getElementById('stats').textContent = 
+                `${columns.length} columns · ${totalCards} cards`;
+            renderBoard();
+        }
+        
+        // Server push: apply changes as other users make them
+        function listenForChanges() {
+            const events = new EventSource('/api/events');
+            events.onopen = () => syncChanges();
+            events.onmessage = (message) => {
+                const event = JSON.parse(message.data);
+                if (event.type !== 'changes' || event.changes[0].version > boardVersion + 1) {
+                    // Missed events; fetch everything since our version
+                    syncChanges();
+                } else {
+                    applyChanges(event.changes);
+                }
+            };
+        }
+        
+        function upsert(list, id, data) {
+            const index = list.findIndex(item => item.id === id);
+            if (index === -1) list.push({ id, ...data });
+            else list[index] = { ...list[index], ...data };
+        }
+        
+        // Replay a server-side change on the local copy of the board
+        function applyChange(change) {
+            const data = change.data || {};
+            if (change.entity === 'column') {
+                if (change.op === 'delete') {
+                    columns = columns.filter(c => c.id !== change.id);
+                    cards = cards.filter(c => c.column_id !== change.id);
+                    delete nextCursors[change.id];
+                } else {
+                    upsert(columns, change.id, data);
+                    columns.sort((a, b) => a.position - b.position);
+                }
+                return;
+            }
+            
+            if (change.op === 'delete') {
+                cards = cards.filter(c => c.id !== change.id);
+                adjustCardCount(data.column_id, -1);
+            } else if (change.op === 'update') {
+                // Cards beyond the loaded pages arrive with their page
+                if (cards.some(c => c.id === change.id)) upsert(cards, change.id, data);
+            } else {
+                if (change.op === 'create') {
+                    adjustCardCount(data.column_id, 1);
+                } else {
+                    adjustCardCount(data.from_column_id, -1);
+                    adjustCardCount(data.column_id, 1);
+                    // Shift neighbours exactly like the server did
+                    cards.forEach(c => {
+                        if (c.id === change.id) return;
+                        if (data.from_column_id !== data.column_id &&
+                            c.column_id === data.from_column_id && c.position > data.from_position) {
+                            c.position -= 1;
+                        }
+                        if (c.column_id === data.column_id && c.position >= data.position) {
+                            c.position += 1;
+                        }
+                    });
+                }
+                if (isLoaded(data.column_id, data.position)) upsert(cards, change.id, data);
+                else cards = cards.filter(c => c.id !== change.id);
+            }
+            cards.sort((a, b) => a.column_id - b.column_id || a.position - b.position);
+        }
+        
         // Render board
         function renderBoard() {
             const board = document.getElementById('board');
@@ -790,6 +1598,7 @@ async def root():
                          ondragenter="dragEnter(event)"
                          ondragleave="dragLeave(event)">
                         ${getCardsForColumn(col.id)}
+                        ${nextCursors[col.id] ? `<button class="load-more" onclick="loadMore(${col.id})">Load more</button>` : ''}
                     </div>
                 `;
                 board.appendChild(columnEl);
@@ -866,7 +1675,7 @@ async def root():
             });
             
             draggedCard = null;
-            await loadData();
+            await syncChanges();
         }
         
         // Card modal
@@ -923,7 +1732,7 @@ async def root():
                 }
                 
                 closeCardModal();
-                await loadData();
+                await syncChanges();
             } catch (error) {
                 console.error('Error saving card:', error);
                 alert('Error saving card. Please try again.');
@@ -935,7 +1744,7 @@ async def root():
             
             try {
                 await fetch(`/api/cards/${cardId}`, { method: 'DELETE' });
-                await loadData();
+                await syncChanges();
             } catch (error) {
                 console.error('Error deleting card:', error);
             }
@@ -977,7 +1786,7 @@ async def root():
                 });
                 
                 closeColumnModal();
-                await loadData();
+                await syncChanges();
             } catch (error) {
                 console.error('Error creating column:', error);
                 alert('Error creating column. Please try again.');
@@ -989,7 +1798,7 @@ async def root():
             
             try {
                 await fetch(`/api/columns/${columnId}`, { method: 'DELETE' });
-                await loadData();
+                await syncChanges();
             } catch (error) {
                 console.error('Error deleting column:', error);
             }
@@ -1010,19 +1819,66 @@ async def root():
         });
         
         // Initialize
-        loadData();
-        
-        // Auto-refresh every 30 seconds
-        setInterval(loadData, 30000);
+        loadData().then(listenForChanges);
     </script>
 </body>
 </html>
 """
 
 
+def stats_command(fix):
+    """Report drift between the stored statistics and a full recount."""
+    with get_db() as db:
+        drift = verify_stats(db)
+        for name, (stored, actual) in sorted(drift.items()):
+            print(f"  {name}: stored {stored}, actual {actual}")
+        if not drift:
+            print("✅ Statistics match the data")
+        elif fix:
+            recompute_stats(db)
+            db.commit()
+            print(f"✅ Recomputed statistics ({len(drift)} counters fixed)")
+        else:
+            print(f"⚠️  {len(drift)} counters drifted; run with --fix to recompute")
+        return 1 if drift and not fix else 0
+
+
+def seed_command(**options):
+    """Append a synthetic, tagged board, see ``app.seed``."""
+    with get_db() as db:
+        result = seed.seed_board(db, BoardColumn, Card, Change, tag_model=Tag, card_tag_model=CardTag, **options)
+        recompute_stats(db)
+        rebuild_search_index(db)
+        db.commit()
+    print(f"✅ Seeded {result['cards']} cards in {result['columns']} columns with {result['card_tags']} tags")
+    return 0
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Advanced Notion Kanban Board")
+    commands = parser.add_subparsers(dest="command")
+    stats_parser = commands.add_parser("verify-stats", help="Check maintained statistics for drift")
+    stats_parser.add_argument("--fix", action="store_true", help="Recompute all counters")
+    seed_parser = commands.add_parser("seed", help="Add a synthetic board, the same for the same --seed")
+    seed_parser.add_argument("--columns", type=int, default=5)
+    seed_parser.add_argument("--cards-per-column", type=int, default=1000)
+    seed_parser.add_argument("--description-sizes", type=seed.parse_sizes,
+                             help="size=weight,... in characters (default: 0=20,80=50,400=25,2000=5)")
+    seed_parser.add_argument("--tags", type=int, default=50, help="Tag vocabulary size")
+    seed_parser.add_argument("--tags-per-card", type=int, default=seed.DEFAULT_TAGS_PER_CARD)
+    seed_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    if args.command == "verify-stats":
+        raise SystemExit(stats_command(args.fix))
+    if args.command == "seed":
+        raise SystemExit(seed_command(
+            columns=args.columns, cards_per_column=args.cards_per_column, description_sizes=args.description_sizes,
+            tags=args.tags, tags_per_card=args.tags_per_card, seed=args.seed,
+        ))
+    
     import uvicorn
     print("🚀 Starting Advanced Kanban Board...")
     print("📍 Opening at: http://localhost:3000")
-    print("✨ Features: Tags, Colors, Stats, Keyboard Shortcuts, Auto-refresh")
+    print("✨ Features: Tags, Colors, Stats, Keyboard Shortcuts, Live updates")
     uvicorn.run(app, host="0.0.0.0", port=3000)
\ No newline at end of file
@@ -1,15 +1,29 @@
 """FastAPI backend for Kanban board."""
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from sqlalchemy.orm import Session
 
-from .database import get_db, init_db
-from .models import BoardColumn, Card
+from . import changes, importer, metrics, operations, profiling, purge, queries, ranking
+from .cache import board_cache, cards_json, columns_json
+from .database import ASYNC_DB, AsyncDriverSession, SessionLocal, engine, get_db_session, init_db
+from .events import EventBroadcaster
+from .models import BoardColumn, Card, Change
+from .schemas import (
+    BatchRequest, CardCreate, CardMove, CardResponse, CardsMove, CardUpdate, ColumnCreate, ColumnResponse,
+)
+from .responses import FastJSONResponse, json_body_response, stream_response
+from .snapshot import begin_read_snapshot
 
 app = FastAPI(title="Notion Kanban API", version="1.0.0")
 
+# Column and card endpoints; replaced by app.async_api when ASYNC_DB is set
+router = APIRouter()
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -18,202 +32,249 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+if profiling.PROFILE_TOKEN:
+    app.add_middleware(profiling.ProfilingMiddleware)
 
 
-# Pydantic schemas
-class ColumnCreate(BaseModel):
-    title: str
-    color: Optional[str] = "#e9e9e7"
-
-
-class ColumnResponse(BaseModel):
-    id: int
-    title: str
-    position: int
-    color: str
-    
-    class Config:
-        from_attributes = True
-
-
-class CardCreate(BaseModel):
-    title: str
-    description: Optional[str] = None
-    column_id: int
-    color: Optional[str] = "#ffffff"
-
+# Push committed changes to subscribed clients
+broadcaster = EventBroadcaster()
+changes.on_commit(SessionLocal, broadcaster.publish_changes)
+changes.on_commit(AsyncDriverSession, broadcaster.publish_changes)
 
-class CardUpdate(BaseModel):
-    title: Optional[str] = None
-    description: Optional[str] = None
-    column_id: Optional[int] = None
-    position: Optional[int] = None
-    color: Optional[str] = None
-
-
-class CardMove(BaseModel):
-    column_id: int
-    position: int
-
-
-class CardResponse(BaseModel):
-    id: int
-    title: str
-    description: Optional[str]
-    column_id: int
-    position: int
-    color: str
-    
-    class Config:
-        from_attributes = True
-
-
-# Database dependency
-def get_db_session():
-    with get_db() as db:
-        yield db
+# Keep the board cache in step with committed writes
+changes.on_commit(SessionLocal, board_cache.apply_changes)
+changes.on_commit(AsyncDriverSession, board_cache.apply_changes)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup."""
     init_db()
+    await broadcaster.start()
+    # Finish purges interrupted by a restart
+    asyncio.get_running_loop().run_in_executor(None, purge.purge_deleted_columns, engine)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop pushing events."""
+    await broadcaster.stop()
 
 
 # Column endpoints
-@app.get("/api/columns", response_model=List[ColumnResponse])
+@router.get("/api/columns", response_model=List[ColumnResponse])
 def get_columns(db: Session = Depends(get_db_session)):
     """Get all columns."""
-    columns = db.query(BoardColumn).order_by(BoardColumn.position).all()
-    return columns
+    begin_read_snapshot(db)
+    view = board_cache.view(db, changes.current_version(db, Change))
+    return json_body_response(columns_json(view), {"X-Board-Version": str(view.version)})
 
 
-@app.post("/api/columns", response_model=ColumnResponse)
+@router.post("/api/columns", response_model=ColumnResponse)
 def create_column(column: ColumnCreate, db: Session = Depends(get_db_session)):
     """Create a new column."""
-    max_position = db.query(BoardColumn).count()
-    db_column = BoardColumn(
-        title=column.title,
-        color=column.color,
-        position=max_position
-    )
-    db.add(db_column)
+    db_column = operations.create_column(db, column)
     db.commit()
     db.refresh(db_column)
     return db_column
 
 
-@app.delete("/api/columns/{column_id}")
-def delete_column(column_id: int, db: Session = Depends(get_db_session)):
-    """Delete a column."""
-    column = db.query(BoardColumn).filter(BoardColumn.id == column_id).first()
-    if not column:
-        raise HTTPException(status_code=404, detail="Column not found")
-    
-    db.delete(column)
+@router.delete("/api/columns/{column_id}")
+def delete_column(column_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db_session)):
+    """Delete a column; the cards of a large one are purged in the background."""
+    if operations.delete_column(db, column_id):
+        background_tasks.add_task(purge.purge_deleted_columns, db.get_bind())
     db.commit()
     return {"message": "Column deleted successfully"}
 
 
 # Card endpoints
-@app.get("/api/cards", response_model=List[CardResponse])
-def get_cards(column_id: Optional[int] = None, db: Session = Depends(get_db_session)):
-    """Get all cards, optionally filtered by column."""
-    query = db.query(Card)
-    if column_id:
-        query = query.filter(Card.column_id == column_id)
-    cards = query.order_by(Card.position).all()
-    return cards
-
-
-@app.post("/api/cards", response_model=CardResponse)
+@router.get("/api/cards", response_model=List[CardResponse])
+def get_cards(
+    column_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=queries.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    per_column: Optional[int] = Query(None, ge=1, le=queries.MAX_PAGE_SIZE),
+    stream: Optional[str] = Query(None, regex="^(json|ndjson)$"),
+    db: Session = Depends(get_db_session),
+):
+    """Get all cards, optionally filtered by column.
+    
+    ``limit`` returns one page, ordered by column, position and id; pass the
+    ``X-Next-Cursor`` header back as ``cursor`` for the next one.
+    ``per_column`` returns the first cards of each column for the initial
+    render, see ``queries.paged_cards``.
+    ``stream`` sends every card in column order as a JSON array or NDJSON,
+    fetching and encoding them a chunk at a time.
+    The ``X-Board-Version`` header is the change feed version of the result.
+    """
+    begin_read_snapshot(db)
+    version = changes.current_version(db, Change)
+    if stream:
+        # The session stays open until the response has been sent
+        hidden = queries.deleted_column_ids(db, BoardColumn) if column_id is None else ()
+        chunks = queries.iter_card_chunks(db, Card, column_id=column_id, hidden_column_ids=hidden)
+        return stream_response(chunks, stream, {"X-Board-Version": str(version)})
+    if limit or per_column:
+        try:
+            cards, headers = queries.paged_cards(db, Card, BoardColumn, limit, cursor, per_column, column_id)
+        except queries.InvalidCursor as error:
+            raise HTTPException(status_code=400, detail=str(error))
+        return FastJSONResponse(cards, headers={**headers, "X-Board-Version": str(version)})
+    view = board_cache.view(db, version)
+    return json_body_response(cards_json(view, column_id), {"X-Board-Version": str(view.version)})
+
+
+@router.post("/api/cards", response_model=CardResponse)
 def create_card(card: CardCreate, db: Session = Depends(get_db_session)):
     """Create a new card."""
-    # Get max position in column
-    max_position = db.query(Card).filter(Card.column_id == card.column_id).count()
-    
-    db_card = Card(
-        title=card.title,
-        description=card.description,
-        column_id=card.column_id,
-        position=max_position,
-        color=card.color
-    )
-    db.add(db_card)
+    db_card = operations.create_card(db, card)
     db.commit()
     db.refresh(db_card)
     return db_card
 
 
-@app.put("/api/cards/{card_id}", response_model=CardResponse)
+@router.put("/api/cards/{card_id}", response_model=CardResponse)
 def update_card(card_id: int, card: CardUpdate, db: Session = Depends(get_db_session)):
     """Update a card."""
-    db_card = db.query(Card).filter(Card.id == card_id).first()
-    if not db_card:
-        raise HTTPException(status_code=404, detail="Card not found")
-    
-    if card.title is not None:
-        db_card.title = card.title
-    if card.description is not None:
-        db_card.description = card.description
-    if card.color is not None:
-        db_card.color = card.color
-    
+    db_card = operations.update_card(db, card_id, card)
     db.commit()
     db.refresh(db_card)
     return db_card
 
 
-@app.delete("/api/cards/{card_id}")
+@router.delete("/api/cards/{card_id}")
 def delete_card(card_id: int, db: Session = Depends(get_db_session)):
     """Delete a card."""
-    card = db.query(Card).filter(Card.id == card_id).first()
-    if not card:
-        raise HTTPException(status_code=404, detail="Card not found")
-    
-    db.delete(card)
+    operations.delete_card(db, card_id)
     db.commit()
     return {"message": "Card deleted successfully"}
 
 
-@app.patch("/api/cards/{card_id}/move", response_model=CardResponse)
-def move_card(card_id: int, move: CardMove, db: Session = Depends(get_db_session)):
+@router.patch("/api/cards/{card_id}/move", response_model=CardResponse)
+def move_card(
+    card_id: int,
+    move: CardMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db_session),
+):
     """Move a card to a different column and position."""
-    card = db.query(Card).filter(Card.id == card_id).first()
-    if not card:
-        raise HTTPException(status_code=404, detail="Card not found")
-    
-    old_column_id = card.column_id
-    old_position = card.position
-    
-    # Update card
-    card.column_id = move.column_id
-    card.position = move.position
-    
-    # Reorder cards in old column
-    if old_column_id != move.column_id:
-        cards_in_old_column = db.query(Card).filter(
-            Card.column_id == old_column_id,
-            Card.position > old_position
-        ).all()
-        for c in cards_in_old_column:
-            c.position -= 1
-    
-    # Reorder cards in new column
-    cards_in_new_column = db.query(Card).filter(
-        Card.column_id == move.column_id,
-        Card.position >= move.position,
-        Card.id != card_id
-    ).all()
-    for c in cards_in_new_column:
-        c.position += 1
-    
+    card = operations.move_card(db, card_id, move)
     db.commit()
     db.refresh(card)
+    if ranking.rank_mode() and ranking.needs_rebalance(card.rank):
+        background_tasks.add_task(ranking.rebalance_column_task, db.get_bind(), Card, card.column_id)
+        background_tasks.add_task(board_cache.invalidate)
     return card
 
 
+@router.patch("/api/cards/move", response_model=List[CardResponse])
+def move_cards(move: CardsMove, db: Session = Depends(get_db_session)):
+    """Move several cards, in the given order, to a column and position in one commit.
+    
+    ``position`` counts the target column's cards that are not moved; without
+    it the cards are appended.
+    """
+    cards = operations.move_cards(db, move)
+    db.commit()
+    return FastJSONResponse(cards)
+
+
+@router.post("/api/batch")
+def run_batch(batch: BatchRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db_session)):
+    """Apply create/update/move/delete operations on cards and columns in one commit.
+    
+    The operations run in order; ``"$n"`` as an id, a ``column_id`` or in
+    ``card_ids`` stands for the id operation ``n`` returned.  If one fails,
+    none is applied and the error names its ``index``.
+    """
+    try:
+        results, rebalance = operations.run_batch(db, batch.operations)
+    except operations.BatchOperationFailed as error:
+        db.rollback()
+        raise HTTPException(status_code=error.status_code, detail={"index": error.index, "error": error.message})
+    db.commit()
+    for column_id in sorted(rebalance):
+        background_tasks.add_task(ranking.rebalance_column_task, db.get_bind(), Card, column_id)
+    if rebalance:
+        background_tasks.add_task(board_cache.invalidate)
+    if any(result["entity"] == "column" and result["op"] == "delete" for result in results):
+        background_tasks.add_task(purge.purge_deleted_columns, db.get_bind())
+    return FastJSONResponse({"results": results, "version": changes.current_version(db, Change)})
+
+
+def _import_stream(db: Session, stream, format: str, column_id: Optional[int]) -> dict:
+    result = importer.import_stream(db, Card, BoardColumn, Change, stream, format, column_id)
+    return {**result, "version": changes.current_version(db, Change)}
+
+
+@router.post("/api/import")
+async def import_cards(
+    request: Request,
+    format: Optional[str] = Query(None, regex=f"^({'|'.join(importer.FORMATS)})$"),
+    column_id: Optional[int] = None,
+    db: Session = Depends(get_db_session),
+):
+    """Bulk import cards from the request body.
+    
+    The body is a JSON array, NDJSON, CSV (e.g. a Notion export) or a Trello
+    board export; ``format`` defaults to the one the Content-Type names.
+    Cards without a column go to ``column_id``.
+    """
+    upload = await importer.spool(request.stream())
+    format = format or importer.detect_format(content_type=request.headers.get("content-type"))
+    try:
+        # The version is read in the threadpool too, off the event loop
+        return await run_in_threadpool(_import_stream, db, importer.text_stream(upload), format, column_id)
+    except importer.InvalidImport as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    finally:
+        upload.close()
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Request and SQL metrics in the Prometheus text format."""
+    return metrics.metrics_response()
+
+
+@app.get("/api/cache")
+def get_cache_stats():
+    """Board cache hit/miss counters."""
+    return board_cache.stats()
+
+
+# Change feed
+@app.get("/api/changes")
+def get_changes(
+    since: int = 0,
+    limit: int = Query(changes.MAX_CHANGES, ge=1, le=changes.MAX_CHANGES),
+    db: Session = Depends(get_db_session),
+):
+    """Get the changes made after board version ``since``, oldest first."""
+    return FastJSONResponse(changes.changes_since(db, Change, since, limit))
+
+
+@app.get("/api/events")
+async def stream_events():
+    """Stream committed changes as server-sent events."""
+    return StreamingResponse(
+        broadcaster.sse_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
     return {"message": "Notion Kanban API", "version": "1.0.0"}
+
+
+if ASYNC_DB:
+    from .async_api import router as async_router
+    app.include_router(async_router)
+else:
+    app.include_router(router)
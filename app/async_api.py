@@ -0,0 +1,212 @@
+"""Async column and card endpoints.
+
+Mirrors the sync endpoints in ``app.api`` on an ``AsyncSession``, so a request
+waiting on the database does not hold a threadpool thread.  Enabled with
+``KANBAN_ASYNC_DB=1``.  The writes in ``app.operations`` and the change feed
+and snapshot helpers are shared with the sync endpoints and run through
+``AsyncSession.run_sync``, except the bulk import, which runs for seconds on
+a sync session in the threadpool rather than on the event loop.
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import changes, importer, operations, purge, queries, ranking
+from .cache import board_cache, cards_json, columns_json
+from .database import get_async_db, get_db_session
+from .models import BoardColumn, Card, Change
+from .schemas import (
+    BatchRequest, CardCreate, CardMove, CardResponse, CardsMove, CardUpdate, ColumnCreate, ColumnResponse,
+)
+from .responses import FastJSONResponse, json_body_response, stream_response
+from .snapshot import begin_read_snapshot
+
+router = APIRouter()
+
+
+def _read_board_view(db):
+    begin_read_snapshot(db)
+    return board_cache.view(db, changes.current_version(db, Change))
+
+
+def _read_card_page(db, **page):
+    begin_read_snapshot(db)
+    cards, headers = queries.paged_cards(db, Card, BoardColumn, **page)
+    return cards, {**headers, "X-Board-Version": str(changes.current_version(db, Change))}
+
+
+def _begin_stream(db, column_id: Optional[int]):
+    begin_read_snapshot(db)
+    hidden = queries.deleted_column_ids(db, BoardColumn) if column_id is None else ()
+    return changes.current_version(db, Change), hidden
+
+
+def _import_stream(db, stream, format: str, column_id: Optional[int]) -> dict:
+    result = importer.import_stream(db, Card, BoardColumn, Change, stream, format, column_id)
+    return {**result, "version": changes.current_version(db, Change)}
+
+
+async def _stream_cards(db: AsyncSession, column_id: Optional[int], hidden_column_ids=()):
+    shape = queries.ChunkShaper()
+    statement = queries.streamed_cards_statement(Card, column_id=column_id, hidden_column_ids=hidden_column_ids)
+    result = await db.stream(statement)
+    async for rows in result.partitions():
+        yield shape(rows)
+
+
+async def _board_view(db: AsyncSession):
+    # A cache hit costs a single version lookup
+    return await db.run_sync(_read_board_view)
+
+
+# Column endpoints
+@router.get("/api/columns", response_model=List[ColumnResponse])
+async def get_columns(db: AsyncSession = Depends(get_async_db)):
+    """Get all columns."""
+    view = await _board_view(db)
+    return json_body_response(columns_json(view), {"X-Board-Version": str(view.version)})
+
+
+@router.post("/api/columns", response_model=ColumnResponse)
+async def create_column(column: ColumnCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new column."""
+    db_column = await db.run_sync(operations.create_column, column)
+    await db.commit()
+    return db_column
+
+
+@router.delete("/api/columns/{column_id}")
+async def delete_column(column_id: int, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    """Delete a column; the cards of a large one are purged in the background."""
+    if await db.run_sync(operations.delete_column, column_id):
+        background_tasks.add_task(purge_deleted_columns_task, db.bind)
+    await db.commit()
+    return {"message": "Column deleted successfully"}
+
+
+# Card endpoints
+@router.get("/api/cards", response_model=List[CardResponse])
+async def get_cards(
+    column_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=queries.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    per_column: Optional[int] = Query(None, ge=1, le=queries.MAX_PAGE_SIZE),
+    stream: Optional[str] = Query(None, regex="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all cards, optionally filtered by column, paged or streamed.
+
+    The ``X-Board-Version`` header is the change feed version of the result.
+    """
+    if stream:
+        version, hidden = await db.run_sync(_begin_stream, column_id)
+        return stream_response(_stream_cards(db, column_id, hidden), stream, {"X-Board-Version": str(version)})
+    if limit or per_column:
+        try:
+            cards, headers = await db.run_sync(
+                _read_card_page, limit=limit, cursor=cursor, per_column=per_column, column_id=column_id
+            )
+        except queries.InvalidCursor as error:
+            raise HTTPException(status_code=400, detail=str(error))
+        return FastJSONResponse(cards, headers=headers)
+    view = await _board_view(db)
+    return json_body_response(cards_json(view, column_id), {"X-Board-Version": str(view.version)})
+
+
+@router.post("/api/cards", response_model=CardResponse)
+async def create_card(card: CardCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new card."""
+    db_card = await db.run_sync(operations.create_card, card)
+    await db.commit()
+    return db_card
+
+
+@router.put("/api/cards/{card_id}", response_model=CardResponse)
+async def update_card(card_id: int, card: CardUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update a card."""
+    db_card = await db.run_sync(operations.update_card, card_id, card)
+    await db.commit()
+    return db_card
+
+
+@router.delete("/api/cards/{card_id}")
+async def delete_card(card_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a card."""
+    await db.run_sync(operations.delete_card, card_id)
+    await db.commit()
+    return {"message": "Card deleted successfully"}
+
+
+@router.patch("/api/cards/{card_id}/move", response_model=CardResponse)
+async def move_card(
+    card_id: int,
+    move: CardMove,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Move a card to a different column and position."""
+    card = await db.run_sync(operations.move_card, card_id, move)
+    await db.commit()
+    if ranking.rank_mode() and ranking.needs_rebalance(card.rank):
+        background_tasks.add_task(rebalance_column_task, db.bind, card.column_id)
+    return card
+
+
+@router.patch("/api/cards/move", response_model=List[CardResponse])
+async def move_cards(move: CardsMove, db: AsyncSession = Depends(get_async_db)):
+    """Move several cards, in the given order, to a column and position in one commit."""
+    cards = await db.run_sync(operations.move_cards, move)
+    await db.commit()
+    return FastJSONResponse(cards)
+
+
+@router.post("/api/batch")
+async def run_batch(batch: BatchRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    """Apply create/update/move/delete operations on cards and columns in one commit."""
+    try:
+        results, rebalance = await db.run_sync(operations.run_batch, batch.operations)
+    except operations.BatchOperationFailed as error:
+        await db.rollback()
+        raise HTTPException(status_code=error.status_code, detail={"index": error.index, "error": error.message})
+    await db.commit()
+    for column_id in sorted(rebalance):
+        background_tasks.add_task(rebalance_column_task, db.bind, column_id)
+    if any(result["entity"] == "column" and result["op"] == "delete" for result in results):
+        background_tasks.add_task(purge_deleted_columns_task, db.bind)
+    return FastJSONResponse({"results": results, "version": await db.run_sync(changes.current_version, Change)})
+
+
+@router.post("/api/import")
+async def import_cards(
+    request: Request,
+    format: Optional[str] = Query(None, regex=f"^({'|'.join(importer.FORMATS)})$"),
+    column_id: Optional[int] = None,
+    db: Session = Depends(get_db_session),
+):
+    """Bulk import cards from a JSON, NDJSON, CSV or Trello export body."""
+    upload = await importer.spool(request.stream())
+    format = format or importer.detect_format(content_type=request.headers.get("content-type"))
+    try:
+        return await run_in_threadpool(_import_stream, db, importer.text_stream(upload), format, column_id)
+    except importer.InvalidImport as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    finally:
+        upload.close()
+
+
+async def rebalance_column_task(bind, column_id: int) -> None:
+    """Rebalance a column in its own async session, e.g. from a background task."""
+    async with AsyncSession(bind=bind) as db:
+        await db.run_sync(ranking.rebalance_column, Card, column_id)
+        await db.commit()
+    board_cache.invalidate()
+
+
+async def purge_deleted_columns_task(bind) -> None:
+    """Purge the soft-deleted columns in its own async session, see ``app.purge``."""
+    async with AsyncSession(bind=bind) as db:
+        column_ids = await db.run_sync(queries.deleted_column_ids, BoardColumn)
+        for column_id in column_ids:
+            await db.run_sync(purge.purge_column, column_id)
@@ -0,0 +1,257 @@
+"""In-process, write-through board cache.
+
+The board is read far more often than it changes, so the read endpoints serve
+columns and cards from memory.  The cache is loaded from the database on first
+use and then kept current by the changes this process commits (it is
+registered with ``changes.on_commit``, so a failed commit never reaches it).
+
+Creates, updates and deletes are applied in place.  A move can shift the
+positions of its neighbours, so it only marks the columns it touched stale;
+they are reloaded from the database on the next read.  Every read compares the
+cached version with the change feed, so writes made by another process, or a
+gap in the versions, cause a full reload instead of a stale answer.
+"""
+import os
+import threading
+from bisect import bisect_right
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from . import queries, ranking
+from .models import BoardColumn, Card
+from .responses import dumps
+
+# Set KANBAN_CACHE=0 to read every request from the database.
+CACHE_ENABLED = os.getenv("KANBAN_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+class BoardView:
+    """Immutable copy of the board at one change feed version.
+
+    ``columns`` and ``cards`` map ids to serialized rows; ``by_column`` maps a
+    column id to its card ids in display order.
+    """
+
+    __slots__ = ("version", "columns", "cards", "by_column", "stale", "_derived")
+
+    def __init__(self, version: int, columns: Dict[int, dict], cards: Dict[int, dict],
+                 by_column: Dict[int, tuple], stale: FrozenSet[int] = frozenset()):
+        self.version = version
+        self.columns = columns
+        self.cards = cards
+        self.by_column = by_column
+        self.stale = stale
+        self._derived = {}
+
+    def column_list(self) -> List[dict]:
+        """Return the columns ordered by position."""
+        return sorted(self.columns.values(), key=lambda c: c["position"])
+
+    def column_cards(self, column_id: int) -> List[dict]:
+        """Return the cards of a column in display order."""
+        return [self.cards[card_id] for card_id in self.by_column.get(column_id, ())]
+
+    def derived(self, key: str, compute: Callable[[], object]):
+        """Return ``compute()``, computed once per view."""
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+
+
+def build_view(version: int, columns: Iterable[dict], cards: Iterable[dict]) -> BoardView:
+    """Build a view from columns and cards in display order."""
+    column_map = {c["id"]: c for c in columns}
+    card_map = {}
+    by_column = {column_id: [] for column_id in column_map}
+    for card in cards:
+        if card["column_id"] not in column_map:
+            continue  # Its column was deleted and the card is waiting to be purged
+        card_map[card["id"]] = card
+        by_column.setdefault(card["column_id"], []).append(card["id"])
+    return BoardView(version, column_map, card_map, {k: tuple(v) for k, v in by_column.items()})
+
+
+class BoardCache:
+    """Cache of the whole board, shared by all requests of the process.
+
+    ``load_columns(db)`` returns serialized columns and ``load_cards(db,
+    column_ids=None)`` serialized cards ordered by column and display order.
+    """
+
+    def __init__(self, load_columns: Callable, load_cards: Callable, enabled: bool = CACHE_ENABLED):
+        self.load_columns = load_columns
+        self.load_cards = load_cards
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._view: Optional[BoardView] = None
+        # Bumped by every write to the cache, so a reload racing a commit is not stored.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def view(self, db, version: int) -> BoardView:
+        """Return the board at ``version``, the current version read in ``db``.
+
+        Call it inside a read snapshot so the version and any reload agree.
+        """
+        with self._lock:
+            view, generation = self._view, self._generation
+            hit = self.enabled and view is not None and view.version == version and not view.stale
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            return view
+
+        if view is not None and view.version == version and view.stale:
+            view = self._reload_columns(db, view)
+        else:
+            view = build_view(version, self.load_columns(db), self.load_cards(db))
+
+        with self._lock:
+            if self.enabled and self._generation == generation:
+                self._view = view
+        return view
+
+    def _reload_columns(self, db, view: BoardView) -> BoardView:
+        cards = {card_id: card for card_id, card in view.cards.items() if card["column_id"] not in view.stale}
+        by_column = {column_id: ids for column_id, ids in view.by_column.items() if column_id not in view.stale}
+        for column_id in view.stale:
+            if column_id in view.columns:
+                by_column[column_id] = ()
+        reloaded = {}
+        for card in self.load_cards(db, [column_id for column_id in view.stale if column_id in view.columns]):
+            cards[card["id"]] = card
+            reloaded.setdefault(card["column_id"], []).append(card["id"])
+        by_column.update((column_id, tuple(ids)) for column_id, ids in reloaded.items())
+        return BoardView(view.version, view.columns, cards, by_column)
+
+    def invalidate(self) -> None:
+        """Drop the cached board; the next read reloads it."""
+        with self._lock:
+            self._view = None
+            self._generation += 1
+            self.invalidations += 1
+
+    def apply_changes(self, changes: List[dict]) -> None:
+        """Apply a committed batch of change feed entries (an ``on_commit`` callback)."""
+        with self._lock:
+            self._generation += 1
+            view = self._view
+            if view is None:
+                return
+            try:
+                for change in changes:
+                    if change["version"] <= view.version:
+                        continue
+                    if change["version"] != view.version + 1 or change["entity"] == "board":
+                        # Someone else wrote in between, or a bulk write; reload rather than guess.
+                        view = None
+                        break
+                    view = _apply_change(view, change)
+            except (KeyError, TypeError):
+                view = None
+            if view is None:
+                self.invalidations += 1
+            self._view = view
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters."""
+        with self._lock:
+            view = self._view
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0,
+                "invalidations": self.invalidations,
+                "version": view.version if view else None,
+                "columns": len(view.columns) if view else 0,
+                "cards": len(view.cards) if view else 0,
+            }
+
+
+def _apply_change(view: BoardView, change: dict) -> BoardView:
+    """Return a new view with one change feed entry applied."""
+    entity_id, op = change["id"], change["op"]
+    data = change.get("data") or {}
+    columns, cards, by_column, stale = view.columns, view.cards, view.by_column, view.stale
+
+    if change["entity"] == "column":
+        columns = dict(columns)
+        if op == "delete":
+            columns.pop(entity_id, None)
+            by_column = dict(by_column)
+            removed = set(by_column.pop(entity_id, ()))
+            cards = {card_id: card for card_id, card in cards.items() if card_id not in removed}
+        else:
+            columns[entity_id] = {**columns.get(entity_id, {}), **data}
+            if entity_id not in by_column:
+                by_column = {**by_column, entity_id: ()}
+        return BoardView(change["version"], columns, cards, by_column, stale)
+
+    cards = dict(cards)
+    by_column = dict(by_column)
+    if op == "move":
+        # Neighbours were shifted in the database; reload both columns.
+        stale = stale | {data["from_column_id"], data["column_id"]}
+    elif op == "delete":
+        card = cards.pop(entity_id, None)
+        column_id = card["column_id"] if card else data["column_id"]
+        by_column[column_id] = tuple(i for i in by_column.get(column_id, ()) if i != entity_id)
+    else:
+        card = {**cards.get(entity_id, {}), **data}
+        cards[entity_id] = card
+        if op == "create":
+            by_column[card["column_id"]] = _insert(by_column.get(card["column_id"], ()), cards, card)
+    return BoardView(change["version"], columns, cards, by_column, stale)
+
+
+def _insert(ids: tuple, cards: Dict[int, dict], card: dict) -> tuple:
+    """Return ``ids`` with a new card placed where the database orders it."""
+    if ranking.rank_mode():
+        # New cards are ranked after the last card of the column.
+        return ids + (card["id"],)
+    index = bisect_right([cards[i]["position"] for i in ids], card["position"])
+    return ids[:index] + (card["id"],) + ids[index:]
+
+
+def load_columns(db) -> List[dict]:
+    """Load the columns of the app's board, ordered by position."""
+    return queries.column_rows(db, BoardColumn)
+
+
+def load_cards(db, column_ids: Optional[List[int]] = None) -> List[dict]:
+    """Load the cards of the app's board in display order."""
+    return queries.card_rows(db, Card, column_ids=column_ids)
+
+
+def cached_cards(view, column_id: Optional[int] = None) -> List[dict]:
+    """Return the cards of a cached board view the way ``GET /api/cards`` does."""
+    column_ids = [column_id] if column_id else sorted(view.by_column)
+    if ranking.rank_mode():
+        # Ranks only order cards; the position is the index in the column.
+        return [
+            {**card, "position": index}
+            for column in column_ids
+            for index, card in enumerate(view.column_cards(column))
+        ]
+    cards = [card for column in column_ids for card in view.column_cards(column)]
+    return sorted(cards, key=lambda card: card["position"])
+
+
+def columns_json(view) -> bytes:
+    """Return the encoded ``GET /api/columns`` body, encoded once per view."""
+    return view.derived("columns_json", lambda: dumps(view.column_list()))
+
+
+def cards_json(view, column_id: Optional[int] = None) -> bytes:
+    """Return the encoded ``GET /api/cards`` body, encoded once per view."""
+    key = f"cards_json:{ranking.ORDERING_MODE}:{column_id or ''}"
+    return view.derived(key, lambda: dumps(cached_cards(view, column_id)))
+
+
+# Board cache of the app package's API
+board_cache = BoardCache(load_columns, load_cards)
@@ -0,0 +1,110 @@
+"""Append-only change feed for delta sync.
+
+Every mutation appends a row to the ``changes`` table in the same transaction
+as the mutation itself.  The id of the newest row is the board version, so a
+client that remembers the version it last saw can fetch only what happened
+since then.
+"""
+import weakref
+from typing import Callable, List, Optional
+
+from sqlalchemy import event, func, select
+
+from .snapshot import begin_read_snapshot
+
+# Largest number of changes returned by a single feed request.
+MAX_CHANGES = 1000
+
+# Session.info keys holding the changes of the current transaction.
+PENDING_KEY = "pending_changes"
+FLUSHED_KEY = "flushed_changes"
+
+_commit_callbacks = weakref.WeakKeyDictionary()
+
+
+def record_change(db, model, entity: str, op: str, entity_id: int, data: Optional[dict] = None):
+    """Append a change to the feed; committed together with the mutation."""
+    change = model(entity=entity, op=op, entity_id=entity_id, data=data)
+    db.add(change)
+    db.info.setdefault(PENDING_KEY, []).append(change)
+    return change
+
+
+def change_dict(change) -> dict:
+    """Serialize a change the way the feed returns it."""
+    return {
+        "version": change.version,
+        "entity": change.entity,
+        "op": change.op,
+        "id": change.entity_id,
+        "data": change.data,
+    }
+
+
+def on_commit(session_factory, callback: Callable[[List[dict]], None]) -> None:
+    """Call ``callback`` with the changes of every committed transaction.
+
+    Changes are serialized right after they are flushed, while their versions
+    are known, and handed over only once the commit succeeded.
+    """
+    callbacks = _commit_callbacks.get(session_factory)
+    if callbacks is None:
+        callbacks = _commit_callbacks[session_factory] = []
+        _install_commit_hooks(session_factory, callbacks)
+    callbacks.append(callback)
+
+
+def _install_commit_hooks(session_factory, callbacks: list) -> None:
+    @event.listens_for(session_factory, "after_flush")
+    def _collect(session, flush_context):
+        pending = session.info.pop(PENDING_KEY, None)
+        if pending:
+            session.info.setdefault(FLUSHED_KEY, []).extend(change_dict(c) for c in pending)
+
+    @event.listens_for(session_factory, "after_commit")
+    def _publish(session):
+        flushed = session.info.pop(FLUSHED_KEY, None)
+        if flushed:
+            for callback in callbacks:
+                callback(flushed)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard(session):
+        session.info.pop(PENDING_KEY, None)
+        session.info.pop(FLUSHED_KEY, None)
+
+
+def current_version(db, model) -> int:
+    """Return the version of the newest change, or 0 for an empty feed."""
+    return db.query(func.max(model.version)).scalar() or 0
+
+
+def changes_since(db, model, since: int, limit: int = MAX_CHANGES) -> dict:
+    """Return the changes newer than ``since``, oldest first.
+
+    ``reset`` tells the client its version is unknown to the server (e.g. the
+    database was recreated), or that a bulk write such as an import happened
+    since, and it has to reload the whole board.
+    """
+    limit = max(0, min(limit, MAX_CHANGES))
+    begin_read_snapshot(db)
+    # Plain rows: change_dict only reads the selected attributes
+    rows = db.execute(
+        select(model.version, model.entity, model.op, model.entity_id, model.data)
+        .where(model.version > since)
+        .order_by(model.version)
+        .limit(limit + 1)
+    ).all()
+    changes, has_more = rows[:limit], len(rows) > limit
+    latest = current_version(db, model)
+    if has_more:
+        # Resume from the last change returned, not from the newest one.
+        version = changes[-1].version if changes else since
+    else:
+        version = latest
+    return {
+        "version": version,
+        "reset": since > latest or any(row.entity == "board" for row in changes),
+        "has_more": has_more,
+        "changes": [change_dict(row) for row in changes],
+    }
@@ -2,19 +2,90 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
+from typing import AsyncIterator
 import os
 
-from .models import Base, BoardColumn, Card
+from . import importer, metrics, seed, slow_queries
+from .models import BoardColumn, Card, Change
+from .sqlite_profile import apply_sqlite_profile
 
 # Database setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./kanban.db")
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+apply_sqlite_profile(engine)
+metrics.instrument_engine(engine)
+slow_queries.install(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Serve the column and card endpoints from async handlers on an async driver
+ASYNC_DB = os.getenv("KANBAN_ASYNC_DB", "").lower() in ("1", "true", "yes")
+
+
+class AsyncDriverSession(Session):
+    """Sync session wrapped by every AsyncSession, so session events can target it."""
+
+
+def async_database_url(url: str) -> str:
+    """Return ``url`` with the async driver of its database."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:"):
+        return "postgresql+asyncpg:" + url[len("postgresql:"):]
+    return url
+
+
+def make_async_sessionmaker(url: str, **engine_options):
+    """Create an async engine for ``url`` and return its session factory."""
+    # Imported here so the async driver is only needed when it is used
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_database_url(url), **engine_options)
+    apply_sqlite_profile(async_engine)
+    metrics.instrument_engine(async_engine)
+    slow_queries.install(async_engine)
+    return async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        sync_session_class=AsyncDriverSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+AsyncSessionLocal = make_async_sessionmaker(DATABASE_URL) if ASYNC_DB else None
+
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def run_migrations(bind=engine, revision: str = "head") -> None:
+    """Upgrade the database behind ``bind`` with the Alembic migrations."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = False
+    with bind.connect() as connection:
+        foreign_keys = None
+        if connection.dialect.name == "sqlite":
+            # Copying a table to alter it must not cascade deletes to the rows
+            # referencing it; the PRAGMA only applies outside a transaction
+            foreign_keys = connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+        try:
+            with connection.begin():
+                config.attributes["connection"] = connection
+                command.upgrade(config, revision)
+        finally:
+            if foreign_keys:
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+                connection.commit()
+
 
 def init_db():
     """Initialize database and create tables."""
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
     
     # Add sample data if database is empty
     db = SessionLocal()
@@ -52,7 +123,69 @@ def get_db() -> Session:
         db.close()
 
 
-if __name__ == "__main__":
+def get_db_session():
+    """Yield a database session, as a request dependency."""
+    with get_db() as db:
+        yield db
+
+
+async def get_async_db() -> AsyncIterator:
+    """Yield an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def import_file(path: str, format: str = None, column_id: int = None) -> dict:
+    """Import the cards of a file, see ``app.importer``."""
+    format = format or importer.detect_format(filename=path)
+    with open(path, encoding="utf-8-sig", newline="") as stream, get_db() as db:
+        return importer.import_stream(db, Card, BoardColumn, Change, stream, format, column_id)
+
+
+def seed_board(**options) -> dict:
+    """Append a synthetic board, see ``app.seed``."""
+    with get_db() as db:
+        return seed.seed_board(db, BoardColumn, Card, Change, **options)
+
+
+def main(argv=None) -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Manage the Kanban database.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("init", help="create or upgrade the tables and add sample data (default)")
+    import_parser = commands.add_parser("import", help="bulk import cards from a file")
+    import_parser.add_argument("path", help="JSON, NDJSON, CSV (e.g. a Notion export) or Trello JSON file")
+    import_parser.add_argument("--format", choices=importer.FORMATS,
+                               help="input format (default: from the file extension)")
+    import_parser.add_argument("--column-id", type=int, help="column for cards that do not name one")
+    seed_parser = commands.add_parser("seed", help="add a synthetic board, the same for the same --seed")
+    seed_parser.add_argument("--columns", type=int, default=5)
+    seed_parser.add_argument("--cards-per-column", type=int, default=1000)
+    seed_parser.add_argument("--description-sizes", type=seed.parse_sizes,
+                             help="size=weight,... in characters (default: 0=20,80=50,400=25,2000=5)")
+    seed_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        run_migrations()
+        print(f"Importing {args.path}...")
+        result = import_file(args.path, args.format, args.column_id)
+        print(f"Imported {result['cards']} cards and created {result['columns']} columns.")
+        return
+    if args.command == "seed":
+        run_migrations()
+        start = time.perf_counter()
+        result = seed_board(columns=args.columns, cards_per_column=args.cards_per_column,
+                            description_sizes=args.description_sizes, seed=args.seed)
+        print(f"Seeded {result['cards']} cards in {result['columns']} columns "
+              f"in {time.perf_counter() - start:.1f}s.")
+        return
     print("Initializing database...")
     init_db()
     print("Database initialized successfully!")
+
+
+if __name__ == "__main__":
+    main()
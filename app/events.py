@@ -0,0 +1,92 @@
+"""Server-sent events for pushing board changes to open clients.
+
+Request handlers run in worker threads, so they hand committed changes to the
+event loop with ``publish``.  A single asyncio task then fans every event out
+to the per-client queues.
+"""
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional, Set
+
+# Events buffered per client before it is told to resync instead.
+QUEUE_SIZE = 100
+
+# Seconds between keep-alive comments on an idle stream.
+KEEPALIVE_INTERVAL = 15
+
+RESYNC = {"type": "resync"}
+
+
+class EventBroadcaster:
+    """Fans published events out to every subscribed client."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._inbox: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self):
+        """Start the fan-out task on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._inbox = asyncio.Queue()
+        self._task = asyncio.create_task(self._fan_out())
+
+    async def stop(self):
+        """Stop the fan-out task; later events are dropped."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._loop = self._inbox = self._task = None
+
+    def publish(self, event: dict):
+        """Queue an event for all subscribers; safe to call from any thread."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._inbox.put_nowait, event)
+
+    def publish_changes(self, changes: List[dict]):
+        """Publish a committed batch of change feed entries."""
+        self.publish({"type": "changes", "version": changes[-1]["version"], "changes": changes})
+
+    async def _fan_out(self):
+        while True:
+            event = await self._inbox.get()
+            for queue in list(self._subscribers):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # A slow client gets a single resync marker instead of a backlog
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(RESYNC)
+
+    async def subscribe(self) -> AsyncIterator[Optional[dict]]:
+        """Yield events as they arrive, or None after an idle keep-alive interval."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._subscribers.discard(queue)
+
+    async def sse_stream(self) -> AsyncIterator[str]:
+        """Yield the subscription formatted as a ``text/event-stream`` body."""
+        yield "retry: 3000\n\n"
+        async for event in self.subscribe():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
@@ -0,0 +1,307 @@
+"""Bulk card import from JSON, NDJSON, CSV (including Notion exports) and Trello.
+
+Creating cards one ``POST /api/cards`` at a time costs a count, a commit and
+a refresh per card.  The importer instead reads the input as a stream of
+records, assigns positions in memory from one grouped query per import, and
+inserts the cards in batches of ``BATCH_SIZE`` rows with one statement each,
+committing every ``COMMIT_EVERY`` batches.  Each commit records a single
+``board``/``import`` change, which tells caches and clients to reload rather
+than replay one change per card.
+
+Like ``app.ranking`` and ``app.queries`` it takes the models as parameters.
+"""
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterable, BinaryIO, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from sqlalchemy import func, insert, select
+
+from . import changes, queries, ranking
+
+# Cards inserted per statement, and statements per transaction.
+BATCH_SIZE = 1000
+COMMIT_EVERY = 10
+
+FORMATS = ("json", "ndjson", "csv", "notion", "trello")
+
+# Accepted spellings of each field, e.g. Notion exports the title as "Name"
+# and the column as "Status".
+FIELD_ALIASES = {
+    "title": ("title", "name", "card", "task"),
+    "description": ("description", "desc", "notes", "details"),
+    "column": ("column", "status", "list", "stage"),
+    "column_id": ("column_id",),
+    "color": ("color", "colour"),
+}
+
+DEFAULT_COLOR = "#ffffff"
+MAX_TITLE_LENGTH = 255
+
+# Uploads larger than this are spooled to a temporary file instead of memory.
+SPOOL_MAX_MEMORY = 1 << 20
+
+
+class InvalidImport(ValueError):
+    """Input that cannot be imported; cards committed before it are kept."""
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """Guess the input format from a file name or a Content-Type."""
+    if filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        if extension in ("json", "ndjson", "csv"):
+            return extension
+        if extension == "jsonl":
+            return "ndjson"
+    if content_type:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            return "ndjson"
+        if "csv" in content_type:
+            return "csv"
+    return "json"
+
+
+def iter_json_array(stream: TextIO, chunk_size: int = 1 << 16) -> Iterator:
+    """Yield the items of a top-level JSON array without loading the whole array."""
+    decoder = json.JSONDecoder()
+    buffer, index, eof, started = "", 0, False, False
+    while True:
+        while index < len(buffer) and buffer[index] in " \t\r\n,":
+            index += 1
+        if index < len(buffer):
+            if not started:
+                if buffer[index] != "[":
+                    raise InvalidImport("Expected a JSON array of cards")
+                started, index = True, index + 1
+                continue
+            if buffer[index] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError as error:
+                if eof:
+                    raise InvalidImport(f"Invalid JSON: {error}")
+            else:
+                # A value running to the end of the buffer may be cut short, e.g. a number
+                if end < len(buffer) or eof:
+                    yield item
+                    index = end
+                    continue
+        elif eof:
+            raise InvalidImport("Unexpected end of JSON input")
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        # Only trim what was consumed when reading more, so items are not copied twice
+        buffer, index = buffer[index:] + chunk, 0
+
+
+def iter_ndjson(stream: TextIO) -> Iterator:
+    """Yield one record per non-empty line."""
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise InvalidImport(f"Invalid JSON on line {number}: {error}")
+
+
+def iter_trello(board: dict) -> Iterator[dict]:
+    """Yield the open cards of a Trello board export, list by list."""
+    lists = [item for item in board.get("lists", ()) if not item.get("closed")]
+    lists.sort(key=lambda item: item.get("pos", 0))
+    names = {item["id"]: item["name"] for item in lists}
+    order = {item["id"]: index for index, item in enumerate(lists)}
+    cards = [card for card in board.get("cards", ()) if not card.get("closed") and card.get("idList") in names]
+    cards.sort(key=lambda card: (order[card["idList"]], card.get("pos", 0)))
+    for name in names.values():
+        # Empty lists are imported as columns too
+        yield {"column": name, "title": None}
+    for card in cards:
+        yield {"title": card.get("name"), "description": card.get("desc") or None, "column": names[card["idList"]]}
+
+
+def iter_records(stream: TextIO, format: str = "json") -> Iterator[dict]:
+    """Yield the raw records of an input stream in the given format."""
+    if format not in FORMATS:
+        raise InvalidImport(f"Unknown format {format!r}; expected one of {', '.join(FORMATS)}")
+    if format in ("csv", "notion"):
+        return csv.DictReader(stream)
+    if format == "ndjson":
+        return iter_ndjson(stream)
+    head = stream.read(1)
+    while head.isspace():
+        head = stream.read(1)
+    if format == "trello" or head == "{":
+        # A Trello board is a single object, so it is read whole
+        try:
+            return iter_trello(json.loads(head + stream.read()))
+        except json.JSONDecodeError as error:
+            raise InvalidImport(f"Invalid JSON: {error}")
+    return iter_json_array(_Prefixed(head, stream))
+
+
+class _Prefixed(io.TextIOBase):
+    """A text stream with characters already read from it put back in front."""
+
+    def __init__(self, prefix: str, stream: TextIO):
+        self.prefix, self.stream = prefix, stream
+
+    def read(self, size: int = -1) -> str:
+        prefix, self.prefix = self.prefix, ""
+        if size is None or size < 0:
+            return prefix + self.stream.read()
+        return prefix + self.stream.read(max(size - len(prefix), 1))
+
+
+@lru_cache(maxsize=64)
+def field_keys(keys: tuple) -> Tuple[Tuple[str, object], ...]:
+    """Map the canonical fields to the keys a record shape spells them with."""
+    lowered = {}
+    for key in keys:
+        if key is not None:
+            lowered.setdefault(str(key).strip().lower(), key)
+    return tuple(
+        (field, [lowered[alias] for alias in aliases if alias in lowered])
+        for field, aliases in FIELD_ALIASES.items()
+        if any(alias in lowered for alias in aliases)
+    )
+
+
+def normalize(record, number: int) -> dict:
+    """Return a record's known fields under their canonical names."""
+    if not isinstance(record, dict):
+        raise InvalidImport(f"Record {number} is not an object")
+    # Records of an input mostly share one shape, so the key lookup is cached
+    fields = {}
+    for field, keys in field_keys(tuple(record)):
+        for key in keys:
+            value = record[key]
+            if value not in (None, ""):
+                fields[field] = value.strip() if isinstance(value, str) else value
+                break
+    return fields
+
+
+def import_cards(db, card_model, column_model, change_model, records: Iterable,
+                 column_id: Optional[int] = None, batch_size: Optional[int] = None,
+                 commit_every: Optional[int] = None) -> dict:
+    """Insert the cards of ``records`` at the end of their columns.
+
+    A record names its column by ``column_id`` or by title; columns named by
+    a title that does not exist yet are created.  Records without either go
+    to ``column_id``.  In rank mode the imported cards are ranked when the
+    import finishes.  Returns the number of cards imported and columns
+    created.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    commit_every = commit_every or COMMIT_EVERY
+    next_position: Dict[int, int] = dict(db.execute(
+        select(card_model.column_id, func.max(card_model.position) + 1).group_by(card_model.column_id)
+    ).all())
+    # The first column with a title wins when titles repeat; deleted ones are skipped
+    titles, column_ids = {}, set()
+    for row in db.execute(
+        select(column_model.id, column_model.title).where(*queries.live(column_model)).order_by(column_model.id)
+    ):
+        column_ids.add(row.id)
+        titles.setdefault(row.title, row.id)
+    column_count = len(column_ids)
+    touched, created, imported, batches, batch = set(), 0, 0, 0, []
+    # Rank mode: each touched column's last rank before the import
+    last_ranks: Dict[int, Optional[str]] = {}
+    statement = insert(card_model.__table__)
+    now = datetime.utcnow()
+
+    def flush_batch():
+        nonlocal imported, batches
+        if batch:
+            # A Core insert of the table skips the ORM's per-row bulk bookkeeping
+            db.execute(statement, batch)
+            imported += len(batch)
+            batch.clear()
+            batches += 1
+            if batches % commit_every == 0:
+                commit()
+
+    def commit():
+        changes.record_change(db, change_model, "board", "import", 0, {"cards": imported, "columns": created})
+        db.commit()
+
+    for number, record in enumerate(records, 1):
+        fields = normalize(record, number)
+        target = fields.get("column_id", column_id)
+        if isinstance(target, str) and target.isdigit():
+            target = int(target)  # CSV values are strings
+        if "column" in fields and "column_id" not in fields:
+            name = str(fields["column"])
+            target = titles.get(name)
+            if target is None:
+                new_column = column_model(title=name[:MAX_TITLE_LENGTH], position=column_count)
+                db.add(new_column)
+                db.flush()
+                target = titles[name] = new_column.id
+                column_ids.add(target)
+                column_count += 1
+                created += 1
+        if fields.get("title") is None and "column" in fields:
+            continue  # A column without cards
+        if not isinstance(target, int) or target not in column_ids:
+            raise InvalidImport(f"Record {number} has no known column")
+        title = fields.get("title")
+        if not isinstance(title, str) or not title:
+            raise InvalidImport(f"Record {number} has no title")
+
+        position = next_position.get(target) or 0
+        next_position[target] = position + 1
+        if ranking.rank_mode() and target not in touched:
+            last_ranks[target] = ranking.last_rank(db, card_model, target)
+        touched.add(target)
+        batch.append({
+            "title": title[:MAX_TITLE_LENGTH],
+            "description": fields.get("description"),
+            "column_id": target,
+            "position": position,
+            "rank": None,
+            "color": str(fields.get("color", DEFAULT_COLOR))[:7],
+            "created_at": now,
+            "updated_at": now,
+        })
+        if len(batch) >= batch_size:
+            flush_batch()
+
+    flush_batch()
+    if ranking.rank_mode():
+        # Spaced in one go: appending ranks one by one would make them grow with every card
+        for target in sorted(touched):
+            ranking.rank_appended(db, card_model, target, last_ranks[target])
+    if imported or created:
+        commit()
+    return {"cards": imported, "columns": created}
+
+
+async def spool(chunks: AsyncIterable[bytes]) -> BinaryIO:
+    """Copy an async byte stream, e.g. a request body, to a rewound temporary file."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in chunks:
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+def text_stream(binary: BinaryIO) -> TextIO:
+    """Decode a binary upload as UTF-8, dropping a byte order mark (Excel CSVs have one)."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def import_stream(db, card_model, column_model, change_model, stream: TextIO, format: str = "json",
+                  column_id: Optional[int] = None, **options) -> dict:
+    """Import the cards of a text stream in the given format."""
+    try:
+        return import_cards(db, card_model, column_model, change_model, iter_records(stream, format),
+                            column_id=column_id, **options)
+    except (UnicodeDecodeError, csv.Error) as error:
+        raise InvalidImport(f"Unreadable input: {error}")
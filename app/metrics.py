@@ -0,0 +1,269 @@
+"""Request and SQL metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every request and records its response size and
+status under the route's path template, so ``/api/cards/{card_id}`` is one
+series however many cards there are.  ``instrument_engine`` counts and times
+SQL statements through the engine's cursor events and adds them to the
+current request, whose totals are observed when it finishes.  ``GET
+/metrics`` renders the registry.
+
+The metrics are plain in-process counters behind a lock: an observation is a
+bisect and a few additions, so they can stay on in production.
+``KANBAN_METRICS=0`` leaves the middleware and the engine events out.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.responses import Response
+
+METRICS_ENABLED = os.getenv("KANBAN_METRICS", "1").lower() not in ("0", "false", "no")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+SQL_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """A named family of series, one per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for values, sample in series:
+            lines.extend(self._render_series(values, sample))
+        return lines
+
+    def _render_series(self, values, sample) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, values)} {_format_value(sample)}"]
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._series[values] = self._series.get(values, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._series[values] = self._series.get(values, 0) + amount
+
+    def dec(self, *values: str, amount: float = 1) -> None:
+        self.inc(*values, amount=-amount)
+
+
+class Histogram(Metric):
+    """Observations counted in cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._series.get(values)
+            if sample is None:
+                # Per-bucket counts, made cumulative when rendered; then sum and count
+                sample = self._series[values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            sample[index] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    def _render_series(self, values, sample) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), sample):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+        labels = _format_labels(self.labels, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(sample[-2])}")
+        lines.append(f"{self.name}_count{labels} {sample[-1]}")
+        return lines
+
+
+class Registry:
+    """The metrics rendered by ``/metrics``."""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "kanban_http_request_duration_seconds", "Time to send the whole response.", ("method", "route", "status"),
+))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "kanban_http_requests_in_flight", "Requests being handled.",
+))
+RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "kanban_http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS,
+))
+REQUEST_STATEMENTS = REGISTRY.register(Histogram(
+    "kanban_http_request_sql_statements", "SQL statements executed per request.", ("method", "route"),
+    STATEMENT_BUCKETS,
+))
+REQUEST_SQL_SECONDS = REGISTRY.register(Histogram(
+    "kanban_http_request_sql_seconds", "Time spent in SQL per request.", ("method", "route"),
+))
+SQL_STATEMENTS = REGISTRY.register(Counter(
+    "kanban_sql_statements_total", "SQL statements executed, in and out of requests.", ("operation",),
+))
+SQL_SECONDS = REGISTRY.register(Histogram(
+    "kanban_sql_statement_duration_seconds", "Time to execute one SQL statement.", ("operation",), SQL_BUCKETS,
+))
+
+
+class RequestStats:
+    """SQL totals of the request being handled, and its ASGI scope."""
+
+    __slots__ = ("scope", "statements", "sql_seconds")
+
+    def __init__(self, scope=None):
+        self.scope, self.statements, self.sql_seconds = scope, 0, 0.0
+
+
+# The stats object is shared, not copied, by the threads and tasks a request spawns
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("kanban_request_stats", default=None)
+
+
+def _operation(statement: str) -> str:
+    """The statement's first keyword, e.g. SELECT, which keeps the label set small."""
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+
+
+def instrument_engine(engine) -> None:
+    """Count and time the SQL statements of a sync or async engine."""
+    engine = getattr(engine, "sync_engine", engine)
+    if not METRICS_ENABLED:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("kanban_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["kanban_query_start"].pop()
+        operation = _operation(statement)
+        SQL_STATEMENTS.inc(operation)
+        SQL_SECONDS.observe(seconds, operation)
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_seconds += seconds
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        connection = exception_context.connection
+        starts = connection.info.get("kanban_query_start") if connection is not None else None
+        if starts:
+            starts.pop()
+
+
+def route_template(scope) -> str:
+    """The path template of the matched route, or a fixed label for unmatched paths."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests, response sizes and SQL per request.
+
+    Written against raw ASGI rather than ``BaseHTTPMiddleware`` so streamed
+    responses are timed until their last chunk and are not buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # The router adds the matched route to the scope before the endpoint runs
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status, size = 500, 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            seconds = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            current_request.reset(token)
+            method, route = scope["method"], route_template(scope)
+            REQUEST_SECONDS.observe(seconds, method, route, str(status))
+            RESPONSE_BYTES.observe(size, method, route)
+            REQUEST_STATEMENTS.observe(stats.statements, method, route)
+            REQUEST_SQL_SECONDS.observe(stats.sql_seconds, method, route)
+
+
+def metrics_response() -> Response:
+    """The ``/metrics`` response."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,5 +1,5 @@
 """Database models for Kanban board."""
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -13,13 +13,14 @@ class BoardColumn(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
-    position = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False, index=True)
     color = Column(String(7), default="#e9e9e7")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)  # Set while app.purge deletes the cards
     
-    # Relationships
-    cards = relationship("Card", back_populates="column", cascade="all, delete-orphan")
+    # Relationships; the database deletes the cards with their column
+    cards = relationship("Card", back_populates="column", cascade="all, delete-orphan", passive_deletes=True)
     
     def to_dict(self):
         return {
@@ -39,8 +40,9 @@ class Card(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    column_id = Column(Integer, ForeignKey("columns.id"), nullable=False)
+    column_id = Column(Integer, ForeignKey("columns.id", ondelete="CASCADE"), nullable=False)
     position = Column(Integer, nullable=False)
+    rank = Column(String(64), nullable=True)  # Sort key in rank ordering mode
     color = Column(String(7), default="#ffffff")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -48,6 +50,12 @@ class Card(Base):
     # Relationships
     column = relationship("BoardColumn", back_populates="cards")
     
+    __table_args__ = (
+        # Serves per-column filters, counts, position range scans and ordering
+        Index("ix_cards_column_id_position", "column_id", "position"),
+        Index("ix_cards_column_id_rank", "column_id", "rank"),
+    )
+    
     def to_dict(self):
         return {
             "id": self.id,
@@ -59,3 +67,18 @@ class Card(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class Change(Base):
+    """Entry in the append-only change feed; its id is the board version."""
+    __tablename__ = "changes"
+    
+    version = Column(Integer, primary_key=True)
+    entity = Column(String(16), nullable=False)  # "card", "column" or "board" (bulk writes)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(16), nullable=False)  # create, update, move or delete
+    data = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # AUTOINCREMENT guarantees versions are never reused
+    __table_args__ = {"sqlite_autoincrement": True}
@@ -0,0 +1,133 @@
+"""Moving a selection of cards in one transaction.
+
+``PATCH /api/cards/{id}/move`` shifts the neighbours of one card and commits.
+Moving a selection that way scans and rewrites the same columns once per
+card.  ``move_cards`` reads the affected columns once, works out their final
+order in memory and writes only the rows whose column, position or rank
+changes.  Like ``app.ranking`` it takes the models as parameters, so the sync
+and async endpoints and the advanced app share it.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select, update
+
+from . import changes, queries, ranking
+
+
+class CardsNotFound(LookupError):
+    """Some of the cards to move do not exist."""
+
+    def __init__(self, card_ids: List[int]):
+        self.card_ids = card_ids
+        super().__init__(f"Cards not found: {', '.join(map(str, card_ids))}")
+
+
+def _insert_index(order: List[int], position: Optional[int], moving: set) -> int:
+    """Return where to insert in ``order`` so ``position`` cards that stay come before."""
+    if position is None:
+        return len(order)
+    if position <= 0:
+        return 0
+    seen = 0
+    for index, card_id in enumerate(order):
+        if card_id not in moving:
+            seen += 1
+            if seen == position:
+                return index + 1
+    return len(order)
+
+
+def move_cards(db, card_model, change_model, card_ids: Iterable[int], column_id: int,
+               position: Optional[int] = None, fields: Sequence[str] = queries.CARD_FIELDS,
+               shape: Optional[Callable[[List[dict]], List[dict]]] = None) -> List[dict]:
+    """Move cards, in the given order, to ``position`` in a column without committing.
+
+    ``position`` counts the cards of the target column that stay where they
+    are; None appends the cards at the end.  One ``move`` change is recorded
+    per card, as if the cards had been moved one at a time, so clients
+    replaying the feed reach the same order.  ``shape`` can add fields to the
+    card dicts (e.g. tags) before they are recorded.  Returns the moved cards
+    with their final column and position.
+    """
+    card_ids = list(dict.fromkeys(card_ids))
+    moving = set(card_ids)
+    statement = select(*(getattr(card_model, f) for f in fields)).where(card_model.id.in_(card_ids))
+    cards = {card["id"]: card for card in queries.fetch_dicts(db, statement, fields)}
+    missing = [card_id for card_id in card_ids if card_id not in cards]
+    if missing:
+        raise CardsNotFound(missing)
+
+    ranks = None
+    if ranking.rank_mode():
+        # Read before the columns: a column still in position order is ranked first
+        if position is None:
+            before, after = ranking.last_rank(db, card_model, column_id, card_ids), None
+        else:
+            before, after = ranking.neighbour_ranks(db, card_model, column_id, position, card_ids)
+        ranks = dict(zip(card_ids, ranking.spaced_ranks_between(before, after, len(card_ids))))
+
+    affected = {column_id} | {card["column_id"] for card in cards.values()}
+    orders: Dict[int, List[int]] = {column: [] for column in affected}
+    positions: Dict[int, int] = {}
+    for row in db.execute(
+        select(card_model.id, card_model.column_id, card_model.position)
+        .where(card_model.column_id.in_(affected))
+        .order_by(card_model.column_id, ranking.order_column(card_model), card_model.id)
+    ):
+        order = orders[row.column_id]
+        # Rank mode clients see index positions
+        positions[row.id] = len(order) if ranks is not None else row.position
+        order.append(row.id)
+    original = {card_id: (column, positions[card_id]) for column, order in orders.items() for card_id in order}
+
+    # Move the cards one at a time, shifting neighbours exactly like a single
+    # move does (and clients replay it); each card lands after the previous one.
+    target, steps, previous = orders[column_id], [], None
+    for card_id in card_ids:
+        source_id, from_position = cards[card_id]["column_id"], positions[card_id]
+        orders[source_id].remove(card_id)
+        index = target.index(previous) + 1 if previous is not None else _insert_index(target, position, moving)
+        if index < len(target):
+            new_position = positions[target[index]]
+        else:
+            new_position = positions[target[-1]] + 1 if target else 0
+        if source_id != column_id:
+            for other in orders[source_id]:
+                if positions[other] > from_position:
+                    positions[other] -= 1
+        for other in target:
+            if positions[other] >= new_position:
+                positions[other] += 1
+        positions[card_id] = new_position
+        target.insert(index, card_id)
+        cards[card_id]["column_id"] = column_id
+        steps.append((card_id, source_id, from_position, new_position))
+        previous = card_id
+
+    if ranks is None:
+        # Write only the rows whose column or position changed
+        rows = [
+            {"id": card_id, "column_id": column, "position": positions[card_id]}
+            for column, order in orders.items()
+            for card_id in order
+            if original[card_id] != (column, positions[card_id])
+        ]
+    else:
+        # Only the moved cards are written; their ranks fill the gap evenly
+        rows = [
+            {"id": card_id, "column_id": column_id, "position": positions[card_id], "rank": ranks[card_id]}
+            for card_id in card_ids
+        ]
+    if rows:
+        db.execute(update(card_model), rows)
+
+    shaped = [{**cards[card_id], "position": new_position} for card_id, _, _, new_position in steps]
+    if shape is not None:
+        shaped = shape(shaped)
+    for card, (card_id, source_id, from_position, _) in zip(shaped, steps):
+        moved_from = {"from_column_id": source_id, "from_position": from_position}
+        changes.record_change(db, change_model, "card", "move", card_id, {**card, **moved_from})
+
+    if ranks is not None and any(ranking.needs_rebalance(rank) for rank in ranks.values()):
+        ranking.rebalance_column(db, card_model, column_id)
+    return [{**card, "position": positions[card["id"]]} for card in shaped]
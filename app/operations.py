@@ -0,0 +1,245 @@
+"""Column and card writes shared by the endpoints and ``POST /api/batch``.
+
+Each helper applies one operation and records its change but does not
+commit: the single-operation endpoints commit after it, ``run_batch`` after
+the whole batch, so a failing operation rolls back every operation before it.
+"""
+import re
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import delete, update
+
+from . import changes, moves, purge, queries, ranking
+from .models import BoardColumn, Card, Change
+from .schemas import BatchOperation, CardCreate, CardMove, CardsMove, CardUpdate, ColumnCreate, ColumnResponse, card_data
+
+# "$2" in a batch operation stands for the id of the object operation 2 returned
+REFERENCE = re.compile(r"^\$(\d+)$")
+
+
+class NotFound(HTTPException):
+    """The column or card an operation targets does not exist; answered with a 404."""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=404, detail=detail)
+
+
+class InvalidOperation(ValueError):
+    """A batch operation that cannot be applied as written."""
+
+
+class BatchOperationFailed(Exception):
+    """A batch operation failed; nothing in the batch was committed."""
+
+    def __init__(self, index: int, status_code: int, message):
+        self.index, self.status_code, self.message = index, status_code, message
+        super().__init__(f"Operation {index}: {message}")
+
+
+def _get_or_raise(db, model, object_id: int, detail: str):
+    obj = db.get(model, object_id)
+    if obj is None:
+        raise NotFound(detail)
+    return obj
+
+
+def _get_column(db, column_id: int) -> BoardColumn:
+    column = _get_or_raise(db, BoardColumn, column_id, "Column not found")
+    if column.deleted_at is not None:
+        raise NotFound("Column not found")
+    return column
+
+
+def create_column(db, column: ColumnCreate) -> BoardColumn:
+    """Append a column to the board."""
+    position = db.query(BoardColumn).filter(*queries.live(BoardColumn)).count()
+    db_column = BoardColumn(title=column.title, color=column.color, position=position)
+    db.add(db_column)
+    db.flush()
+    changes.record_change(db, Change, "column", "create", db_column.id, ColumnResponse.from_orm(db_column).dict())
+    return db_column
+
+
+def delete_column(db, column_id: int) -> bool:
+    """Delete a column and its cards with one statement each.
+
+    A column with more than ``purge.SOFT_DELETE_THRESHOLD`` cards is only
+    marked deleted; returns True if ``purge.purge_deleted_columns`` should
+    run after the commit.
+    """
+    column = _get_column(db, column_id)
+    soft = purge.is_large(db, column_id)
+    if soft:
+        column.deleted_at = datetime.utcnow()
+    else:
+        # Cards already in the session are marked deleted too
+        db.execute(
+            delete(Card).where(Card.column_id == column_id), execution_options={"synchronize_session": "evaluate"}
+        )
+        db.delete(column)
+    changes.record_change(db, Change, "column", "delete", column_id)
+    return soft
+
+
+def create_card(db, card: CardCreate) -> Card:
+    """Append a card to its column."""
+    _get_column(db, card.column_id)
+    db_card = Card(
+        title=card.title,
+        description=card.description,
+        column_id=card.column_id,
+        position=db.query(Card).filter(Card.column_id == card.column_id).count(),
+        color=card.color,
+    )
+    if ranking.rank_mode():
+        db_card.rank = ranking.rank_between(ranking.last_rank(db, Card, card.column_id), None)
+    db.add(db_card)
+    db.flush()
+    changes.record_change(db, Change, "card", "create", db_card.id, card_data(db_card))
+    return db_card
+
+
+def update_card(db, card_id: int, card: CardUpdate) -> Card:
+    """Change a card's title, description or color."""
+    db_card = _get_or_raise(db, Card, card_id, "Card not found")
+    if card.title is not None:
+        db_card.title = card.title
+    if card.description is not None:
+        db_card.description = card.description
+    if card.color is not None:
+        db_card.color = card.color
+    changes.record_change(db, Change, "card", "update", card_id, card_data(db_card))
+    return db_card
+
+
+def delete_card(db, card_id: int) -> None:
+    """Delete a card."""
+    card = _get_or_raise(db, Card, card_id, "Card not found")
+    db.delete(card)
+    changes.record_change(db, Change, "card", "delete", card_id, {"column_id": card.column_id})
+
+
+def move_card(db, card_id: int, move: CardMove) -> Card:
+    """Move a card to a column and position.
+
+    In rank mode only the card is written; check ``ranking.needs_rebalance``
+    on its rank afterwards.
+    """
+    card = _get_or_raise(db, Card, card_id, "Card not found")
+    _get_column(db, move.column_id)
+    moved_from = {"from_column_id": card.column_id, "from_position": card.position}
+
+    if ranking.rank_mode():
+        # Its rank sits between its new neighbours
+        card.rank = ranking.rank_for_position(db, Card, move.column_id, move.position, exclude_id=card_id)
+    else:
+        # One statement per column shifts the neighbours without loading them;
+        # "evaluate" keeps any already loaded in the session in step
+        if card.column_id != move.column_id:
+            db.execute(
+                update(Card)
+                .where(Card.column_id == card.column_id, Card.position > card.position)
+                .values(position=Card.position - 1),
+                execution_options={"synchronize_session": "evaluate"},
+            )
+        db.execute(
+            update(Card)
+            .where(Card.column_id == move.column_id, Card.position >= move.position, Card.id != card_id)
+            .values(position=Card.position + 1),
+            execution_options={"synchronize_session": "evaluate"},
+        )
+    card.column_id = move.column_id
+    card.position = move.position
+    changes.record_change(db, Change, "card", "move", card_id, {**card_data(card), **moved_from})
+    return card
+
+
+def move_cards(db, move: CardsMove) -> List[dict]:
+    """Move several cards, in the given order, see ``moves.move_cards``."""
+    _get_column(db, move.column_id)
+    try:
+        return moves.move_cards(db, Card, Change, move.card_ids, move.column_id, move.position)
+    except moves.CardsNotFound as error:
+        raise NotFound(str(error))
+
+
+def _resolve(value, results: List[dict]):
+    """Replace ``$n`` references with the id operation ``n`` returned."""
+    if isinstance(value, list):
+        return [_resolve(item, results) for item in value]
+    if isinstance(value, str):
+        match = REFERENCE.match(value)
+        if match:
+            index = int(match.group(1))
+            if index >= len(results) or results[index]["id"] is None:
+                raise InvalidOperation(f"{value} does not refer to an earlier operation with an id")
+            return results[index]["id"]
+    return value
+
+
+def _required_id(operation: BatchOperation, object_id) -> int:
+    if not isinstance(object_id, int):
+        raise InvalidOperation(f"{operation.op} {operation.entity} needs an id")
+    return object_id
+
+
+def apply_operation(db, operation: BatchOperation, results: List[dict]) -> Tuple[dict, Optional[int]]:
+    """Apply one batch operation; return its result and a column to rebalance, if any."""
+    object_id = _resolve(operation.id, results)
+    data = {key: _resolve(value, results) for key, value in operation.data.items()}
+    kind = (operation.entity, operation.op)
+
+    if kind == ("column", "create"):
+        column = create_column(db, ColumnCreate.parse_obj(data))
+        return {"id": column.id, "data": ColumnResponse.from_orm(column).dict()}, None
+    if kind == ("column", "delete"):
+        object_id = _required_id(operation, object_id)
+        delete_column(db, object_id)
+        return {"id": object_id, "data": None}, None
+    if kind == ("card", "create"):
+        card = create_card(db, CardCreate.parse_obj(data))
+        return {"id": card.id, "data": card_data(card)}, None
+    if kind == ("card", "update"):
+        card = update_card(db, _required_id(operation, object_id), CardUpdate.parse_obj(data))
+        return {"id": card.id, "data": card_data(card)}, None
+    if kind == ("card", "delete"):
+        object_id = _required_id(operation, object_id)
+        delete_card(db, object_id)
+        return {"id": object_id, "data": None}, None
+    if kind == ("card", "move") and object_id is None and "card_ids" in data:
+        return {"id": None, "data": move_cards(db, CardsMove.parse_obj(data))}, None
+    if kind == ("card", "move"):
+        card = move_card(db, _required_id(operation, object_id), CardMove.parse_obj(data))
+        rebalance = card.column_id if ranking.rank_mode() and ranking.needs_rebalance(card.rank) else None
+        return {"id": card.id, "data": card_data(card)}, rebalance
+    raise InvalidOperation(f"Cannot {operation.op} a {operation.entity}")
+
+
+def run_batch(db, operations: List[BatchOperation]) -> Tuple[List[dict], Set[int]]:
+    """Apply operations in order without committing.
+
+    Returns one result per operation and the columns whose ranks need a
+    rebalance once the batch is committed.  The first failure raises
+    ``BatchOperationFailed``; the caller must roll back.
+    """
+    results: List[dict] = []
+    rebalance: Set[int] = set()
+    for index, operation in enumerate(operations):
+        try:
+            result, column_id = apply_operation(db, operation, results)
+            # Later operations query the rows this one changed
+            db.flush()
+        except NotFound as error:
+            raise BatchOperationFailed(index, 404, error.detail)
+        except ValidationError as error:
+            raise BatchOperationFailed(index, 422, error.errors())
+        except InvalidOperation as error:
+            raise BatchOperationFailed(index, 400, str(error))
+        results.append({"op": operation.op, "entity": operation.entity, **result})
+        if column_id is not None:
+            rebalance.add(column_id)
+    return results, rebalance
+
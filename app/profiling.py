@@ -0,0 +1,197 @@
+"""On-demand CPU and allocation profiles of single requests.
+
+Set ``KANBAN_PROFILE_TOKEN`` and send a request with that token in the
+``X-Kanban-Profile`` header (or ``?profile=<token>``): it runs under a
+sampling profiler and ``tracemalloc``, and the profile is written to
+``KANBAN_PROFILE_DIR`` (``profiles/``) under the id returned in the
+``X-Profile-Id`` response header:
+
+- ``<id>.collapsed``: one ``frame;frame;frame count`` line per stack, for
+  flamegraph.pl, speedscope or inferno;
+- ``<id>.pstats``: the same samples as ``pstats`` data, for
+  ``python -m pstats`` or snakeviz;
+- ``<id>.alloc.txt``: the lines that allocated the most memory.
+
+The sampler reads the stacks of every thread, so sync endpoints running in
+the threadpool are profiled too.  It keeps the samples of the event loop
+while it runs this request's middleware chain, and of threads inside the
+request's endpoint; concurrent requests to the same endpoint would be mixed
+in, and ``tracemalloc`` sees every allocation of the process while it runs.
+One request is profiled at a time.
+
+Without a token the middleware is not installed, so untriggered requests
+cost nothing; with one, they cost a header lookup.
+"""
+import hmac
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+PROFILE_TOKEN = os.getenv("KANBAN_PROFILE_TOKEN") or None
+PROFILE_DIR = os.getenv("KANBAN_PROFILE_DIR", "profiles")
+HEADER = b"x-kanban-profile"
+
+# Seconds between samples, and allocation sites listed in the report
+SAMPLE_INTERVAL = 0.001
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+
+
+class SamplingProfiler:
+    """Samples the stacks belonging to one request from a background thread."""
+
+    def __init__(self, frame, scope, interval: float = SAMPLE_INTERVAL):
+        self.frame, self.scope, self.interval = frame, scope, interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kanban-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            endpoint = getattr(self.scope.get("endpoint"), "__code__", None)
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack, matched = [], False
+                while frame is not None:
+                    matched = matched or frame is self.frame or frame.f_code is endpoint
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if matched:
+                    self.samples[tuple(reversed(stack))] += 1
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapsed_stacks(samples: Counter) -> str:
+    """Samples in the collapsed-stack format flamegraph tools read."""
+    lines = [";".join(_label(code) for code in stack) + f" {count}" for stack, count in samples.most_common()]
+    return "\n".join(lines) + "\n"
+
+
+def pstats_data(samples: Counter, interval: float) -> Dict[Tuple[str, int, str], tuple]:
+    """Samples as the dict ``pstats.Stats`` loads.
+
+    Sample counts stand in for call counts, and times are samples times the
+    sampling interval.
+    """
+    stats: Dict[tuple, list] = {}
+
+    def entry(code):
+        key = (code.co_filename, code.co_firstlineno, code.co_name)
+        if key not in stats:
+            stats[key] = [0, 0, 0.0, 0.0, {}]
+        return key, stats[key]
+
+    for stack, count in samples.items():
+        seen = set()
+        for index, code in enumerate(stack):
+            key, data = entry(code)
+            if key not in seen:  # Recursion counts once towards cumulative time
+                seen.add(key)
+                data[0] += count
+                data[1] += count
+                data[3] += count * interval
+            if index:
+                caller = entry(stack[index - 1])[0]
+                data[4][caller] = data[4].get(caller, 0) + count
+        entry(stack[-1])[1][2] += count * interval
+    return {key: tuple(data) for key, data in stats.items()}
+
+
+def allocation_report(before, after, limit: int = TOP_ALLOCATIONS) -> str:
+    """The lines whose allocations grew most between two tracemalloc snapshots."""
+    lines = [f"Top {limit} allocation sites by net size"]
+    for stat in after.compare_to(before, "lineno")[:limit]:
+        lines.append(str(stat))
+    return "\n".join(lines) + "\n"
+
+
+def write_profile(directory: str, profile_id: str, profiler: SamplingProfiler, allocations: str,
+                  meta: Dict[str, str]) -> List[str]:
+    """Write a request's profile files and return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+    header = "".join(f"# {key}: {value}\n" for key, value in meta.items())
+    with open(f"{base}.collapsed", "w", encoding="utf-8") as stream:
+        stream.write(collapsed_stacks(profiler.samples))
+    with open(f"{base}.pstats", "wb") as stream:
+        marshal.dump(pstats_data(profiler.samples, profiler.interval), stream)
+    with open(f"{base}.alloc.txt", "w", encoding="utf-8") as stream:
+        stream.write(header + allocations)
+    return [f"{base}.collapsed", f"{base}.pstats", f"{base}.alloc.txt"]
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests that carry the admin token."""
+
+    def __init__(self, app, token: Optional[str] = None, directory: Optional[str] = None,
+                 interval: Optional[float] = None):
+        self.app = app
+        self.token = (token or PROFILE_TOKEN or "").encode()
+        self.directory = directory or PROFILE_DIR
+        self.interval = interval or SAMPLE_INTERVAL
+        self._busy = threading.Lock()
+
+    def _requested(self, scope) -> bool:
+        supplied = next((value for name, value in scope["headers"] if name == HEADER), None)
+        if supplied is None and b"profile=" in scope.get("query_string", b""):
+            supplied = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0].encode("latin-1")
+        return supplied is not None and bool(self.token) and hmac.compare_digest(supplied, self.token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:16]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started_tracing = not tracemalloc.is_tracing()
+        try:
+            if started_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            before = tracemalloc.take_snapshot()
+            profiler = SamplingProfiler(sys._getframe(), scope, self.interval)
+            start = time.perf_counter()
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.stop()
+                seconds = time.perf_counter() - start
+                allocations = allocation_report(before, tracemalloc.take_snapshot())
+                _, peak = tracemalloc.get_traced_memory()
+                meta = {
+                    "request": f"{scope['method']} {scope['path']}",
+                    "seconds": f"{seconds:.4f}",
+                    "samples": str(sum(profiler.samples.values())),
+                    "peak_traced_bytes": str(peak),
+                }
+                write_profile(self.directory, profile_id, profiler, allocations, meta)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._busy.release()
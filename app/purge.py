@@ -0,0 +1,61 @@
+"""Purging the cards of large deleted columns in the background.
+
+Deleting a column with more than ``SOFT_DELETE_THRESHOLD`` cards only sets
+its ``deleted_at``: the column and its cards disappear from every listing at
+once, and ``purge_deleted_columns`` deletes the cards ``PURGE_BATCH_SIZE`` at
+a time, committing after each chunk so other writers are not locked out for
+the whole delete, and finally the column itself.  Columns left half purged,
+e.g. by a restart, are picked up by the next purge.
+"""
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from .models import BoardColumn, Card
+
+# Columns with more cards than this are soft-deleted and purged in chunks.
+SOFT_DELETE_THRESHOLD = 10000
+
+# Cards deleted per transaction by the purge.
+PURGE_BATCH_SIZE = 5000
+
+
+def is_large(db, column_id: int) -> bool:
+    """Whether a column has more than ``SOFT_DELETE_THRESHOLD`` cards.
+
+    Reads at most that many index entries instead of counting the column.
+    """
+    statement = select(Card.id).where(Card.column_id == column_id).offset(SOFT_DELETE_THRESHOLD).limit(1)
+    return db.execute(statement).first() is not None
+
+
+def purge_column(db, column_id: int, batch_size: Optional[int] = None) -> int:
+    """Delete a column's cards in chunks, committing after each, then the column.
+
+    Returns the number of cards deleted.
+    """
+    batch_size = batch_size or PURGE_BATCH_SIZE
+    chunk = select(Card.id).where(Card.column_id == column_id).limit(batch_size).scalar_subquery()
+    purged = 0
+    while True:
+        deleted = db.execute(
+            delete(Card).where(Card.id.in_(chunk)), execution_options={"synchronize_session": False}
+        ).rowcount
+        db.commit()
+        purged += deleted
+        if deleted < batch_size:
+            break
+    db.execute(
+        delete(BoardColumn).where(BoardColumn.id == column_id), execution_options={"synchronize_session": False}
+    )
+    db.commit()
+    return purged
+
+
+def purge_deleted_columns(bind, batch_size: Optional[int] = None) -> int:
+    """Purge every soft-deleted column in its own session; returns the number of cards deleted."""
+    with Session(bind=bind) as db:
+        column_ids = list(db.execute(select(BoardColumn.id).where(BoardColumn.deleted_at.isnot(None))).scalars())
+        return sum(purge_column(db, column_id, batch_size) for column_id in column_ids)
+
@@ -0,0 +1,225 @@
+"""Read-only list queries that return plain rows instead of ORM objects.
+
+Loading a list through ``db.query(Model)`` builds an identity-mapped,
+change-tracked object per row only to read its attributes once.  These helpers
+select just the needed columns with Core and return plain dicts, ready to be
+cached and encoded.  Like ``app.ranking`` they take the model as a parameter,
+so both apps share them.
+"""
+import base64
+import binascii
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, tuple_
+
+from . import ranking
+
+COLUMN_FIELDS = ("id", "title", "position", "color")
+CARD_FIELDS = ("id", "title", "description", "column_id", "position", "color")
+
+# Largest page of cards a client may request.
+MAX_PAGE_SIZE = 500
+
+# Rows fetched from the database per chunk of a streamed listing.
+STREAM_CHUNK_SIZE = 1000
+
+
+def fetch_dicts(db, statement, fields: Sequence[str]) -> List[dict]:
+    """Execute a Core select and return its rows as dicts keyed by ``fields``."""
+    return [dict(zip(fields, row)) for row in db.execute(statement)]
+
+
+def live(model) -> tuple:
+    """Return the criteria excluding soft-deleted rows, for models that have them."""
+    deleted_at = getattr(model, "deleted_at", None)
+    return () if deleted_at is None else (deleted_at.is_(None),)
+
+
+def deleted_column_ids(db, model) -> List[int]:
+    """Return the soft-deleted columns whose cards are still being purged."""
+    if getattr(model, "deleted_at", None) is None:
+        return []
+    return list(db.execute(select(model.id).where(model.deleted_at.isnot(None))).scalars())
+
+
+def column_rows(db, model, fields: Sequence[str] = COLUMN_FIELDS) -> List[dict]:
+    """Return the columns ordered by position."""
+    statement = select(*(getattr(model, f) for f in fields)).where(*live(model)).order_by(model.position)
+    return fetch_dicts(db, statement, fields)
+
+
+def card_rows_statement(model, fields: Sequence[str] = CARD_FIELDS, column_ids: Optional[Iterable[int]] = None,
+                        hidden_column_ids: Sequence[int] = ()):
+    """Select cards ordered by column, then by position or rank.
+
+    Cards of ``hidden_column_ids``, e.g. columns being purged, are left out.
+    """
+    statement = select(*(getattr(model, f) for f in fields))
+    if column_ids is not None:
+        statement = statement.where(model.column_id.in_(list(column_ids)))
+    if hidden_column_ids:
+        statement = statement.where(model.column_id.notin_(list(hidden_column_ids)))
+    return statement.order_by(model.column_id, ranking.order_column(model), model.id)
+
+
+def card_rows(db, model, fields: Sequence[str] = CARD_FIELDS, column_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    """Return cards ordered by column, then by position or rank."""
+    return fetch_dicts(db, card_rows_statement(model, fields, column_ids), fields)
+
+
+# Streaming
+#
+# A streamed listing fetches the cards in chunks of STREAM_CHUNK_SIZE rows
+# (``yield_per``), so only one chunk is in memory however large the board is.
+
+
+class ChunkShaper:
+    """Turns chunks of card rows into dicts, numbering rank-mode positions across chunks."""
+
+    def __init__(self, fields: Sequence[str] = CARD_FIELDS):
+        self.fields = fields
+        self.rank_mode = ranking.rank_mode()
+        self.column, self.index = None, -1
+
+    def __call__(self, rows) -> List[dict]:
+        chunk = [dict(zip(self.fields, row)) for row in rows]
+        if self.rank_mode:
+            for card in chunk:
+                self.index = self.index + 1 if card["column_id"] == self.column else 0
+                self.column = card["column_id"]
+                card["position"] = self.index
+        return chunk
+
+
+def streamed_cards_statement(model, fields: Sequence[str] = CARD_FIELDS, column_id: Optional[int] = None,
+                             chunk_size: Optional[int] = None, hidden_column_ids: Sequence[int] = ()):
+    """Select cards for streaming, fetched ``chunk_size`` rows at a time."""
+    statement = card_rows_statement(model, fields, None if column_id is None else [column_id], hidden_column_ids)
+    return statement.execution_options(yield_per=chunk_size or STREAM_CHUNK_SIZE)
+
+
+def iter_card_chunks(db, model, fields: Sequence[str] = CARD_FIELDS, column_id: Optional[int] = None,
+                     chunk_size: Optional[int] = None,
+                     hidden_column_ids: Sequence[int] = ()) -> Iterator[List[dict]]:
+    """Yield the cards in column order as lists of at most ``chunk_size`` dicts."""
+    shape = ChunkShaper(fields)
+    result = db.execute(streamed_cards_statement(model, fields, column_id, chunk_size, hidden_column_ids))
+    for rows in result.partitions():
+        yield shape(rows)
+
+
+def isoformat_fields(rows: List[dict], fields: Sequence[str]) -> List[dict]:
+    """Convert datetime values of ``fields`` to ISO strings in place."""
+    for row in rows:
+        for field in fields:
+            if row[field] is not None:
+                row[field] = row[field].isoformat()
+    return rows
+
+
+# Keyset pagination
+#
+# Cards are paged in (column_id, sort key, id) order, where the sort key is the
+# position or, in rank mode, the rank.  A cursor holds those values for the
+# last card of a page, so the next page is an index range scan that costs the
+# same however deep into a column it starts.  It also holds the card's index
+# in its column, which is the position reported in rank mode.
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that is malformed or from another ordering mode."""
+
+
+def encode_cursor(column_id: int, key, card_id: int, index: int) -> str:
+    """Return an opaque cursor pointing after the given card."""
+    raw = json.dumps([column_id, key, card_id, index, ranking.ORDERING_MODE], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, object, int, int]:
+    """Return ``(column_id, key, card_id, index)`` from a cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        column_id, key, card_id, index, mode = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    key_type = str if ranking.rank_mode() else int
+    if mode != ranking.ORDERING_MODE or not all(isinstance(v, int) for v in (column_id, card_id, index)) \
+            or not isinstance(key, key_type):
+        raise InvalidCursor("Invalid cursor")
+    return column_id, key, card_id, index
+
+
+def card_page(db, model, limit: int, cursor: Optional[str] = None, column_id: Optional[int] = None,
+              fields: Sequence[str] = CARD_FIELDS,
+              hidden_column_ids: Sequence[int] = ()) -> Tuple[List[dict], Optional[str]]:
+    """Return up to ``limit`` cards after ``cursor`` and the next page's cursor.
+
+    The next cursor is None on the last page.  With ``column_id`` only that
+    column is paged, otherwise cards of ``hidden_column_ids`` are skipped.
+    """
+    key = ranking.order_column(model)
+    statement = select(*(getattr(model, f) for f in fields), key)
+    after = decode_cursor(cursor) if cursor else None
+    if column_id is not None:
+        if after is not None and after[0] != column_id:
+            raise InvalidCursor("Cursor belongs to another column")
+        statement = statement.where(model.column_id == column_id)
+        if after is not None:
+            # Equality plus a row value on the rest keeps this an index range seek
+            statement = statement.where(tuple_(key, model.id) > tuple_(after[1], after[2]))
+    else:
+        if after is not None:
+            statement = statement.where(tuple_(model.column_id, key, model.id) > tuple_(*after[:3]))
+        if hidden_column_ids:
+            statement = statement.where(model.column_id.notin_(list(hidden_column_ids)))
+    statement = statement.order_by(model.column_id, key, model.id).limit(limit + 1)
+    rows = db.execute(statement).all()
+
+    page, next_cursor = [], None
+    column, index = (after[0], after[3]) if after else (None, -1)
+    for row in rows[:limit]:
+        card = dict(zip(fields, row))
+        index = index + 1 if card["column_id"] == column else 0
+        column = card["column_id"]
+        if ranking.rank_mode():
+            # Ranks only order cards; the position is the index in the column.
+            card["position"] = index
+        page.append(card)
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(column, last[-1], page[-1]["id"], index)
+    return page, next_cursor
+
+
+def first_cards_per_column(db, model, column_ids: Iterable[int], limit: int,
+                           fields: Sequence[str] = CARD_FIELDS) -> Tuple[List[dict], Dict[int, Optional[str]]]:
+    """Return the first ``limit`` cards of every column and each column's next cursor."""
+    cards, cursors = [], {}
+    for column_id in column_ids:
+        page, cursors[column_id] = card_page(db, model, limit, column_id=column_id, fields=fields)
+        cards.extend(page)
+    return cards, cursors
+
+
+def paged_cards(db, card_model, column_model, limit: Optional[int] = None, cursor: Optional[str] = None,
+                per_column: Optional[int] = None, column_id: Optional[int] = None,
+                fields: Sequence[str] = CARD_FIELDS) -> Tuple[List[dict], Dict[str, str]]:
+    """Return a page of cards and the response headers pointing to the next ones.
+
+    ``limit`` pages through the cards (of one column with ``column_id``) and
+    sets ``X-Next-Cursor``.  ``per_column`` returns the first cards of every
+    column and lists the columns with more cards in ``X-Next-Cursors`` as
+    comma-separated ``column_id:cursor`` pairs.
+    """
+    if per_column:
+        column_ids = [column_id] if column_id is not None else list(db.execute(
+            select(column_model.id).where(*live(column_model)).order_by(column_model.position)
+        ).scalars())
+        cards, cursors = first_cards_per_column(db, card_model, column_ids, per_column, fields)
+        pairs = ",".join(f"{column}:{next_cursor}" for column, next_cursor in cursors.items() if next_cursor)
+        return cards, {"X-Next-Cursors": pairs} if pairs else {}
+    hidden = deleted_column_ids(db, column_model) if column_id is None else ()
+    cards, next_cursor = card_page(db, card_model, limit, cursor, column_id, fields, hidden)
+    return cards, {"X-Next-Cursor": next_cursor} if next_cursor else {}
@@ -0,0 +1,243 @@
+"""Rank-based card ordering.
+
+In ``rank`` mode every card carries a lexicographically sortable string key.
+Moving a card only rewrites that card: its new key is generated between the
+keys of its new neighbours.  Keys grow a little each time cards are squeezed
+into the same gap, so columns are occasionally rebalanced in the background.
+"""
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+# "position" keeps the classic integer ordering, "rank" enables string ranks.
+ORDERING_MODE = os.getenv("KANBAN_ORDERING", "position")
+
+# Digits in ASCII order, so SQLite's BINARY collation sorts ranks correctly.
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Ranks longer than this trigger a background rebalance of their column.
+MAX_RANK_LENGTH = 24
+
+
+def rank_mode() -> bool:
+    """Return True when cards are ordered by rank instead of position."""
+    return ORDERING_MODE == "rank"
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """Return a rank that sorts strictly between ``before`` and ``after``.
+
+    ``None`` means there is no neighbour on that side.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Invalid rank bounds: {before!r} >= {after!r}")
+
+    low = before or ""
+    high = after
+    digits = []
+    i = 0
+    while True:
+        low_digit = DIGITS.index(low[i]) if i < len(low) else 0
+        if high is None:
+            high_digit = BASE
+        elif i < len(high):
+            high_digit = DIGITS.index(high[i])
+        else:
+            raise ValueError(f"No rank fits between {before!r} and {after!r}")
+
+        if high_digit - low_digit > 1:
+            digits.append(DIGITS[(low_digit + high_digit) // 2])
+            return "".join(digits)
+
+        digits.append(DIGITS[low_digit])
+        if high_digit - low_digit == 1:
+            # The prefix is now below ``high``, so it no longer bounds us.
+            high = None
+        i += 1
+
+
+def ranks_between(before: Optional[str], after: Optional[str], count: int) -> List[str]:
+    """Return ``count`` increasing ranks between ``before`` and ``after``."""
+    ranks = []
+    for _ in range(count):
+        before = rank_between(before, after)
+        ranks.append(before)
+    return ranks
+
+
+def spaced_ranks(count: int) -> List[str]:
+    """Return ``count`` short, evenly spaced ranks."""
+    width = 1
+    while BASE ** width <= count * 2:
+        width += 1
+    step = BASE ** width // (count + 1)
+
+    ranks = []
+    for i in range(1, count + 1):
+        value = step * i
+        chars = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            chars.append(DIGITS[digit])
+        # Trailing zeros never change the sort order but leave no room after them.
+        ranks.append("".join(reversed(chars)).rstrip("0"))
+    return ranks
+
+
+def spaced_ranks_between(before: Optional[str], after: Optional[str], count: int) -> List[str]:
+    """Return ``count`` evenly spaced, increasing ranks between ``before`` and ``after``.
+
+    Unlike ``ranks_between`` the ranks do not grow with ``count``, so a whole
+    block of cards fits into one gap.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Invalid rank bounds: {before!r} >= {after!r}")
+    width = max(len(before or ""), len(after or ""), 1)
+    while True:
+        low = _rank_value(before or "", width)
+        high = _rank_value(after, width) if after is not None else BASE ** width
+        if high - low > count:
+            step = (high - low) // (count + 1)
+            return [_rank_string(low + step * i, width) for i in range(1, count + 1)]
+        width += 1
+
+
+def _rank_value(rank: str, width: int) -> int:
+    value = 0
+    for char in rank.ljust(width, "0")[:width]:
+        value = value * BASE + DIGITS.index(char)
+    return value
+
+
+def _rank_string(value: int, width: int) -> str:
+    chars = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        chars.append(DIGITS[digit])
+    return "".join(reversed(chars)).rstrip("0")
+
+
+def needs_rebalance(rank: str) -> bool:
+    """Return True once a rank has grown long enough to rebalance."""
+    return len(rank) > MAX_RANK_LENGTH
+
+
+def order_column(model):
+    """Return the column cards of ``model`` are sorted by."""
+    return model.rank if rank_mode() else model.position
+
+
+def rank_for_position(db, model, column_id: int, position: int, exclude_id: Optional[int] = None) -> str:
+    """Return a rank placing a card at ``position`` within a column.
+
+    Only the two neighbouring rows are read; nothing else is written.
+    """
+    exclude_ids = () if exclude_id is None else (exclude_id,)
+    return rank_between(*neighbour_ranks(db, model, column_id, position, exclude_ids))
+
+
+def neighbour_ranks(db, model, column_id: int, position: int,
+                    exclude_ids: Iterable[int] = ()) -> Tuple[Optional[str], Optional[str]]:
+    """Return the ranks of the cards before and after ``position`` in a column.
+
+    Cards in ``exclude_ids``, e.g. the ones being moved, are not counted.
+    """
+    exclude_ids = list(exclude_ids)
+    query = db.query(model.rank).filter(model.column_id == column_id)
+    if exclude_ids:
+        query = query.filter(model.id.notin_(exclude_ids))
+    query = query.order_by(model.rank)
+
+    first = query.first()
+    if first is not None and first.rank is None:
+        # NULLs sort first: the column still holds cards from position mode.
+        rebalance_column(db, model, column_id)
+
+    position = max(position, 0)
+    neighbours = [row.rank for row in query.offset(max(position - 1, 0)).limit(2)]
+
+    if position == 0:
+        before, after = None, (neighbours[0] if neighbours else None)
+    else:
+        before = neighbours[0] if neighbours else None
+        after = neighbours[1] if len(neighbours) > 1 else None
+    if before is None and position > 0:
+        # Position is past the end of the column; append after the last card.
+        before = last_rank(db, model, column_id, exclude_ids)
+    return before, after
+
+
+def last_rank(db, model, column_id: int, exclude_ids: Iterable[int] = ()) -> Optional[str]:
+    """Return the highest rank in a column.
+
+    A column still holding cards from position mode is rebalanced first, so
+    a rank after the result also sorts after those cards.
+    """
+    unranked = db.query(model.id).filter(model.column_id == column_id, model.rank.is_(None))
+    if unranked.first() is not None:
+        rebalance_column(db, model, column_id)
+    return _max_rank(db, model, column_id, exclude_ids)
+
+
+def _max_rank(db, model, column_id: int, exclude_ids: Iterable[int] = ()) -> Optional[str]:
+    query = db.query(func.max(model.rank)).filter(model.column_id == column_id)
+    exclude_ids = list(exclude_ids)
+    if exclude_ids:
+        query = query.filter(model.id.notin_(exclude_ids))
+    return query.scalar()
+
+
+def rebalance_column(db, model, column_id: int) -> int:
+    """Reassign short, evenly spaced ranks to every card in a column.
+
+    The cards keep the order reads serve them in: SQLite sorts NULLs first,
+    so cards without a rank come before the ranked ones, in ``position``
+    order.  Integer positions are refreshed at the same time.
+    Returns the number of cards rewritten.
+    """
+    ids = [
+        row.id
+        for row in db.query(model.id)
+        .filter(model.column_id == column_id)
+        .order_by(model.rank.is_not(None), model.rank, model.position, model.id)
+    ]
+    if not ids:
+        return 0
+    db.execute(
+        update(model),
+        [
+            {"id": card_id, "rank": rank, "position": index}
+            for index, (card_id, rank) in enumerate(zip(ids, spaced_ranks(len(ids))))
+        ],
+    )
+    return len(ids)
+
+
+def rank_appended(db, model, column_id: int, last: Optional[str]) -> int:
+    """Rank the cards appended to a column without a rank after ``last``, in ``position`` order.
+
+    ``last`` is the column's ``last_rank`` from before the cards were added.
+    Returns the number of cards ranked.
+    """
+    ids = [
+        row.id
+        for row in db.query(model.id)
+        .filter(model.column_id == column_id, model.rank.is_(None))
+        .order_by(model.position, model.id)
+    ]
+    if ids:
+        db.execute(
+            update(model),
+            [{"id": card_id, "rank": rank} for card_id, rank in zip(ids, spaced_ranks_between(last, None, len(ids)))],
+        )
+    return len(ids)
+
+
+def rebalance_column_task(bind, model, column_id: int) -> None:
+    """Rebalance a column in its own session, e.g. from a background task."""
+    with Session(bind=bind) as db:
+        rebalance_column(db, model, column_id)
+        db.commit()
@@ -0,0 +1,106 @@
+"""Fast JSON responses for the list endpoints.
+
+FastAPI validates a returned value against the route's ``response_model`` and
+walks it with ``jsonable_encoder`` before encoding it.  The board's rows are
+already shaped as plain dicts of JSON types (see ``app.cache``), so the list
+endpoints return them in a ``FastJSONResponse`` instead, which skips both steps
+and encodes with orjson when it is installed.  The wire format stays the same.
+
+Listings too large to hold in memory are streamed instead: ``stream_response``
+encodes chunks of rows as they are fetched, as one JSON array or as NDJSON.
+"""
+import json
+from typing import Any, AsyncIterable, Iterable, List, Union
+
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the standard library encoder is used instead
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-ready content as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for content that is already made of plain JSON types."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_body_response(body: bytes, headers: dict = None) -> Response:
+    """Return an already encoded JSON body."""
+    return Response(body, media_type="application/json", headers=headers)
+
+
+class ArrayEncoder:
+    """Encodes chunks of rows as the items of a single JSON array."""
+
+    media_type = "application/json"
+
+    def __init__(self):
+        self.first = True
+
+    def head(self) -> bytes:
+        return b"["
+
+    def chunk(self, rows: List[Any]) -> bytes:
+        if not rows:
+            return b""
+        body = b",".join(dumps(row) for row in rows)
+        if self.first:
+            self.first = False
+            return body
+        return b"," + body
+
+    def tail(self) -> bytes:
+        return b"]"
+
+
+class NDJSONEncoder:
+    """Encodes chunks of rows as newline-delimited JSON, one row per line."""
+
+    media_type = "application/x-ndjson"
+
+    def head(self) -> bytes:
+        return b""
+
+    def chunk(self, rows: List[Any]) -> bytes:
+        return b"".join(dumps(row) + b"\n" for row in rows)
+
+    def tail(self) -> bytes:
+        return b""
+
+
+STREAM_ENCODERS = {"json": ArrayEncoder, "ndjson": NDJSONEncoder}
+
+
+def stream_response(chunks: Union[Iterable[List[Any]], AsyncIterable[List[Any]]], format: str = "json",
+                    headers: dict = None) -> StreamingResponse:
+    """Stream chunks of JSON-ready rows as they are produced.
+
+    The opening bytes go out before the first chunk is fetched, and only one
+    chunk is held in memory at a time.
+    """
+    encoder = STREAM_ENCODERS[format]()
+
+    if hasattr(chunks, "__aiter__"):
+        async def body():
+            yield encoder.head()
+            async for rows in chunks:
+                yield encoder.chunk(rows)
+            yield encoder.tail()
+    else:
+        def body():
+            yield encoder.head()
+            for rows in chunks:
+                yield encoder.chunk(rows)
+            yield encoder.tail()
+
+    return StreamingResponse(body(), media_type=encoder.media_type, headers=headers)
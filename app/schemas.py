@@ -0,0 +1,72 @@
+"""Pydantic schemas shared by the sync and async API."""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, Union
+
+
+class ColumnCreate(BaseModel):
+    title: str
+    color: Optional[str] = "#e9e9e7"
+
+
+class ColumnResponse(BaseModel):
+    id: int
+    title: str
+    position: int
+    color: str
+    
+    class Config:
+        orm_mode = True
+
+
+class CardCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    column_id: int
+    color: Optional[str] = "#ffffff"
+
+
+class CardUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    column_id: Optional[int] = None
+    position: Optional[int] = None
+    color: Optional[str] = None
+
+
+class CardMove(BaseModel):
+    column_id: int
+    position: int
+
+
+class CardsMove(BaseModel):
+    card_ids: List[int] = Field(..., min_items=1, max_items=10000)
+    column_id: int
+    position: Optional[int] = None  # None appends the cards to the column
+
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "move", "delete"]
+    entity: Literal["card", "column"]
+    id: Optional[Union[int, str]] = None  # "$n" is the id operation n returned
+    data: Dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_items=1, max_items=1000)
+
+
+class CardResponse(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+    column_id: int
+    position: int
+    color: str
+    
+    class Config:
+        orm_mode = True
+
+
+def card_data(card) -> dict:
+    """Serialize a card the way the card endpoints return it."""
+    return CardResponse.from_orm(card).dict()
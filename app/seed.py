@@ -0,0 +1,206 @@
+"""Deterministic synthetic boards for benchmarks and scaling tests.
+
+``seed_board`` appends ``columns`` columns of ``cards_per_column`` cards to
+a board.  Titles, descriptions and tags come from ``random.Random(seed)``,
+so the same arguments always produce the same rows.  Description lengths
+follow ``description_sizes``, a weighted choice of sizes in characters, and
+each card gets up to ``tags_per_card`` tags from a vocabulary of ``tags``
+names, the first names being the most used, when the tag tables are given.
+
+The cards go in ``BATCH_SIZE`` rows per multi-row INSERT, sent to the driver
+as is: building the statement once and skipping SQLAlchemy's per-row
+parameter processing is what keeps a million cards well under a minute.
+The transaction is committed every ``COMMIT_EVERY`` statements, each commit
+recording one ``board`` change like an import.
+"""
+import random
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, select
+
+from . import changes, queries, ranking
+
+# Rows per INSERT statement, capped by SQLite's limit of bound parameters.
+BATCH_SIZE = 2000
+MAX_PARAMETERS = 32766
+
+# Statements per transaction.
+COMMIT_EVERY = 100
+
+# Description size in characters: weight
+DEFAULT_DESCRIPTION_SIZES = {0: 20, 80: 50, 400: 25, 2000: 5}
+
+DEFAULT_TAGS_PER_CARD = 3
+
+WORDS = (
+    "api auth backend bug cache checkout client config customer dashboard data deploy design docs email "
+    "error export feature flow form frontend image import index invoice layout login metrics migration "
+    "mobile modal onboarding page payment performance permission pipeline profile query release report "
+    "review search security server settings signup storage sync test theme upload user webhook"
+).split()
+COLORS = ("#ffffff", "#ffeaa7", "#81ecec", "#fab1a0", "#a29bfe", "#55efc4")
+
+
+def parse_sizes(text: str) -> Dict[int, int]:
+    """Parse ``size=weight,...`` as given on the command line."""
+    sizes = {}
+    for part in text.split(","):
+        size, _, weight = part.partition("=")
+        sizes[int(size)] = int(weight or 1)
+    return sizes
+
+
+def tag_vocabulary(count: int) -> List[str]:
+    """``count`` distinct tag names, words first and then numbered words."""
+    return [WORDS[i % len(WORDS)] + (f"-{i // len(WORDS)}" if i >= len(WORDS) else "") for i in range(count)]
+
+
+class _Inserter:
+    """Multi-row INSERTs of a table's columns, built once and run on the DBAPI cursor."""
+
+    def __init__(self, db, table, keys: Sequence[str], batch_size: int):
+        self.db = db
+        connection = db.connection()
+        self.keys = list(keys)
+        self.batch_size = max(1, min(batch_size, MAX_PARAMETERS // len(self.keys)))
+        placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+        self.row = "(" + ", ".join([placeholder] * len(self.keys)) + ")"
+        self.prefix = f"INSERT INTO {table.name} ({', '.join(self.keys)}) VALUES "
+        self.full = self.prefix + ", ".join([self.row] * self.batch_size)
+
+    def insert(self, rows: List[tuple]) -> None:
+        statement = self.full if len(rows) == self.batch_size else self.prefix + ", ".join([self.row] * len(rows))
+        # The session's current connection, so the rows join its transaction
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.execute(statement, [value for row in rows for value in row])
+        finally:
+            cursor.close()
+
+
+def _bound(db, column, value):
+    """``value`` as the driver stores it in ``column``, e.g. a datetime as text on SQLite."""
+    dialect = db.get_bind().dialect
+    processor = column.type.dialect_impl(dialect).bind_processor(dialect)
+    return processor(value) if processor else value
+
+
+def _text(rng: random.Random, corpus: str, size: int) -> Optional[str]:
+    if not size:
+        return None
+    # Between half and one and a half times the drawn size
+    length = rng.randint(size // 2 + 1, size * 3 // 2)
+    if length >= len(corpus):
+        # Longer than the corpus: repeat it
+        corpus *= length // len(corpus) + 1
+    start = rng.randrange(len(corpus) - length)
+    return corpus[start:start + length]
+
+
+def seed_board(db, column_model, card_model, change_model=None, *, columns: int = 5, cards_per_column: int = 1000,
+               description_sizes: Optional[Dict[int, int]] = None, tags: int = 0,
+               tags_per_card: int = DEFAULT_TAGS_PER_CARD, tag_model=None, card_tag_model=None, seed: int = 0,
+               batch_size: Optional[int] = None, commit_every: Optional[int] = None) -> dict:
+    """Append a synthetic board and commit it.
+
+    Tags are only written when ``tag_model`` and ``card_tag_model`` are
+    given; their ``card_count`` is set, other maintained counters are left
+    to the caller.  In rank mode the cards get evenly spaced ranks.  Returns
+    the number of columns, cards, tags and tag links created.
+    """
+    sizes = description_sizes or DEFAULT_DESCRIPTION_SIZES
+    batch_size = batch_size or BATCH_SIZE
+    commit_every = commit_every or COMMIT_EVERY
+    rng = random.Random(seed)
+    corpus = " ".join(rng.choice(WORDS) for _ in range(20_000))
+    size_values, size_weights = list(sizes), list(accumulate(sizes.values()))
+
+    first_position = db.query(func.count(column_model.id)).filter(*queries.live(column_model)).scalar()
+    new_columns = [column_model(title=f"Column {first_position + i + 1}", position=first_position + i)
+                   for i in range(columns)]
+    db.add_all(new_columns)
+    db.flush()
+    column_ids = [column.id for column in new_columns]
+
+    table = card_model.__table__
+    now = _bound(db, table.c.created_at, datetime.utcnow())
+    inserter = _Inserter(db, table, (
+        "title", "description", "column_id", "position", "rank", "color", "created_at", "updated_at",
+    ), batch_size)
+    statements, inserted, rows, pending = 0, 0, [], True
+
+    def flush_rows() -> None:
+        nonlocal statements, inserted, pending
+        if rows:
+            inserter.insert(rows)
+            inserted += len(rows)
+            rows.clear()
+            statements += 1
+            pending = True
+            if statements % commit_every == 0:
+                commit()
+
+    def commit() -> None:
+        nonlocal pending
+        pending = False
+        if change_model is not None:
+            changes.record_change(db, change_model, "board", "seed", 0, {"cards": inserted, "columns": columns})
+        db.commit()
+
+    for column_id in column_ids:
+        ranks = ranking.spaced_ranks(cards_per_column) if ranking.rank_mode() else [None] * cards_per_column
+        for position, rank in enumerate(ranks):
+            title = " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize()
+            size = rng.choices(size_values, cum_weights=size_weights)[0]
+            rows.append((
+                title, _text(rng, corpus, size), column_id, position, rank, rng.choice(COLORS), now, now,
+            ))
+            if len(rows) == inserter.batch_size:
+                flush_rows()
+    flush_rows()
+
+    created_tags = links = 0
+    if tags and tag_model is not None and card_tag_model is not None:
+        created_tags, links = _seed_tags(db, card_model, tag_model, card_tag_model, column_ids, tags, tags_per_card,
+                                         random.Random(seed + 1), batch_size)
+        pending = True
+    if pending:
+        commit()
+    return {"columns": columns, "cards": inserted, "tags": created_tags, "card_tags": links}
+
+
+def _seed_tags(db, card_model, tag_model, card_tag_model, column_ids: Iterable[int], tags: int, tags_per_card: int,
+               rng: random.Random, batch_size: int):
+    """Tag the seeded cards, a few names being far more common than the rest."""
+    names = tag_vocabulary(tags)
+    existing = dict(db.execute(select(tag_model.name, tag_model.id).where(tag_model.name.in_(names))).all())
+    missing = [tag_model(name=name, card_count=0) for name in names if name not in existing]
+    db.add_all(missing)
+    db.flush()
+    existing.update((tag.name, tag.id) for tag in missing)
+    tag_ids = [existing[name] for name in names]
+    # Zipf-like popularity: the n-th tag is drawn 1/n as often as the first
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(tags)))
+
+    counts: Dict[int, int] = {}
+    inserter = _Inserter(db, card_tag_model.__table__, ("card_id", "tag_id"), batch_size)
+    card_ids = select(card_model.id).where(card_model.column_id.in_(list(column_ids))).order_by(card_model.id)
+    rows, links = [], 0
+    for card_id in db.execute(card_ids).scalars().all():
+        for tag_id in dict.fromkeys(rng.choices(tag_ids, cum_weights=cum_weights, k=rng.randint(0, tags_per_card))):
+            rows.append((card_id, tag_id))
+            counts[tag_id] = counts.get(tag_id, 0) + 1
+        if len(rows) >= inserter.batch_size:
+            inserter.insert(rows[:inserter.batch_size])
+            links += inserter.batch_size
+            del rows[:inserter.batch_size]
+    if rows:
+        inserter.insert(rows)
+        links += len(rows)
+    for tag_id, count in counts.items():
+        db.query(tag_model).filter(tag_model.id == tag_id).update(
+            {tag_model.card_count: tag_model.card_count + count}, synchronize_session=False
+        )
+    return len(missing), links
@@ -0,0 +1,129 @@
+"""Opt-in log of slow SQL statements with their SQLite query plans.
+
+Set ``KANBAN_SLOW_QUERY_MS`` to log every statement that takes longer than
+that many milliseconds to ``KANBAN_SLOW_QUERY_LOG`` (``slow_queries.log``),
+a file rotated at ``MAX_BYTES`` with ``BACKUP_COUNT`` old files kept.  Each
+entry is a JSON line with the statement, the shape of its parameters (types,
+never values), the duration, the route (when ``MetricsMiddleware`` tracks the
+request) and the app function that ran it and, on SQLite, the ``EXPLAIN
+QUERY PLAN`` output, where a ``SCAN`` of a table without an index is the
+usual culprit.
+
+Only statements over the threshold pay for more than a clock read.
+"""
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from . import metrics
+
+_threshold = os.getenv("KANBAN_SLOW_QUERY_MS")
+THRESHOLD_MS: Optional[float] = float(_threshold) if _threshold else None
+LOG_PATH = os.getenv("KANBAN_SLOW_QUERY_LOG", "slow_queries.log")
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+# Statements EXPLAIN QUERY PLAN can describe
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+# Frames of these modules are skipped when looking for the app code that ran a statement
+_SKIPPED_MODULES = ("app.slow_queries", "app.metrics")
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Describe parameters by type only, so no card content reaches the log."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def caller() -> Optional[str]:
+    """The innermost app function on the stack, as ``module:function:line``."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if (module.startswith("app.") or module == "advanced_kanban") and module not in _SKIPPED_MODULES:
+            return f"{module}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def query_plan(connection, statement: str, parameters) -> Optional[List[str]]:
+    """Return SQLite's plan for a statement, run on the connection that executed it."""
+    if connection.dialect.name != "sqlite" or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as error:  # The plan is a diagnostic; never fail the query for it
+        return [f"unavailable: {error}"]
+    finally:
+        cursor.close()
+
+
+def make_logger(path: str) -> logging.Logger:
+    """A logger writing bare JSON lines to a rotating file."""
+    logger = logging.getLogger(f"kanban.slow_queries.{os.path.abspath(path)}")
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def install(engine, threshold_ms: Optional[float] = None, path: Optional[str] = None) -> Optional[logging.Logger]:
+    """Log the statements of a sync or async engine slower than ``threshold_ms``.
+
+    Without a threshold, here or in ``KANBAN_SLOW_QUERY_MS``, nothing is
+    installed.  Returns the logger.
+    """
+    threshold_ms = THRESHOLD_MS if threshold_ms is None else threshold_ms
+    if threshold_ms is None:
+        return None
+    engine = getattr(engine, "sync_engine", engine)
+    logger = make_logger(path or LOG_PATH)
+    threshold = threshold_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("kanban_slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["kanban_slow_query_start"].pop()
+        if seconds < threshold:
+            return
+        request = metrics.current_request.get()
+        scope = request.scope if request is not None else None
+        logger.info(json.dumps({
+            "time": datetime.utcnow().isoformat(timespec="milliseconds"),
+            "duration_ms": round(seconds * 1000, 3),
+            "statement": statement,
+            "parameters": parameter_shape(parameters, executemany),
+            "route": f"{scope['method']} {metrics.route_template(scope)}" if scope else None,
+            "caller": caller(),
+            # An executemany plan is the plan of its first row
+            "plan": query_plan(conn, statement, list(parameters)[0] if executemany and parameters else parameters),
+        }))
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        connection = exception_context.connection
+        starts = connection.info.get("kanban_slow_query_start") if connection is not None else None
+        if starts:
+            starts.pop()
+
+    return logger
@@ -0,0 +1,39 @@
+"""Consistent board snapshots and ETag helpers."""
+import hashlib
+from typing import Optional
+
+
+def begin_read_snapshot(db) -> None:
+    """Start a read transaction so every following query sees the same data.
+
+    pysqlite only opens a transaction before writes, so consecutive SELECTs
+    would otherwise each see the latest committed state.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        return
+    connection = db.connection()
+    if not _in_transaction(connection.connection.dbapi_connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+def _in_transaction(dbapi_connection) -> bool:
+    # The aiosqlite adapter wraps the aiosqlite connection in ``_connection``.
+    driver = getattr(dbapi_connection, "_connection", dbapi_connection)
+    return driver.in_transaction
+
+
+def make_etag(body: bytes) -> str:
+    """Return a strong ETag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True when an ``If-None-Match`` header matches ``etag``."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,90 @@
+"""SQLite connection profile.
+
+SQLite's defaults favour durability over throughput: a rollback journal that
+blocks readers while a write commits, a full fsync on every commit and a small
+page cache.  The PRAGMAs of the selected profile are applied to every new
+connection through the engine's ``connect`` event.
+
+``KANBAN_SQLITE_PROFILE`` selects a profile ("wal" by default, "default" keeps
+SQLite's own settings), and ``KANBAN_SQLITE_<PRAGMA>`` overrides a single
+PRAGMA, e.g. ``KANBAN_SQLITE_SYNCHRONOUS=FULL``.
+
+Foreign keys are not a tuning knob: the schema relies on them to delete a
+column's cards, so they are enforced whatever the profile.
+"""
+import os
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+PROFILES: Dict[str, Dict[str, object]] = {
+    "default": {},
+    "wal": {
+        # Readers no longer wait for writers, and commits append to the WAL
+        "journal_mode": "WAL",
+        # With WAL, NORMAL only risks the last commits on power loss, never corruption
+        "synchronous": "NORMAL",
+        # Negative sizes are KiB: 64 MiB of page cache per connection
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+
+
+def sqlite_pragmas(profile: Optional[str] = None) -> Dict[str, object]:
+    """Return the PRAGMAs of ``profile`` with environment overrides applied."""
+    profile = profile or os.getenv("KANBAN_SQLITE_PROFILE", "wal")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}; expected one of {sorted(PROFILES)}")
+    pragmas = dict(PROFILES[profile])
+    for name in PRAGMAS:
+        value = os.getenv(f"KANBAN_SQLITE_{name.upper()}")
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+
+def enforce_foreign_keys(engine) -> None:
+    """Turn on foreign key enforcement for every new SQLite connection of ``engine``."""
+    engine = getattr(engine, "sync_engine", engine)
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA foreign_keys=ON")
+        finally:
+            cursor.close()
+
+
+def apply_sqlite_profile(engine, profile: Optional[str] = None) -> Dict[str, object]:
+    """Apply a SQLite profile to every new connection of ``engine``.
+
+    Accepts sync and async engines; other databases are left untouched.
+    Foreign keys are enforced with any profile, see ``enforce_foreign_keys``.
+    Returns the PRAGMAs that will be applied.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    if engine.dialect.name != "sqlite":
+        return {}
+    enforce_foreign_keys(engine)
+    pragmas = sqlite_pragmas(profile)
+    if not pragmas:
+        return pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return pragmas
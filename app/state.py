@@ -4,12 +4,42 @@ from typing import List, Optional
 import httpx
 
 
+def apply_change(columns: List[dict], cards: List[dict], change: dict):
+    """Replay a change feed entry on local copies of the columns and cards."""
+    data = change.get("data") or {}
+    if change["entity"] == "column":
+        if change["op"] == "delete":
+            columns = [c for c in columns if c["id"] != change["id"]]
+            cards = [c for c in cards if c["column_id"] != change["id"]]
+        else:
+            existing = next((c for c in columns if c["id"] == change["id"]), {})
+            columns = [c for c in columns if c["id"] != change["id"]] + [{**existing, **data}]
+            columns.sort(key=lambda c: c["position"])
+        return columns, cards
+    
+    existing = next((c for c in cards if c["id"] == change["id"]), {})
+    cards = [c for c in cards if c["id"] != change["id"]]
+    if change["op"] == "move":
+        # Shift neighbours exactly like the server did
+        for c in cards:
+            if (data["from_column_id"] != data["column_id"] and c["column_id"] == data["from_column_id"]
+                    and c["position"] > data["from_position"]):
+                c["position"] -= 1
+            if c["column_id"] == data["column_id"] and c["position"] >= data["position"]:
+                c["position"] += 1
+    if change["op"] != "delete":
+        cards.append({**existing, **{key: data[key] for key in data if not key.startswith("from_")}})
+    cards.sort(key=lambda c: (c["column_id"], c["position"]))
+    return columns, cards
+
+
 class State(rx.State):
     """State for the Kanban board."""
     
     # Data
     columns: List[dict] = []
     cards: List[dict] = []
+    version: int = 0  # Change feed version of the loaded data
     
     # UI State
     is_loading: bool = True
@@ -36,18 +66,42 @@ class State(rx.State):
         self.is_loading = True
         try:
             async with httpx.AsyncClient() as client:
+                # Load cards first: column changes replayed later are idempotent
+                cards_response = await client.get(f"{self.API_BASE}/cards")
+                self.cards = cards_response.json()
+                self.version = int(cards_response.headers.get("X-Board-Version", 0))
+                
                 # Load columns
                 columns_response = await client.get(f"{self.API_BASE}/columns")
                 self.columns = columns_response.json()
-                
-                # Load cards
-                cards_response = await client.get(f"{self.API_BASE}/cards")
-                self.cards = cards_response.json()
         except Exception as e:
             print(f"Error loading data: {e}")
         finally:
             self.is_loading = False
     
+    async def sync_changes(self):
+        """Apply the changes made since the last load instead of reloading."""
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{self.API_BASE}/changes", params={"since": self.version})
+                feed = response.json()
+        except Exception as e:
+            print(f"Error syncing changes: {e}")
+            return
+        
+        if feed["reset"]:
+            await self.load_data()
+            return
+        columns = [dict(c) for c in self.columns]
+        cards = [dict(c) for c in self.cards]
+        for change in feed["changes"]:
+            columns, cards = apply_change(columns, cards, change)
+        self.columns = columns
+        self.cards = cards
+        self.version = feed["version"]
+        if feed["has_more"]:
+            await self.sync_changes()
+    
     def get_cards_for_column(self, column_id: int) -> List[dict]:
         """Get all cards for a specific column."""
         return [card for card in self.cards if card["column_id"] == column_id]
@@ -107,8 +161,7 @@ class State(rx.State):
                         }
                     )
                 
-                # Reload data
-                await self.load_data()
+                await self.sync_changes()
                 self.close_card_modal()
             except Exception as e:
                 print(f"Error saving card: {e}")
@@ -118,7 +171,7 @@ class State(rx.State):
         async with httpx.AsyncClient() as client:
             try:
                 await client.delete(f"{self.API_BASE}/cards/{card_id}")
-                await self.load_data()
+                await self.sync_changes()
             except Exception as e:
                 print(f"Error deleting card: {e}")
     
@@ -144,7 +197,7 @@ class State(rx.State):
                     f"{self.API_BASE}/columns",
                     json={"title": self.new_column_title}
                 )
-                await self.load_data()
+                await self.sync_changes()
                 self.close_column_modal()
             except Exception as e:
                 print(f"Error creating column: {e}")
@@ -154,7 +207,7 @@ class State(rx.State):
         async with httpx.AsyncClient() as client:
             try:
                 await client.delete(f"{self.API_BASE}/columns/{column_id}")
-                await self.load_data()
+                await self.sync_changes()
             except Exception as e:
                 print(f"Error deleting column: {e}")
     
@@ -181,7 +234,7 @@ class State(rx.State):
                         "position": position
                     }
                 )
-                await self.load_data()
+                await self.sync_changes()
             except Exception as e:
                 print(f"Error moving card: {e}")
             finally:
@@ -0,0 +1,4 @@
+"""Benchmarks for the Kanban board backend.
+
+Run a benchmark as a module, e.g. ``python -m benchmarks.sqlite_profile``.
+"""
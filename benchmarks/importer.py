@@ -0,0 +1,88 @@
+"""Compare creating cards one request at a time with the bulk importer.
+
+The per-card path does what ``POST /api/cards`` does for every card: count
+the column, insert, record a change, commit and refresh.  It is timed on a
+sample and extrapolated; the importer loads the whole board from NDJSON.
+
+    python -m benchmarks.importer --cards 200000
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session
+
+from app import changes, importer
+from app.models import Base, BoardColumn, Card, Change
+from app.schemas import card_data
+from app.sqlite_profile import apply_sqlite_profile
+
+
+def per_card_path(engine, count: int, columns: int) -> float:
+    start = time.perf_counter()
+    with Session(engine) as db:
+        for i in range(count):
+            column_id = i % columns + 1
+            position = db.query(func.count(Card.id)).filter(Card.column_id == column_id).scalar()
+            card = Card(title=f"Card {i}", description="Imported", column_id=column_id, position=position)
+            db.add(card)
+            db.flush()
+            changes.record_change(db, Change, "card", "create", card.id, card_data(card))
+            db.commit()
+            db.refresh(card)
+    return time.perf_counter() - start
+
+
+def import_path(engine, count: int, columns: int) -> float:
+    body = "".join(
+        json.dumps({"title": f"Card {i}", "description": "Imported", "column": f"Column {i % columns}"}) + "\n"
+        for i in range(count)
+    )
+    start = time.perf_counter()
+    with Session(engine) as db:
+        importer.import_stream(db, Card, BoardColumn, Change, io.StringIO(body), "ndjson")
+    return time.perf_counter() - start
+
+
+def fresh_engine(directory: str, name: str, columns: int):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    apply_sqlite_profile(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([BoardColumn(title=f"Column {i}", position=i) for i in range(columns)])
+        db.commit()
+    return engine
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--sample", type=int, default=2000, help="cards created one at a time")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = fresh_engine(directory, "per_card.db", args.columns)
+        per_card = per_card_path(engine, args.sample, args.columns)
+        engine.dispose()
+        engine = fresh_engine(directory, "import.db", args.columns)
+        bulk = import_path(engine, args.cards, args.columns)
+        engine.dispose()
+
+    projected = per_card / args.sample * args.cards
+    print(json.dumps({
+        "cards": args.cards,
+        "per_card_sample": args.sample,
+        "per_card_projected_seconds": round(projected, 1),
+        "import_seconds": round(bulk, 2),
+        "import_cards_per_second": round(args.cards / bulk),
+        "speedup": round(projected / bulk, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
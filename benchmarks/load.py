@@ -0,0 +1,336 @@
+"""Load-test the apps over HTTP with a mix of reads and writes.
+
+Every app gets a fresh database seeded by ``app.seed`` with ``--cards``
+cards over ``--columns`` columns.  ``--concurrency`` clients then send a weighted mix of
+requests for ``--seconds`` (or ``--requests`` in all):
+
+- ``columns``: ``GET /api/columns``;
+- ``page``: ``GET /api/cards?column_id=...&limit=50``;
+- ``board``: ``GET /api/cards?per_column=20``;
+- ``create``, ``edit`` and ``move``: ``POST /api/cards``,
+  ``PUT /api/cards/{id}`` and ``PATCH /api/cards/{id}/move``.
+
+``--transport asgi`` calls the app in process through httpx's ASGI
+transport; ``--transport uvicorn`` starts ``uvicorn`` on a free port and
+goes through the network stack.  Every client draws from its own seeded
+random generator and edits and moves only seeded cards, so two runs send
+the same requests as long as ``--requests`` fixes their number: each client
+then sends its own fixed share of them, whichever client is faster.
+
+The JSON report holds ops/sec and p50/p95/p99 latencies, overall and per
+operation.  ``--baseline`` compares it with an earlier report and exits with
+status 1 if throughput dropped, or a p95 grew, by more than ``--tolerance``.
+
+    python -m benchmarks.load --cards 100000 --concurrency 8 --output load.json
+    python -m benchmarks.load --cards 100000 --concurrency 8 --baseline load.json
+    python -m benchmarks.load --app advanced --transport uvicorn --cards 1000000
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+import httpx
+
+# The apps read DATABASE_URL when imported, so they are only imported in the
+# process that measures them, once it points at that app's database.
+APPS = {"api": "app.api", "advanced": "advanced_kanban"}
+
+DEFAULT_MIX = "columns=10,page=35,board=10,create=15,edit=20,move=10"
+OPERATIONS = ("columns", "page", "board", "create", "edit", "move")
+
+PAGE_SIZE = 50
+BOARD_PER_COLUMN = 20
+# Moves land among the first cards of a column, where boards are edited
+MOVE_POSITIONS = 20
+# Tag vocabulary of the advanced app's board
+TAGS = 50
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse ``name=weight,...`` into operation weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS or not weight.strip().isdigit():
+            raise argparse.ArgumentTypeError(f"expected name=weight with a name in {', '.join(OPERATIONS)}: {part!r}")
+        mix[name.strip()] = int(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs a positive weight")
+    return mix
+
+
+def prepare(name: str, columns: int, cards: int, seed_value: int):
+    """Create the schema of an app in its empty database and seed it with ``app.seed``.
+
+    Returns the app and the number of cards seeded.
+    """
+    from app import seed
+
+    options = {"columns": columns, "cards_per_column": cards // columns, "seed": seed_value}
+    if name == "api":
+        from app import database
+
+        database.run_migrations()
+        result = database.seed_board(**options)
+        from app.api import app
+        return app, result["cards"]
+
+    import advanced_kanban
+
+    with advanced_kanban.get_db() as db:
+        result = seed.seed_board(
+            db, advanced_kanban.BoardColumn, advanced_kanban.Card, advanced_kanban.Change,
+            tag_model=advanced_kanban.Tag, card_tag_model=advanced_kanban.CardTag, tags=TAGS, **options,
+        )
+        advanced_kanban.recompute_stats(db)
+        advanced_kanban.rebuild_search_index(db)
+        db.commit()
+    return advanced_kanban.app, result["cards"]
+
+
+class Board:
+    """The columns and seeded cards the clients pick from.
+
+    Cards created under load are left out: their ids depend on how the
+    clients interleave, which would make the requests vary between runs.
+    """
+
+    def __init__(self, columns: int, cards: int):
+        self.column_ids = list(range(1, columns + 1))
+        self.card_ids = list(range(1, cards + 1))
+
+
+def request_for(operation: str, board: Board, rng: random.Random, client_id: int, sequence: int):
+    """The method, URL and JSON body of one operation."""
+    column_id = rng.choice(board.column_ids)
+    if operation == "columns":
+        return "GET", "/api/columns", None
+    if operation == "page":
+        return "GET", f"/api/cards?column_id={column_id}&limit={PAGE_SIZE}", None
+    if operation == "board":
+        return "GET", f"/api/cards?per_column={BOARD_PER_COLUMN}", None
+    if operation == "create":
+        title = f"Load {client_id}.{sequence}"
+        return "POST", "/api/cards", {"title": title, "description": "Created under load", "column_id": column_id}
+    card_id = rng.choice(board.card_ids)
+    if operation == "edit":
+        return "PUT", f"/api/cards/{card_id}", {"title": f"Edited {client_id}.{sequence}"}
+    return "PATCH", f"/api/cards/{card_id}/move", {"column_id": column_id, "position": rng.randrange(MOVE_POSITIONS)}
+
+
+async def run_client(client: httpx.AsyncClient, board: Board, mix: Dict[str, int], client_id: int, seed_value: int,
+                     deadline: float, budget: Optional[int], samples: Dict[str, List[float]],
+                     errors: Dict[str, int]):
+    """Send requests until the deadline, or until ``budget`` requests have been sent when it is given."""
+    rng = random.Random(seed_value * 1000 + client_id)
+    names, weights = list(mix), list(mix.values())
+    sequence = 0
+    while time.perf_counter() < deadline and (budget is None or sequence < budget):
+        operation = rng.choices(names, weights)[0]
+        method, url, body = request_for(operation, board, rng, client_id, sequence)
+        sequence += 1
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        samples[operation].append(time.perf_counter() - start)
+        if failed:
+            errors[operation] += 1
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)] if ordered else 0.0
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "ops_per_second": round(len(ordered) / seconds, 1),
+        **{f"p{p}_ms": round(percentile(ordered, p) * 1000, 2) for p in (50, 95, 99)},
+    }
+
+
+async def drive(client: httpx.AsyncClient, board: Board, options: dict) -> dict:
+    """Warm up, then run the clients and report their latencies."""
+    mix = options["mix"]
+    warmup_deadline = time.perf_counter() + options["warmup"]
+    ignored = ({name: [] for name in mix}, {name: 0 for name in mix})
+    await asyncio.gather(*(
+        run_client(client, board, mix, -1 - i, options["seed"], warmup_deadline, None, *ignored)
+        for i in range(options["concurrency"])
+    ))
+
+    samples = {name: [] for name in mix}
+    errors = {name: 0 for name in mix}
+    concurrency, requests = options["concurrency"], options["requests"]
+    # With --requests each client sends a fixed share, the first ones one more
+    # for the remainder; otherwise only the deadline stops the clients
+    budgets = [requests // concurrency + (i < requests % concurrency) if requests else None for i in range(concurrency)]
+    deadline = time.perf_counter() + (options["seconds"] if not requests else math.inf)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(client, board, mix, i, options["seed"], deadline, budgets[i], samples, errors)
+        for i in range(concurrency)
+    ))
+    seconds = time.perf_counter() - start
+
+    report = summarize([value for values in samples.values() for value in values], sum(errors.values()), seconds)
+    report["seconds"] = round(seconds, 2)
+    report["operations"] = {name: summarize(samples[name], errors[name], seconds) for name in mix if samples[name]}
+    return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+        try:
+            if (await client.get("/api/columns")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def measure_asgi(app, board: Board, options: dict) -> dict:
+    await app.router.startup()
+    try:
+        # Count an endpoint's exception as a 500 error, as uvicorn would answer it
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await drive(client, board, options)
+    finally:
+        await app.router.shutdown()
+
+
+async def measure_uvicorn(name: str, board: Board, options: dict) -> dict:
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", f"{APPS[name]}:app", "--port", str(port), "--log-level", "warning",
+    ])
+    limits = httpx.Limits(max_connections=options["concurrency"])
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client, server)
+            return await drive(client, board, options)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure(name: str, database: str, options: dict) -> dict:
+    """Seed a database for one app and load-test it; runs in its own process."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    start = time.perf_counter()
+    app, cards = prepare(name, options["columns"], options["cards"], options["seed"])
+    seed_seconds = time.perf_counter() - start
+    board = Board(options["columns"], cards)
+    if options["transport"] == "asgi":
+        report = asyncio.run(measure_asgi(app, board, options))
+    else:
+        report = asyncio.run(measure_uvicorn(name, board, options))
+    return {"seed_seconds": round(seed_seconds, 2), **report}
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Where ``report`` is slower than ``baseline`` by more than ``tolerance``."""
+    found = []
+
+    def compare(label: str, current: dict, previous: dict, throughput: bool = False) -> None:
+        if throughput and current["ops_per_second"] < previous["ops_per_second"] * (1 - tolerance):
+            found.append(f"{label}: {current['ops_per_second']} ops/s, was {previous['ops_per_second']}")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            found.append(f"{label}: p95 {current['p95_ms']} ms, was {previous['p95_ms']}")
+
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        # Per operation, ops/sec only restates the mix; their latencies are compared
+        compare(name, result, previous, throughput=True)
+        for operation, stats in result["operations"].items():
+            if operation in previous["operations"]:
+                compare(f"{name} {operation}", stats, previous["operations"][operation])
+    return found
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=[*APPS, "both"], default="both")
+    parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--requests", type=int, help="send this many requests instead of running for --seconds")
+    parser.add_argument("--warmup", type=float, default=1)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"operation weights, default {DEFAULT_MIX}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="an earlier report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    options = {
+        "transport": args.transport,
+        "cards": args.cards,
+        "columns": args.columns,
+        "concurrency": args.concurrency,
+        "seconds": args.seconds,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "mix": args.mix,
+        "seed": args.seed,
+    }
+    names = list(APPS) if args.app == "both" else [args.app]
+    report = {**options, "results": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names:
+            # A fresh interpreter per app, so each imports with its own DATABASE_URL
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                database = os.path.join(directory, f"{name}.db")
+                report["results"][name] = pool.submit(measure, name, database, options).result()
+
+    print(json.dumps(report))
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(report, stream, indent=2)
+    if args.baseline:
+        with open(args.baseline) as stream:
+            baseline = json.load(stream)
+        differences = [key for key in options if key in baseline and baseline[key] != options[key]]
+        if differences:
+            print(f"warning: the baseline ran with different {', '.join(differences)}", file=sys.stderr)
+        found = regressions(report, baseline, args.tolerance)
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare ORM and Core row fetching for the card list.
+
+The ORM path is what ``get_cards`` used to do: load every card as an ORM
+object and serialize it through ``CardResponse``.  The Core path is
+``app.queries.card_rows``.  Both produce the same list of dicts.
+
+    python -m benchmarks.queries --cards 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import queries, ranking
+from app.models import Base, BoardColumn, Card
+from app.schemas import card_data
+from app.seed import seed_board
+
+
+def seed(engine, columns: int, cards: int) -> None:
+    with Session(engine) as db:
+        seed_board(db, BoardColumn, Card, columns=columns, cards_per_column=cards // columns)
+
+
+def orm_path(engine):
+    with Session(engine) as db:
+        query = db.query(Card).order_by(Card.column_id, ranking.order_column(Card), Card.id)
+        return [card_data(c) for c in query]
+
+
+def core_path(engine):
+    with Session(engine) as db:
+        return queries.card_rows(db, Card)
+
+
+def measure(function, engine, repeat: int) -> dict:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(engine)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(engine)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mib": round(peak / 2**20, 1)}, result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        seed(engine, args.columns, args.cards)
+        orm, orm_rows = measure(orm_path, engine, args.repeat)
+        core, core_rows = measure(core_path, engine, args.repeat)
+        engine.dispose()
+
+    assert orm_rows == core_rows
+    print(json.dumps({
+        "cards": args.cards,
+        "orm": orm,
+        "core": core,
+        "speedup": round(orm["seconds"] / core["seconds"], 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
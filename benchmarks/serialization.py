@@ -0,0 +1,81 @@
+"""Compare the response_model path with the fast JSON path for a card list.
+
+The default path validates every row against ``List[CardResponse]`` and walks
+the result with ``jsonable_encoder``; the fast path encodes pre-shaped dicts
+with ``app.responses.FastJSONResponse``.
+
+    python -m benchmarks.serialization --cards 100000
+"""
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.responses import FastJSONResponse, orjson
+from app.schemas import CardResponse
+
+
+def make_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "title": f"Card {i}",
+            "description": "Benchmark card with a short description – ünïcode",
+            "column_id": i % 5 + 1,
+            "position": i // 5,
+            "color": "#ffffff",
+        }
+        for i in range(count)
+    ]
+
+
+def response_model_path(objects) -> bytes:
+    field = create_response_field(name="response", type_=List[CardResponse])
+    content = asyncio.run(serialize_response(field=field, response_content=objects))
+    return JSONResponse(content).body
+
+
+def fast_path(rows) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def timed(function, *args, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rows = make_rows(args.cards)
+    # ORM rows stand-ins: the response_model path reads them as attributes
+    objects = [SimpleNamespace(**row) for row in rows]
+
+    slow_seconds, slow_body = timed(response_model_path, objects, repeat=args.repeat)
+    fast_seconds, fast_body = timed(fast_path, rows, repeat=args.repeat)
+    assert json.loads(slow_body) == json.loads(fast_body)
+    print(json.dumps({
+        "cards": args.cards,
+        "encoder": "orjson" if orjson is not None else "json",
+        "response_model_seconds": round(slow_seconds, 4),
+        "fast_seconds": round(fast_seconds, 4),
+        "speedup": round(slow_seconds / fast_seconds, 1),
+        "identical_bytes": slow_body == fast_body,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare read/write throughput of the SQLite connection profiles.
+
+Every profile gets a fresh database seeded with a board.  One writer thread
+creates and moves cards, committing each change, while reader threads load
+the whole board the way ``GET /api/columns`` and ``GET /api/cards`` do.
+
+    python -m benchmarks.sqlite_profile --seconds 5 --readers 4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, BoardColumn, Card
+from app.seed import seed_board
+from app.sqlite_profile import PROFILES, apply_sqlite_profile
+
+
+def seed(Session, columns: int, cards: int) -> int:
+    with Session() as db:
+        return seed_board(db, BoardColumn, Card, columns=columns, cards_per_column=cards // columns)["cards"]
+
+
+def writer(Session, columns: int, stop: threading.Event, counts: dict) -> None:
+    rng = random.Random(0)
+    with Session() as db:
+        while not stop.is_set():
+            column_id = rng.randint(1, columns)
+            if rng.random() < 0.5:
+                position = db.query(func.count(Card.id)).filter(Card.column_id == column_id).scalar()
+                db.add(Card(title="New card", column_id=column_id, position=position))
+            else:
+                card = db.get(Card, rng.randint(1, counts["seeded"]))
+                if card is not None:
+                    card.column_id, card.position = column_id, 0
+            db.commit()
+            counts["writes"] += 1
+
+
+def reader(Session, stop: threading.Event, counts: dict, lock: threading.Lock) -> None:
+    with Session() as db:
+        while not stop.is_set():
+            db.query(BoardColumn).order_by(BoardColumn.position).all()
+            db.query(Card).order_by(Card.column_id, Card.position).all()
+            db.rollback()
+            with lock:
+                counts["reads"] += 1
+
+
+def run_profile(profile: str, seconds: float, readers: int, columns: int, cards: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(directory, 'bench.db')}",
+            connect_args={"check_same_thread": False},
+            pool_size=readers + 1,
+        )
+        pragmas = apply_sqlite_profile(engine, profile)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        seeded = seed(Session, columns, cards)
+
+        counts = {"reads": 0, "writes": 0, "seeded": seeded}
+        lock = threading.Lock()
+        stop = threading.Event()
+        threads = [threading.Thread(target=writer, args=(Session, columns, stop, counts))]
+        threads += [threading.Thread(target=reader, args=(Session, stop, counts, lock)) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {
+        "profile": profile,
+        "pragmas": pragmas,
+        "reads_per_second": round(counts["reads"] / seconds, 1),
+        "writes_per_second": round(counts["writes"] / seconds, 1),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration per profile")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent reader threads")
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=500)
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES), help="profiles to run (default: all)")
+    args = parser.parse_args(argv)
+
+    for profile in args.profile or sorted(PROFILES):
+        result = run_profile(profile, args.seconds, args.readers, args.columns, args.cards)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
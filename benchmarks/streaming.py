@@ -0,0 +1,88 @@
+"""Compare a buffered card listing with a streamed one.
+
+The buffered path fetches every card and encodes one body, as the default
+``get_cards`` does when the board is not cached.  The streamed path is
+``?stream=json``: ``app.queries.iter_card_chunks`` encoded by
+``app.responses.stream_response``.  Both produce the same bytes.
+
+    python -m benchmarks.streaming --cards 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.models import Base, Card
+from app.responses import dumps, stream_response
+from benchmarks.queries import seed
+
+
+def buffered_path(engine):
+    # The whole body is sent at once, so its first byte goes out at the end
+    start = time.perf_counter()
+    with Session(engine) as db:
+        body = dumps(queries.card_rows(db, Card))
+    return time.perf_counter() - start, body
+
+
+def streamed_path(engine):
+    async def consume():
+        parts, first_byte = [], None
+        with Session(engine) as db:
+            response = stream_response(queries.iter_card_chunks(db, Card))
+            async for part in response.body_iterator:
+                if first_byte is None and part:
+                    first_byte = time.perf_counter() - start
+                parts.append(len(part))
+        return first_byte, sum(parts)
+
+    start = time.perf_counter()
+    return asyncio.run(consume())
+
+
+def measure(function, engine) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte, result = function(engine)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 4),
+        "first_byte_seconds": round(first_byte, 4),
+        "peak_mib": round(peak / 2**20, 1),
+    }, result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        seed(engine, args.columns, args.cards)
+        buffered, body = measure(buffered_path, engine)
+        streamed, streamed_bytes = measure(streamed_path, engine)
+        engine.dispose()
+
+    assert streamed_bytes == len(body)
+    print(json.dumps({
+        "cards": args.cards,
+        "chunk_size": queries.STREAM_CHUNK_SIZE,
+        "buffered": buffered,
+        "streamed": streamed,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Baseline: columns and cards
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 09:00:00.000000
+
+Databases created with ``Base.metadata.create_all`` before migrations existed
+already have these tables; they are left as they are.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "columns" not in tables:
+        op.create_table(
+            "columns",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("color", sa.String(length=7), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_columns_id", "columns", ["id"])
+    if "cards" not in tables:
+        op.create_table(
+            "cards",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("column_id", sa.Integer(), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("color", sa.String(length=7), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["column_id"], ["columns.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_cards_id", "cards", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cards_id", table_name="cards")
+    op.drop_table("cards")
+    op.drop_index("ix_columns_id", table_name="columns")
+    op.drop_table("columns")
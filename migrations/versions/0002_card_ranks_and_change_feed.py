@@ -0,0 +1,46 @@
+"""Card ranks and the change feed
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "rank" not in {c["name"] for c in inspector.get_columns("cards")}:
+        with op.batch_alter_table("cards") as batch:
+            batch.add_column(sa.Column("rank", sa.String(length=64), nullable=True))
+    if "ix_cards_column_id_rank" not in {i["name"] for i in inspector.get_indexes("cards")}:
+        op.create_index("ix_cards_column_id_rank", "cards", ["column_id", "rank"])
+    if "changes" not in inspector.get_table_names():
+        op.create_table(
+            "changes",
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("entity", sa.String(length=16), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("op", sa.String(length=16), nullable=False),
+            sa.Column("data", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("version"),
+            sqlite_autoincrement=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("changes")
+    op.drop_index("ix_cards_column_id_rank", table_name="cards")
+    with op.batch_alter_table("cards") as batch:
+        batch.drop_column("rank")
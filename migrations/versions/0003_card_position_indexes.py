@@ -0,0 +1,34 @@
+"""Indexes for per-column card queries and column ordering
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 09:20:00.000000
+
+``(column_id, position)`` serves ``GET /api/cards?column_id=``, the count in
+``create_card`` and both position range updates in ``move_card``.  Its
+implicit rowid suffix also orders cards by ``(column_id, position, id)``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "ix_cards_column_id_position" not in {i["name"] for i in inspector.get_indexes("cards")}:
+        op.create_index("ix_cards_column_id_position", "cards", ["column_id", "position"])
+    if "ix_columns_position" not in {i["name"] for i in inspector.get_indexes("columns")}:
+        op.create_index("ix_columns_position", "columns", ["position"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_columns_position", table_name="columns")
+    op.drop_index("ix_cards_column_id_position", table_name="cards")
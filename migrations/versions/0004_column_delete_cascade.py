@@ -0,0 +1,60 @@
+"""Delete cards with their column in the database, and soft-deleted columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 09:40:00.000000
+
+``ON DELETE CASCADE`` lets a column be deleted without loading its cards
+into the session.  SQLite cannot alter a foreign key, so ``cards`` is
+copied into a table with the new constraint.  ``columns.deleted_at`` marks
+a column whose cards are being purged in the background.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def cards_table(ondelete: Union[str, None]) -> sa.Table:
+    return sa.Table(
+        "cards",
+        sa.MetaData(),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("column_id", sa.Integer(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.String(length=64), nullable=True),
+        sa.Column("color", sa.String(length=7), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["column_id"], ["columns.id"], ondelete=ondelete),
+        sa.PrimaryKeyConstraint("id"),
+        sa.Index("ix_cards_id", "id"),
+        sa.Index("ix_cards_column_id_position", "column_id", "position"),
+        sa.Index("ix_cards_column_id_rank", "column_id", "rank"),
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "deleted_at" not in {c["name"] for c in inspector.get_columns("columns")}:
+        with op.batch_alter_table("columns") as batch:
+            batch.add_column(sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    if not any(fk.get("options", {}).get("ondelete") == "CASCADE" for fk in inspector.get_foreign_keys("cards")):
+        with op.batch_alter_table("cards", copy_from=cards_table("CASCADE"), recreate="always"):
+            pass
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("cards", copy_from=cards_table(None), recreate="always"):
+        pass
+    with op.batch_alter_table("columns") as batch:
+        batch.drop_column("deleted_at")
@@ -0,0 +1,341 @@
+"""Test suite for the advanced Kanban app."""
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test_advanced.db")
+
+from advanced_kanban import (  # noqa: E402
+    app, Base, BoardColumn, BoardStat, Card, CardTag, Change, SessionLocal, Tag, board_cache, engine, get_db,
+    migrate_legacy_tags, rebuild_search_index, recompute_stats, upgrade_schema, verify_stats,
+)
+from app import changes, seed  # noqa: E402
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Setup test database before each test."""
+    Base.metadata.create_all(bind=engine)
+    board_cache.invalidate()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_board_snapshot():
+    """The board endpoint returns columns, cards and stats together."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    client.post("/api/cards", json={"title": "Card", "column_id": column_id, "tags": "a,b"})
+    
+    response = client.get("/api/board")
+    assert response.status_code == 200
+    board = response.json()
+    assert [c["id"] for c in board["columns"]] == [column_id]
+    assert board["cards"][0]["tags"] == ["a", "b"]
+    assert board["stats"]["total_cards"] == 1
+
+
+def test_board_etag():
+    """An unchanged board answers If-None-Match with 304."""
+    client.post("/api/columns", json={"title": "Column"})
+    etag = client.get("/api/board").headers["etag"]
+    
+    response = client.get("/api/board", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    
+    client.post("/api/columns", json={"title": "Another"})
+    response = client.get("/api/board", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_board_version_and_changes():
+    """The board version matches the change feed."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    version = client.get("/api/board").json()["version"]
+    card_id = client.post("/api/cards", json={"title": "Card", "column_id": column_id}).json()["id"]
+    client.patch(f"/api/cards/{card_id}/move", json={"column_id": column_id, "position": 0})
+    
+    feed = client.get("/api/changes", params={"since": version}).json()
+    assert [c["op"] for c in feed["changes"]] == ["create", "move"]
+    assert feed["changes"][1]["data"]["from_column_id"] == column_id
+    assert feed["version"] == client.get("/api/board").json()["version"]
+
+
+def test_committed_changes_are_published():
+    """Committed changes reach commit subscribers once, with their versions."""
+    published = []
+    changes.on_commit(SessionLocal, published.append)
+    
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    client.delete("/api/columns/999")
+    
+    assert len(published) == 1
+    assert published[0][0]["id"] == column_id
+    assert published[0][0]["version"] == client.get("/api/board").json()["version"]
+
+
+def test_column_card_counts():
+    """Column card counters follow creates, moves and deletes."""
+    first = client.post("/api/columns", json={"title": "First"}).json()["id"]
+    second = client.post("/api/columns", json={"title": "Second"}).json()["id"]
+    card_ids = [
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": first}).json()["id"]
+        for i in range(3)
+    ]
+    client.patch(f"/api/cards/{card_ids[0]}/move", json={"column_id": second, "position": 0})
+    client.delete(f"/api/cards/{card_ids[1]}")
+    
+    counts = {c["id"]: c["card_count"] for c in client.get("/api/columns").json()}
+    assert counts == {first: 1, second: 1}
+
+
+def test_stats_follow_writes():
+    """Maintained statistics match a full recount after mixed writes."""
+    first = client.post("/api/columns", json={"title": "First"}).json()["id"]
+    second = client.post("/api/columns", json={"title": "Second"}).json()["id"]
+    a = client.post("/api/cards", json={"title": "A", "column_id": first, "tags": "bug, ui"}).json()["id"]
+    client.post("/api/cards", json={"title": "B", "column_id": second, "tags": "bug"})
+    client.put(f"/api/cards/{a}", json={"tags": "ui,docs"})
+    client.patch(f"/api/cards/{a}/move", json={"column_id": second, "position": 0})
+    client.post("/api/cards", json={"title": "C", "column_id": first, "tags": "docs"})
+    client.delete(f"/api/columns/{first}")
+    
+    stats = client.get("/api/stats").json()
+    assert stats["total_columns"] == 1
+    assert stats["total_cards"] == 2
+    assert stats["tags"] == {"bug": 1, "docs": 1, "ui": 1}
+    assert stats["columns"] == [{"id": second, "title": "Second", "card_count": 2, "share": 1.0}]
+    with get_db() as db:
+        assert verify_stats(db) == {}
+
+
+def test_verify_stats_reports_drift():
+    """Tampered counters are reported as drift."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    client.post("/api/cards", json={"title": "A", "column_id": column_id})
+    with get_db() as db:
+        db.query(BoardStat).update({BoardStat.total_cards: 5})
+        db.commit()
+        assert verify_stats(db) == {"total_cards": (5, 1)}
+
+
+def test_filter_cards_by_tag():
+    """Tag filters match all or any of the requested tags."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    for title, tags in [("A", "bug,ui"), ("B", ["bug"]), ("C", "ui"), ("D", None)]:
+        client.post("/api/cards", json={"title": title, "column_id": column_id, "tags": tags})
+    
+    def titles(**params):
+        return [c["title"] for c in client.get("/api/cards", params=params).json()]
+    
+    assert titles(tag=["bug", "ui"]) == ["A"]
+    assert titles(tag=["bug", "ui"], match="any") == ["A", "B", "C"]
+    assert titles(tag="missing") == []
+    assert client.get("/api/cards", params={"tag": "bug"}).json()[0]["tags"] == ["bug", "ui"]
+
+
+def test_migrate_legacy_tags():
+    """Comma-separated tag strings are moved into the tags tables."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    card_id = client.post("/api/cards", json={"title": "Old", "column_id": column_id}).json()["id"]
+    with get_db() as db:
+        db.query(Card).filter(Card.id == card_id).update({Card.tags: "x, y,x"})
+        db.commit()
+        assert migrate_legacy_tags(db) == 1
+        assert migrate_legacy_tags(db) == 0
+    
+    assert client.get("/api/cards").json()[0]["tags"] == ["x", "y"]
+    assert client.get("/api/stats").json()["tags"] == {"x": 1, "y": 1}
+
+
+def test_search_cards():
+    """Search ranks title matches first, matches prefixes and follows edits."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    client.post("/api/cards", json={"title": "Fix login", "description": "Users cannot sign in", "column_id": column_id})
+    other = client.post("/api/cards", json={
+        "title": "Release notes", "description": "Mention the login fix", "column_id": column_id, "tags": "docs",
+    }).json()["id"]
+    
+    results = client.get("/api/search", params={"q": "login"}).json()["results"]
+    assert [r["title"] for r in results] == ["Fix login", "Release notes"]
+    assert results[0]["title_snippet"] == "Fix <mark>login</mark>"
+    assert [r["id"] for r in client.get("/api/search", params={"q": "rel"}).json()["results"]] == [other]
+    assert [r["id"] for r in client.get("/api/search", params={"q": "docs"}).json()["results"]] == [other]
+    assert client.get("/api/search", params={"q": 'login "'}).status_code == 200
+    
+    client.put(f"/api/cards/{other}", json={"title": "Changelog", "description": "Nothing here"})
+    client.delete(f"/api/cards/{other}")
+    assert [r["title"] for r in client.get("/api/search", params={"q": "login"}).json()["results"]] == ["Fix login"]
+    
+    with get_db() as db:
+        rebuild_search_index(db)
+        db.commit()
+    page = client.get("/api/search", params={"q": "login", "limit": 1}).json()
+    assert len(page["results"]) == 1 and not page["has_more"]
+
+
+def test_search_snippets_are_escaped():
+    """Card text in snippets is escaped; only the match highlights are markup."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    client.post("/api/cards", json={
+        "title": "<img src=x onerror=alert(1)> login", "description": "a & b login", "column_id": column_id,
+    })
+    result = client.get("/api/search", params={"q": "login"}).json()["results"][0]
+    assert result["title_snippet"] == "&lt;img src=x onerror=alert(1)&gt; <mark>login</mark>"
+    assert result["description_snippet"] == "a &amp; b <mark>login</mark>"
+def test_reads_served_from_cache():
+    """Writes go through to the board cache, so card reads after them are hits.
+
+    Columns and stats are read from the maintained counters instead.
+    """
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    client.get("/api/cards")
+    before = client.get("/api/cache").json()
+    
+    client.post("/api/cards", json={"title": "Card", "column_id": column_id, "tags": "bug"})
+    cards = client.get("/api/cards").json()
+    columns = client.get("/api/columns").json()
+    stats = client.get("/api/stats").json()
+    
+    after = client.get("/api/cache").json()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] == before["misses"]
+    assert [c["tags"] for c in cards] == [["bug"]]
+    assert columns[0]["card_count"] == 1
+    assert stats["tags"] == {"bug": 1}
+
+
+def test_board_first_cards_per_column():
+    """per_column loads the start of each column and a cursor for the rest."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    for i in range(3):
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": column_id, "tags": "a"})
+    
+    board_cache.invalidate()
+    board = client.get("/api/board", params={"per_column": 2}).json()
+    assert [c["title"] for c in board["cards"]] == ["Card 0", "Card 1"]
+    assert client.get("/api/cache").json()["cards"] == 0
+    assert board["cards"][0]["tags"] == ["a"]
+    assert board["columns"][0]["card_count"] == 3
+    
+    cursor = board["cursors"][str(column_id)]
+    response = client.get("/api/cards", params={"column_id": column_id, "limit": 2, "cursor": cursor})
+    assert [c["title"] for c in response.json()] == ["Card 2"]
+    assert "X-Next-Cursor" not in response.headers
+    assert client.get("/api/cards", params={"limit": 2, "tag": "a"}).status_code == 400
+
+
+def test_move_card_renumbers_columns():
+    """A move closes the gap in its source column and opens one in its target."""
+    first = client.post("/api/columns", json={"title": "First"}).json()["id"]
+    second = client.post("/api/columns", json={"title": "Second"}).json()["id"]
+    ids = [client.post("/api/cards", json={"title": f"A{i}", "column_id": first}).json()["id"] for i in range(3)]
+    for i in range(2):
+        client.post("/api/cards", json={"title": f"B{i}", "column_id": second})
+    client.patch(f"/api/cards/{ids[0]}/move", json={"column_id": second, "position": 1})
+
+    for column_id, titles in ((first, ["A1", "A2"]), (second, ["B0", "A0", "B1"])):
+        cards = client.get("/api/cards", params={"column_id": column_id}).json()
+        assert [(c["title"], c["position"]) for c in cards] == [(t, i) for i, t in enumerate(titles)]
+    assert client.get("/api/cards", params={"column_id": second + 1}).json() == []
+    with get_db() as db:
+        positions = db.query(Card.title, Card.position).order_by(Card.column_id, Card.position).all()
+    assert [tuple(row) for row in positions] == [("A1", 0), ("A2", 1), ("B0", 0), ("A0", 1), ("B1", 2)]
+def test_missing_column_is_not_found():
+    """Creating or moving a card into a missing column is a 404, not a server error."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    card_id = client.post("/api/cards", json={"title": "Card", "column_id": column_id}).json()["id"]
+    assert client.post("/api/cards", json={"title": "Lost", "column_id": column_id + 1}).status_code == 404
+    response = client.patch(f"/api/cards/{card_id}/move", json={"column_id": column_id + 1, "position": 0})
+    assert response.status_code == 404
+    assert client.get("/api/columns").json()[0]["card_count"] == 1
+def test_streamed_cards():
+    """Streamed cards carry their tags like the cached listing."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    for i in range(3):
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": column_id, "tags": f"t{i}"})
+    
+    response = client.get("/api/cards", params={"stream": "ndjson"})
+    assert [json.loads(line) for line in response.text.splitlines()] == client.get("/api/cards").json()
+    assert client.get("/api/cards", params={"stream": "json", "tag": "t1"}).status_code == 400
+
+
+def test_move_selection_keeps_counts():
+    """Moving a selection updates both columns' card counts and keeps tags."""
+    done = client.post("/api/columns", json={"title": "Done"}).json()["id"]
+    archive = client.post("/api/columns", json={"title": "Archive"}).json()["id"]
+    ids = [
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": done, "tags": "x"}).json()["id"]
+        for i in range(3)
+    ]
+    
+    moved = client.patch("/api/cards/move", json={"card_ids": ids[:2], "column_id": archive}).json()
+    assert [c["tags"] for c in moved] == [["x"], ["x"]]
+    counts = {c["id"]: c["card_count"] for c in client.get("/api/columns").json()}
+    assert counts == {done: 1, archive: 2}
+    with SessionLocal() as db:
+        assert verify_stats(db) == {}
+
+
+def test_seeded_board_tags():
+    """Seeded tags are linked to the cards and counted, so tag filters and stats agree."""
+    with get_db() as db:
+        result = seed.seed_board(db, BoardColumn, Card, Change, columns=2, cards_per_column=100, tags=10,
+                                 tag_model=Tag, card_tag_model=CardTag)
+        counts = dict(db.query(Tag.name, Tag.card_count).all())
+        recompute_stats(db)
+        rebuild_search_index(db)
+        db.commit()
+        assert verify_stats(db) == {}
+    assert result["tags"] == 10 and sum(counts.values()) == result["card_tags"]
+    # The first names of the vocabulary are the most used
+    assert counts["api"] == max(counts.values())
+    assert len(client.get("/api/cards", params={"tag": "api"}).json()) == counts["api"]
+
+
+BASELINE_SCHEMA = (
+    "CREATE TABLE columns (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, position INTEGER NOT NULL, "
+    "color VARCHAR(7), created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE cards (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, description TEXT, "
+    "column_id INTEGER NOT NULL REFERENCES columns (id), position INTEGER NOT NULL, color VARCHAR(7), "
+    "tags VARCHAR(500), created_at DATETIME, updated_at DATETIME)",
+)
+
+
+def test_upgrade_schema_adds_rank(tmp_path):
+    """An existing database gets the rank column and the card indexes."""
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+    upgrade_schema(old)
+    upgrade_schema(old)
+    inspector = inspect(old)
+    assert "rank" in {column["name"] for column in inspector.get_columns("cards")}
+    assert {"ix_cards_column_id_position", "ix_cards_column_id_rank"} <= {
+        index["name"] for index in inspector.get_indexes("cards")
+    }
+    old.dispose()
+
+
+def test_upgrade_schema_backfills_card_counts(tmp_path):
+    """An existing database gets column card counts matching its cards."""
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO columns (id, title, position) VALUES (1, 'A', 0), (2, 'B', 1)")
+        connection.exec_driver_sql(
+            "INSERT INTO cards (title, column_id, position) VALUES ('x', 1, 0), ('y', 1, 1), ('z', 2, 0)"
+        )
+    upgrade_schema(old)
+    with old.connect() as connection:
+        counts = connection.exec_driver_sql("SELECT id, card_count FROM columns ORDER BY id").all()
+    assert [tuple(row) for row in counts] == [(1, 2), (2, 1)]
+    old.dispose()
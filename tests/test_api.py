@@ -1,11 +1,15 @@
 """Test suite for Kanban API."""
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from app import operations, purge
 from app.api import app, get_db_session
-from app.models import Base
+from app.cache import board_cache
+from app.models import Base, BoardColumn, Card
 from app.database import init_db
 
 # Test database
@@ -30,6 +34,7 @@ client = TestClient(app)
 def setup_database():
     """Setup test database before each test."""
     Base.metadata.create_all(bind=engine)
+    board_cache.invalidate()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -162,3 +167,241 @@ def test_delete_column_cascade():
     # Verify cards are deleted
     cards_response = client.get("/api/cards")
     assert len(cards_response.json()) == 0
+
+
+def test_delete_large_column(monkeypatch):
+    """A large column disappears at once and its cards are purged in chunks."""
+    monkeypatch.setattr("app.purge.SOFT_DELETE_THRESHOLD", 2)
+    monkeypatch.setattr("app.purge.PURGE_BATCH_SIZE", 2)
+    keep = client.post("/api/columns", json={"title": "Keep"}).json()["id"]
+    large = client.post("/api/columns", json={"title": "Large"}).json()["id"]
+    kept = client.post("/api/cards", json={"title": "Kept", "column_id": keep}).json()["id"]
+    for i in range(5):
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": large})
+    
+    db = TestingSessionLocal()
+    assert operations.delete_column(db, large)
+    db.commit()
+    assert db.query(Card).count() == 6  # Not purged yet
+    assert [c["id"] for c in client.get("/api/columns").json()] == [keep]
+    assert [c["id"] for c in client.get("/api/cards").json()] == [kept]
+    assert [c["id"] for c in client.get("/api/cards", params={"limit": 10}).json()] == [kept]
+    assert [c["id"] for c in json.loads(client.get("/api/cards", params={"stream": "json"}).content)] == [kept]
+    assert client.post("/api/cards", json={"title": "Late", "column_id": large}).status_code == 404
+    assert client.delete(f"/api/columns/{large}").status_code == 404
+    
+    assert purge.purge_deleted_columns(engine) == 5
+    db.expire_all()
+    assert db.query(Card).count() == 1
+    assert db.query(BoardColumn).count() == 1
+    db.close()
+    
+    # Through the endpoint the purge runs as a background task
+    for i in range(3):
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": keep})
+    assert client.delete(f"/api/columns/{keep}").status_code == 200
+    assert client.get("/api/columns").json() == []
+    assert purge.purge_deleted_columns(engine) == 0
+
+
+def test_move_card_rank_mode(monkeypatch):
+    """Rank mode orders moved cards without renumbering their neighbours."""
+    monkeypatch.setattr("app.ranking.ORDERING_MODE", "rank")
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    ids = [
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": column_id}).json()["id"]
+        for i in range(4)
+    ]
+    
+    # Move the last card to the top, then the first card between the others
+    client.patch(f"/api/cards/{ids[3]}/move", json={"column_id": column_id, "position": 0})
+    client.patch(f"/api/cards/{ids[0]}/move", json={"column_id": column_id, "position": 2})
+    
+    cards = client.get("/api/cards", params={"column_id": column_id}).json()
+    assert [c["id"] for c in cards] == [ids[3], ids[1], ids[0], ids[2]]
+    assert [c["position"] for c in cards] == [0, 1, 2, 3]
+
+
+def test_rank_mode_keeps_legacy_order(monkeypatch):
+    """Cards from position mode keep their place when ranked cards join and leave their column."""
+    column_id = client.post("/api/columns", json={"title": "Legacy"}).json()["id"]
+    other = client.post("/api/columns", json={"title": "Other"}).json()["id"]
+    for i in range(3):
+        client.post("/api/cards", json={"title": f"L{i}", "column_id": column_id})
+    moved = client.post("/api/cards", json={"title": "X", "column_id": other}).json()["id"]
+    with TestingSessionLocal() as db:
+        # A ranked card appended before creates ranked the column, as older versions did
+        db.add(Card(title="Ranked", column_id=column_id, position=3, rank="h"))
+        db.commit()
+    board_cache.invalidate()
+
+    monkeypatch.setattr("app.ranking.ORDERING_MODE", "rank")
+    client.post("/api/cards", json={"title": "New", "column_id": column_id})
+    client.patch(f"/api/cards/{moved}/move", json={"column_id": column_id, "position": 0})
+    titles = [c["title"] for c in client.get("/api/cards", params={"column_id": column_id}).json()]
+    assert titles == ["X", "L0", "L1", "L2", "Ranked", "New"]
+
+
+def test_change_feed():
+    """Mutations are recorded in the change feed in order."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    card_id = client.post("/api/cards", json={"title": "Card", "column_id": column_id}).json()["id"]
+    client.put(f"/api/cards/{card_id}", json={"title": "Renamed"})
+    
+    version = int(client.get("/api/cards").headers["X-Board-Version"])
+    client.delete(f"/api/cards/{card_id}")
+    
+    feed = client.get("/api/changes", params={"since": 0}).json()
+    assert [(c["entity"], c["op"]) for c in feed["changes"]] == [
+        ("column", "create"), ("card", "create"), ("card", "update"), ("card", "delete"),
+    ]
+    assert feed["changes"][2]["data"]["title"] == "Renamed"
+    
+    feed = client.get("/api/changes", params={"since": version}).json()
+    assert [c["op"] for c in feed["changes"]] == ["delete"]
+    assert not feed["has_more"] and not feed["reset"]
+    
+    page = client.get("/api/changes", params={"since": 0, "limit": 1}).json()
+    assert page["has_more"] and page["version"] == page["changes"][0]["version"]
+    assert client.get("/api/changes", params={"since": 999}).json()["reset"]
+    assert client.get("/api/changes", params={"limit": 0}).status_code == 422
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_card_pagination(monkeypatch, mode):
+    """Cursors page through every card exactly once in either ordering mode."""
+    monkeypatch.setattr("app.ranking.ORDERING_MODE", mode)
+    columns = [client.post("/api/columns", json={"title": f"Column {i}"}).json()["id"] for i in range(2)]
+    for column_id in columns:
+        for i in range(5):
+            client.post("/api/cards", json={"title": f"Card {i}", "column_id": column_id})
+    
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/cards", params=params)
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    cards = [c for page in pages for c in page]
+    assert [(c["column_id"], c["position"]) for c in cards] == [(column_id, i) for column_id in columns for i in range(5)]
+    assert sorted(cards, key=lambda c: c["id"]) == sorted(client.get("/api/cards").json(), key=lambda c: c["id"])
+    
+    response = client.get("/api/cards", params={"per_column": 2})
+    assert [(c["column_id"], c["position"]) for c in response.json()] == [
+        (columns[0], 0), (columns[0], 1), (columns[1], 0), (columns[1], 1),
+    ]
+    cursors = dict(pair.split(":") for pair in response.headers["X-Next-Cursors"].split(","))
+    more = client.get("/api/cards", params={"column_id": columns[1], "limit": 10, "cursor": cursors[str(columns[1])]})
+    assert [c["position"] for c in more.json()] == [2, 3, 4]
+    assert "X-Next-Cursor" not in more.headers
+    
+    assert client.get("/api/cards", params={"column_id": columns[0], "limit": 2, "cursor": cursors[str(columns[1])]}).status_code == 400
+    assert client.get("/api/cards", params={"limit": 2, "cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_streamed_cards(monkeypatch, mode):
+    """Streamed listings fetch in chunks but return the same cards as a page."""
+    monkeypatch.setattr("app.ranking.ORDERING_MODE", mode)
+    monkeypatch.setattr("app.queries.STREAM_CHUNK_SIZE", 2)
+    columns = [client.post("/api/columns", json={"title": f"Column {i}"}).json()["id"] for i in range(2)]
+    for column_id in columns:
+        for i in range(3):
+            client.post("/api/cards", json={"title": f"Card {i}", "column_id": column_id})
+    expected = client.get("/api/cards", params={"limit": 10}).json()
+    
+    response = client.get("/api/cards", params={"stream": "json"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected
+    
+    response = client.get("/api/cards", params={"stream": "ndjson", "column_id": columns[1]})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == expected[3:]
+
+
+def test_bulk_import():
+    """Imported cards are appended, and feed clients and the cache reload."""
+    column_id = client.post("/api/columns", json={"title": "To Do"}).json()["id"]
+    client.post("/api/cards", json={"title": "Existing", "column_id": column_id})
+    version = int(client.get("/api/cards").headers["X-Board-Version"])
+    
+    body = "\n".join(json.dumps({"title": f"Card {i}"}) for i in range(3))
+    response = client.post(f"/api/import?column_id={column_id}", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.json() == {"cards": 3, "columns": 0, "version": version + 1}
+    
+    cards = client.get("/api/cards").json()
+    assert [(c["title"], c["position"]) for c in cards] == [("Existing", 0)] + [(f"Card {i}", i + 1) for i in range(3)]
+    assert client.get("/api/changes", params={"since": version}).json()["reset"]
+    
+    response = client.post("/api/import", content='[{"title": "No column"}]', headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+
+def test_move_selection():
+    """A selection of cards moves in one request, keeping the requested order."""
+    done = client.post("/api/columns", json={"title": "Done"}).json()["id"]
+    archive = client.post("/api/columns", json={"title": "Archive"}).json()["id"]
+    ids = [client.post("/api/cards", json={"title": f"Done {i}", "column_id": done}).json()["id"] for i in range(4)]
+    old = client.post("/api/cards", json={"title": "Old", "column_id": archive}).json()["id"]
+    
+    response = client.patch("/api/cards/move", json={"card_ids": ids[::-1], "column_id": archive})
+    assert response.status_code == 200
+    assert [(c["id"], c["column_id"], c["position"]) for c in response.json()] == [
+        (card_id, archive, index + 1) for index, card_id in enumerate(ids[::-1])
+    ]
+    cards = client.get("/api/cards", params={"column_id": archive}).json()
+    assert [c["id"] for c in cards] == [old] + ids[::-1]
+    assert client.get("/api/cards", params={"column_id": done}).json() == []
+    
+    response = client.patch("/api/cards/move", json={"card_ids": [ids[0]], "column_id": archive, "position": 0})
+    assert [c["id"] for c in client.get("/api/cards", params={"column_id": archive}).json()][:2] == [ids[0], old]
+    
+    assert client.patch("/api/cards/move", json={"card_ids": [999], "column_id": archive}).status_code == 404
+    assert client.patch("/api/cards/move", json={"card_ids": ids, "column_id": 999}).status_code == 404
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_batch(monkeypatch, mode):
+    """A batch applies mixed operations in one commit, or none of them."""
+    monkeypatch.setattr("app.ranking.ORDERING_MODE", mode)
+    todo = client.post("/api/columns", json={"title": "To Do"}).json()["id"]
+    first = client.post("/api/cards", json={"title": "First", "column_id": todo}).json()["id"]
+    version = client.get("/api/changes").json()["version"]
+    
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "create", "entity": "column", "data": {"title": "Done"}},
+        {"op": "create", "entity": "card", "data": {"title": "Second", "column_id": todo}},
+        {"op": "create", "entity": "card", "data": {"title": "Third", "column_id": "$0"}},
+        {"op": "update", "entity": "card", "id": first, "data": {"title": "Renamed"}},
+        {"op": "move", "entity": "card", "id": "$1", "data": {"column_id": "$0", "position": 0}},
+        {"op": "move", "entity": "card", "data": {"card_ids": [first], "column_id": "$0"}},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    done, second, third = (body["results"][i]["id"] for i in range(3))
+    assert [(r["op"], r["entity"]) for r in body["results"]][:2] == [("create", "column"), ("create", "card")]
+    assert body["results"][3]["data"]["title"] == "Renamed"
+    cards = client.get("/api/cards", params={"column_id": done}).json()
+    assert [(c["id"], c["position"]) for c in cards] == [(second, 0), (third, 1), (first, 2)]
+    assert client.get("/api/cards", params={"column_id": todo}).json() == []
+    assert len(client.get("/api/changes", params={"since": version}).json()["changes"]) == 6
+    
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "delete", "entity": "card", "id": second},
+        {"op": "update", "entity": "card", "id": 999, "data": {"title": "Missing"}},
+    ]})
+    assert response.status_code == 404
+    assert response.json()["detail"]["index"] == 1
+    assert len(client.get("/api/cards", params={"column_id": done}).json()) == 3
+    
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "create", "entity": "card", "data": {"title": "No column"}},
+    ]})
+    assert response.status_code == 422
+    assert client.post("/api/batch", json={"operations": [{"op": "move", "entity": "column", "id": done}]}).status_code == 400
+    assert client.post("/api/batch", json={"operations": [{"op": "delete", "entity": "card", "id": "$3"}]}).status_code == 400
@@ -0,0 +1,145 @@
+"""Tests for the async column and card endpoints."""
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import ranking
+from app.async_api import router
+from app.cache import board_cache
+from app.database import get_async_db, get_db_session, make_async_sessionmaker
+from app.models import Base
+
+# Test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_async.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# TestClient may run each request on its own event loop, so connections are not pooled
+TestingAsyncSessionLocal = make_async_sessionmaker(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+# The bulk import runs on a sync session in the threadpool
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+def override_get_db_session():
+    with TestingSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(router)
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_db_session] = override_get_db_session
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Setup test database before each test."""
+    Base.metadata.create_all(bind=engine)
+    board_cache.invalidate()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_columns_and_cards():
+    """Columns and cards round-trip through the async endpoints."""
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    card = client.post("/api/cards", json={"title": "Card", "column_id": column_id}).json()
+    assert card["position"] == 0
+
+    response = client.put(f"/api/cards/{card['id']}", json={"title": "Renamed"})
+    assert response.json()["title"] == "Renamed"
+
+    response = client.get("/api/cards")
+    assert [c["title"] for c in response.json()] == ["Renamed"]
+    assert int(response.headers["X-Board-Version"]) == 3
+
+    assert client.delete(f"/api/cards/{card['id']}").status_code == 200
+    assert client.delete(f"/api/cards/{card['id']}").status_code == 404
+    assert client.delete(f"/api/columns/{column_id}").status_code == 200
+    assert client.get("/api/columns").json() == []
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_move_card(monkeypatch, mode):
+    """Moving a card reorders both columns in either ordering mode."""
+    monkeypatch.setattr(ranking, "ORDERING_MODE", mode)
+    col1 = client.post("/api/columns", json={"title": "Column 1"}).json()["id"]
+    col2 = client.post("/api/columns", json={"title": "Column 2"}).json()["id"]
+    ids = [
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": col1}).json()["id"]
+        for i in range(3)
+    ]
+    client.post("/api/cards", json={"title": "Other", "column_id": col2})
+
+    response = client.patch(f"/api/cards/{ids[0]}/move", json={"column_id": col2, "position": 0})
+    assert response.status_code == 200
+    assert response.json()["column_id"] == col2
+
+    cards = client.get("/api/cards").json()
+    order = {
+        column: [c["title"] for c in sorted(cards, key=lambda c: c["position"]) if c["column_id"] == column]
+        for column in (col1, col2)
+    }
+    assert order == {col1: ["Card 1", "Card 2"], col2: ["Card 0", "Other"]}
+
+
+def test_streamed_cards(monkeypatch):
+    """Cards stream from the async session a chunk at a time."""
+    monkeypatch.setattr("app.queries.STREAM_CHUNK_SIZE", 2)
+    column_id = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    for i in range(5):
+        client.post("/api/cards", json={"title": f"Card {i}", "column_id": column_id})
+
+    response = client.get("/api/cards", params={"stream": "json"})
+    assert [c["position"] for c in response.json()] == [0, 1, 2, 3, 4]
+    assert response.json() == client.get("/api/cards").json()
+
+
+def test_bulk_import():
+    """CSV imports run on a sync session in the threadpool and create missing columns."""
+    response = client.post("/api/import", content="title,column\nOne,Backlog\nTwo,Backlog\n",
+                           headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["cards"] == 2 and response.json()["columns"] == 1
+    assert [c["title"] for c in client.get("/api/cards").json()] == ["One", "Two"]
+
+
+def test_move_selection():
+    """A selection moves through the async session in one commit."""
+    col1 = client.post("/api/columns", json={"title": "Column 1"}).json()["id"]
+    col2 = client.post("/api/columns", json={"title": "Column 2"}).json()["id"]
+    ids = [client.post("/api/cards", json={"title": f"Card {i}", "column_id": col1}).json()["id"] for i in range(3)]
+
+    response = client.patch("/api/cards/move", json={"card_ids": ids[1:], "column_id": col2, "position": 0})
+    assert [c["position"] for c in response.json()] == [0, 1]
+    cards = client.get("/api/cards").json()
+    assert [(c["id"], c["column_id"]) for c in cards if c["column_id"] == col2] == [(ids[1], col2), (ids[2], col2)]
+
+
+def test_batch():
+    """A batch runs through the async session and rolls back as a whole."""
+    col = client.post("/api/columns", json={"title": "Column"}).json()["id"]
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "create", "entity": "card", "data": {"title": "A", "column_id": col}},
+        {"op": "create", "entity": "card", "data": {"title": "B", "column_id": col}},
+        {"op": "move", "entity": "card", "id": "$1", "data": {"column_id": col, "position": 0}},
+    ]})
+    assert response.status_code == 200
+    assert [(c["title"], c["position"]) for c in client.get("/api/cards").json()] == [("B", 0), ("A", 1)]
+
+    response = client.post("/api/batch", json={"operations": [
+        {"op": "create", "entity": "card", "data": {"title": "C", "column_id": col}},
+        {"op": "delete", "entity": "column", "id": 999},
+    ]})
+    assert response.status_code == 404
+    assert len(client.get("/api/cards").json()) == 2
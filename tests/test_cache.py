@@ -0,0 +1,96 @@
+"""Tests for the write-through board cache."""
+from app.cache import BoardCache
+
+
+class FakeBoard:
+    """Loader callbacks over in-memory rows that count database reads."""
+
+    def __init__(self):
+        self.columns = [{"id": 1, "title": "A", "position": 0}, {"id": 2, "title": "B", "position": 1}]
+        self.cards = [
+            {"id": 1, "title": "One", "column_id": 1, "position": 0},
+            {"id": 2, "title": "Two", "column_id": 1, "position": 1},
+        ]
+        self.loads = []
+
+    def load_columns(self, db):
+        self.loads.append("columns")
+        return list(self.columns)
+
+    def load_cards(self, db, column_ids=None):
+        self.loads.append(("cards", tuple(sorted(column_ids)) if column_ids is not None else None))
+        cards = [c for c in self.cards if column_ids is None or c["column_id"] in column_ids]
+        return sorted(cards, key=lambda c: (c["column_id"], c["position"]))
+
+
+def change(version, entity, op, entity_id, data=None):
+    return {"version": version, "entity": entity, "op": op, "id": entity_id, "data": data}
+
+
+def test_writes_go_through():
+    """Committed changes update the cached board without reloading it."""
+    board = FakeBoard()
+    cache = BoardCache(board.load_columns, board.load_cards, enabled=True)
+    cache.view(None, 1)
+    cache.apply_changes([
+        change(2, "card", "create", 3, {"id": 3, "title": "Three", "column_id": 2, "position": 0}),
+        change(3, "card", "update", 1, {"id": 1, "title": "Uno", "column_id": 1, "position": 0}),
+        change(4, "card", "delete", 2, {"column_id": 1}),
+    ])
+
+    view = cache.view(None, 4)
+    assert [c["title"] for c in view.column_cards(1)] == ["Uno"]
+    assert [c["title"] for c in view.column_cards(2)] == ["Three"]
+    assert board.loads == ["columns", ("cards", None)]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_move_reloads_touched_columns():
+    """A move only reloads the two columns it touched."""
+    board = FakeBoard()
+    cache = BoardCache(board.load_columns, board.load_cards, enabled=True)
+    cache.view(None, 1)
+    board.cards[0] = {**board.cards[0], "column_id": 2, "position": 0}
+    board.cards[1] = {**board.cards[1], "position": 0}
+    cache.apply_changes([change(2, "card", "move", 1, {
+        "id": 1, "column_id": 2, "position": 0, "from_column_id": 1, "from_position": 0,
+    })])
+
+    view = cache.view(None, 2)
+    assert [c["id"] for c in view.column_cards(1)] == [2]
+    assert [c["id"] for c in view.column_cards(2)] == [1]
+    assert board.loads[-1] == ("cards", (1, 2))
+
+
+def test_unknown_writes_force_reload():
+    """Version gaps, foreign writes and invalidation all reload the board."""
+    board = FakeBoard()
+    cache = BoardCache(board.load_columns, board.load_cards, enabled=True)
+    cache.view(None, 1)
+
+    # A change the cache never saw: version 2 is missing
+    cache.apply_changes([change(3, "column", "delete", 2)])
+    assert cache.stats()["version"] is None
+
+    cache.view(None, 3)
+    # Another process wrote version 4
+    cache.view(None, 4)
+    cache.invalidate()
+    cache.view(None, 4)
+    assert board.loads.count("columns") == 4
+
+
+def test_reload_racing_a_commit_is_not_stored():
+    """A reload that overlaps a commit is served but not cached."""
+    board = FakeBoard()
+    cache = BoardCache(board.load_columns, board.load_cards, enabled=True)
+    original = board.load_cards
+
+    def load_cards_during_commit(db, column_ids=None):
+        cache.apply_changes([change(2, "column", "create", 3, {"id": 3, "title": "C", "position": 2})])
+        return original(db, column_ids)
+
+    board.load_cards = load_cards_during_commit
+    cache.load_cards = load_cards_during_commit
+    assert cache.view(None, 1).version == 1
+    assert cache.stats()["version"] is None
@@ -0,0 +1,51 @@
+"""Tests for server-sent event fan-out."""
+import asyncio
+import threading
+
+from app.events import EventBroadcaster, RESYNC
+
+
+def test_publish_from_thread_reaches_subscribers():
+    """Events published by worker threads reach every subscriber."""
+    async def scenario():
+        broadcaster = EventBroadcaster()
+        await broadcaster.start()
+        streams = [broadcaster.subscribe(), broadcaster.subscribe()]
+        receivers = [asyncio.create_task(stream.__anext__()) for stream in streams]
+        await asyncio.sleep(0)
+        assert broadcaster.subscriber_count == 2
+        
+        thread = threading.Thread(target=broadcaster.publish_changes, args=([{"version": 1}],))
+        thread.start()
+        thread.join()
+        events = await asyncio.wait_for(asyncio.gather(*receivers), 1)
+        
+        for stream in streams:
+            await stream.aclose()
+        await broadcaster.stop()
+        return events, broadcaster.subscriber_count
+    
+    events, remaining = asyncio.run(scenario())
+    assert events == [{"type": "changes", "version": 1, "changes": [{"version": 1}]}] * 2
+    assert remaining == 0
+
+
+def test_slow_subscriber_gets_resync():
+    """A subscriber whose queue overflows receives a resync marker instead."""
+    async def scenario():
+        broadcaster = EventBroadcaster(queue_size=2)
+        await broadcaster.start()
+        stream = broadcaster.subscribe()
+        first = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+        for version in range(1, 6):
+            broadcaster.publish({"version": version})
+        event = await asyncio.wait_for(first, 1)
+        backlog = broadcaster._subscribers.copy().pop().qsize()
+        await stream.aclose()
+        await broadcaster.stop()
+        return event, backlog
+    
+    event, backlog = asyncio.run(scenario())
+    assert event == RESYNC
+    assert backlog == 0
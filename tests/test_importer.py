@@ -0,0 +1,69 @@
+"""Tests for the bulk card importer."""
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import importer, queries, ranking
+from app.models import Base, BoardColumn, Card, Change
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(BoardColumn(title="To Do", position=0))
+        session.add(Card(title="Existing", column_id=1, position=0))
+        session.commit()
+        yield session
+
+
+def test_json_array_is_read_incrementally():
+    """Array items split across reads come out whole, in order."""
+    text = ' [{"title": "a]"}, 12, {"title": "b"}] '
+    assert list(importer.iter_json_array(io.StringIO(text), chunk_size=4)) == [{"title": "a]"}, 12, {"title": "b"}]
+    with pytest.raises(importer.InvalidImport):
+        list(importer.iter_json_array(io.StringIO('[{"title": "a"}'), chunk_size=4))
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_notion_csv_appends_cards_and_creates_columns(db, monkeypatch, mode):
+    """Cards go to the end of their columns; unknown column titles become columns."""
+    monkeypatch.setattr(ranking, "ORDERING_MODE", mode)
+    csv_text = "Name,Status,Notes\nFirst,To Do,\nSecond,Doing,details\nThird,To Do,\n"
+    result = importer.import_stream(db, Card, BoardColumn, Change, io.StringIO(csv_text), "notion",
+                                    batch_size=1, commit_every=2)
+    assert result == {"cards": 3, "columns": 1}
+
+    cards = queries.card_rows(db, Card)
+    assert [(c["title"], c["column_id"], c["position"]) for c in cards] == [
+        ("Existing", 1, 0), ("First", 1, 1), ("Third", 1, 2), ("Second", 2, 0),
+    ]
+    assert cards[3]["description"] == "details"
+    if mode == "rank":
+        assert all(card.rank for card in db.query(Card))
+    # One change per commit instead of one per card
+    assert [(c.entity, c.op) for c in db.query(Change)] == [("board", "import")] * 2
+
+
+def test_trello_board(db):
+    """Open lists become columns and open cards keep their list order."""
+    board = {
+        "lists": [{"id": "l2", "name": "Done", "pos": 2}, {"id": "l1", "name": "To Do", "pos": 1},
+                  {"id": "l3", "name": "Archived", "pos": 3, "closed": True}],
+        "cards": [
+            {"name": "Later", "idList": "l1", "pos": 20, "desc": ""},
+            {"name": "Sooner", "idList": "l1", "pos": 10, "desc": "first"},
+            {"name": "Shipped", "idList": "l2", "pos": 1},
+            {"name": "Old", "idList": "l3", "pos": 1},
+        ],
+    }
+    result = importer.import_stream(db, Card, BoardColumn, Change, io.StringIO(json.dumps(board)))
+    assert result == {"cards": 3, "columns": 1}
+    assert [c["title"] for c in queries.card_rows(db, Card)] == ["Existing", "Sooner", "Later", "Shipped"]
+
+    with pytest.raises(importer.InvalidImport, match="Record 1"):
+        importer.import_stream(db, Card, BoardColumn, Change, io.StringIO('{"title": "Nowhere"}\n'), "ndjson")
@@ -0,0 +1,76 @@
+"""Tests for the request and SQL metrics."""
+import re
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import metrics
+from app.api import app, get_db_session
+from app.cache import board_cache
+from app.models import Base
+
+
+def sample(body: str, name: str, **labels) -> float:
+    """Return the value of one series in a Prometheus text body."""
+    for line in body.splitlines():
+        match = re.match(r"^(\w+)(?:\{(.*)\})? (\S+)$", line)
+        if match and match.group(1) == name:
+            found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ""))
+            if all(found.get(key) == value for key, value in labels.items()):
+                return float(match.group(3))
+    raise AssertionError(f"{name} {labels} not found")
+
+
+def test_histogram_text_format():
+    """Buckets are cumulative and end with +Inf, followed by the sum and count."""
+    histogram = metrics.Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, "/a")
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_requests_and_sql_per_route(tmp_path):
+    """Requests are recorded under their route template with the SQL they ran."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", connect_args={"check_same_thread": False})
+    metrics.instrument_engine(engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        with Session() as db:
+            yield db
+
+    previous = app.dependency_overrides.get(get_db_session)
+    app.dependency_overrides[get_db_session] = override_get_db
+    board_cache.invalidate()
+    try:
+        client = TestClient(app)
+        column = client.post("/api/columns", json={"title": "To Do"}).json()["id"]
+        card = client.post("/api/cards", json={"title": "Card", "column_id": column}).json()["id"]
+        client.put(f"/api/cards/{card}", json={"title": "Renamed"})
+        client.put("/api/cards/999", json={"title": "Missing"})
+        body = client.get("/metrics").text
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db_session)
+        else:
+            app.dependency_overrides[get_db_session] = previous
+        board_cache.invalidate()
+        engine.dispose()
+
+    route = "/api/cards/{card_id}"
+    assert sample(body, "kanban_http_request_duration_seconds_count", method="PUT", route=route, status="200") >= 1
+    assert sample(body, "kanban_http_request_duration_seconds_count", method="PUT", route=route, status="404") >= 1
+    assert sample(body, "kanban_http_request_sql_statements_sum", method="POST", route="/api/cards") >= 3
+    assert sample(body, "kanban_http_response_size_bytes_count", method="POST", route="/api/columns") >= 1
+    assert sample(body, "kanban_sql_statements_total", operation="INSERT") >= 2
+    assert sample(body, "kanban_http_requests_in_flight") == 1  # The /metrics request itself
@@ -0,0 +1,47 @@
+"""Tests for the Alembic migrations."""
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+
+from app.database import run_migrations
+from app.models import Base
+from app.sqlite_profile import apply_sqlite_profile
+
+
+def test_migrations_match_models(tmp_path):
+    """Upgrading an empty database yields exactly the models' schema."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    run_migrations(engine)
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    engine.dispose()
+    assert diff == []
+
+
+def test_adopts_databases_created_without_migrations(tmp_path):
+    """Databases from before the migrations are upgraded in place."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # The original schema, without Alembic's bookkeeping table
+    run_migrations(engine, "0001")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+    run_migrations(engine)
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        assert context.get_current_revision() == "0004"
+        assert compare_metadata(context, Base.metadata) == []
+    engine.dispose()
+
+
+def test_cards_deleted_with_their_column(tmp_path):
+    """With foreign keys enforced, deleting a column deletes its cards in the database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'cascade.db'}")
+    apply_sqlite_profile(engine, "wal")
+    run_migrations(engine)
+    with engine.begin() as connection:
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        connection.exec_driver_sql("INSERT INTO columns (id, title, position) VALUES (1, 'To Do', 0)")
+        connection.exec_driver_sql("INSERT INTO cards (title, column_id, position) VALUES ('Card', 1, 0)")
+        connection.exec_driver_sql("DELETE FROM columns WHERE id = 1")
+        assert connection.exec_driver_sql("SELECT count(*) FROM cards").scalar() == 0
+    engine.dispose()
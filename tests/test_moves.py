@@ -0,0 +1,88 @@
+"""Tests for moving a selection of cards at once."""
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import moves, queries, ranking
+from app.models import Base, BoardColumn, Card, Change
+
+
+def replay(cards, change):
+    """Apply a move the way the clients replay the change feed."""
+    data = change.data
+    for card in cards:
+        if card["id"] == change.entity_id:
+            continue
+        if data["from_column_id"] != data["column_id"] and card["column_id"] == data["from_column_id"] \
+                and card["position"] > data["from_position"]:
+            card["position"] -= 1
+        if card["column_id"] == data["column_id"] and card["position"] >= data["position"]:
+            card["position"] += 1
+    card = next(card for card in cards if card["id"] == change.entity_id)
+    card.update(column_id=data["column_id"], position=data["position"])
+
+
+def with_index_positions(cards):
+    """Number cards within their column, as rank mode serves them."""
+    seen = {}
+    for card in cards:
+        card["position"] = seen[card["column_id"]] = seen.get(card["column_id"], -1) + 1
+    return cards
+
+
+def column_orders(cards):
+    ordered = sorted(cards, key=lambda card: (card["column_id"], card["position"], card["id"]))
+    return [(card["column_id"], card["id"]) for card in ordered]
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_selection_moves_match_replayed_feed(monkeypatch, mode):
+    """Replaying the recorded moves gives the server's order, with the selection kept together."""
+    monkeypatch.setattr(ranking, "ORDERING_MODE", mode)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    generator = random.Random(7)
+    with Session(engine) as db:
+        db.add_all([BoardColumn(title=f"Column {i}", position=i) for i in range(3)])
+        ranks = ranking.spaced_ranks(10)
+        db.add_all([
+            Card(title=f"Card {column}-{i}", column_id=column, position=i, rank=ranks[i])
+            for column in (1, 2, 3) for i in range(10)
+        ])
+        db.commit()
+
+        for _ in range(30):
+            client = queries.card_rows(db, Card)
+            if mode == "rank":
+                with_index_positions(client)
+            selection = generator.sample(range(1, 31), generator.randint(1, 6))
+            column_id, position = generator.randint(1, 3), generator.choice([None, 0, 2, 50])
+            version = db.query(Change).count()
+
+            moved = moves.move_cards(db, Card, Change, selection, column_id, position)
+            db.commit()
+
+            for change in db.query(Change).order_by(Change.version).offset(version):
+                replay(client, change)
+            server = queries.card_rows(db, Card)
+            if mode == "rank":
+                with_index_positions(server)
+            assert column_orders(client) == column_orders(server)
+            if mode == "position":
+                assert sorted(client, key=lambda card: card["id"]) == sorted(server, key=lambda card: card["id"])
+
+            order = [card_id for column, card_id in column_orders(server) if column == column_id]
+            start = order.index(selection[0])
+            assert order[start:start + len(selection)] == selection
+            assert [card["id"] for card in moved] == selection
+            stays = len(order) - len(selection)
+            assert start == (stays if position is None else min(position, stays))
+
+
+def test_spaced_ranks_between_fit_one_gap():
+    """A block of ranks fits between two neighbours without growing with its size."""
+    block = ranking.spaced_ranks_between("a", "a1", 500)
+    assert block == sorted(block) and "a" < block[0] and block[-1] < "a1"
+    assert max(len(rank) for rank in block) <= 4
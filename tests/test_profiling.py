@@ -0,0 +1,48 @@
+"""Tests for the on-demand request profiler."""
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.profiling import ProfilingMiddleware
+
+
+def busy_work():
+    total = 0
+    for i in range(100_000):
+        total += i * i
+    return total
+
+
+def make_app(directory):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, token="secret", directory=str(directory), interval=0.0005)
+
+    @app.get("/sync")
+    def sync_endpoint():
+        return {"total": busy_work()}
+
+    @app.get("/async")
+    async def async_endpoint():
+        return {"total": busy_work()}
+
+    return app
+
+
+def test_profiles_only_with_token(tmp_path):
+    """Requests carrying the token are profiled, sync endpoints included; others are untouched."""
+    client = TestClient(make_app(tmp_path))
+
+    assert "x-profile-id" not in client.get("/sync").headers
+    assert "x-profile-id" not in client.get("/sync", headers={"X-Kanban-Profile": "wrong"}).headers
+    assert list(tmp_path.iterdir()) == []
+
+    for path, params, headers in (("/sync", None, {"X-Kanban-Profile": "secret"}),
+                                  ("/async", {"profile": "secret"}, None)):
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200 and response.json()["total"] == busy_work()
+        base = tmp_path / response.headers["x-profile-id"]
+        assert "busy_work" in (tmp_path / f"{base.name}.collapsed").read_text()
+        stats = pstats.Stats(str(tmp_path / f"{base.name}.pstats"))
+        assert any(name == "busy_work" for _, _, name in stats.stats)
+        assert (tmp_path / f"{base.name}.alloc.txt").read_text().startswith(f"# request: GET {path}")
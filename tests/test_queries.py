@@ -0,0 +1,29 @@
+"""Tests for the Core read query layer."""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import queries, ranking
+from app.models import Base, BoardColumn, Card
+from app.schemas import card_data
+
+
+def test_rows_match_orm_serialization(monkeypatch):
+    """Core rows carry the same data, in the same order, as the ORM path."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([BoardColumn(title="A", position=1), BoardColumn(title="B", position=0)])
+        db.add_all([
+            Card(title="Late", column_id=1, position=1, rank="b"),
+            Card(title="Early", column_id=1, position=0, rank="c"),
+            Card(title="Other", column_id=2, position=0, rank="a"),
+        ])
+        db.commit()
+
+        assert [c["title"] for c in queries.column_rows(db, BoardColumn)] == ["B", "A"]
+        orm = [card_data(c) for c in db.query(Card).order_by(Card.column_id, Card.position)]
+        assert queries.card_rows(db, Card) == orm
+        assert [c["title"] for c in queries.card_rows(db, Card, column_ids=[2])] == ["Other"]
+
+        monkeypatch.setattr(ranking, "ORDERING_MODE", "rank")
+        assert [c["title"] for c in queries.card_rows(db, Card)] == ["Late", "Early", "Other"]
@@ -0,0 +1,100 @@
+"""Query-plan regression tests: hot queries must not scan whole tables."""
+import re
+
+import pytest
+from fastapi import BackgroundTasks
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import api, changes, queries, ranking
+from app.cache import board_cache
+from app.database import run_migrations
+from app.models import Card
+from app.schemas import CardCreate, CardMove, ColumnCreate
+
+# A full table scan is reported as "SCAN <table>" without an index
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+HOT_TABLES = re.compile(r"\b(cards|changes)\b")
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    run_migrations(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def capture_statements(db, action):
+    """Run ``action`` and return the (sql, params) of the card and change queries it sent."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if HOT_TABLES.search(statement) and not executemany and not statement.startswith("INSERT"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def query_plan(db, statement, parameters):
+    connection = db.connection().connection.dbapi_connection
+    return [detail for *_, detail in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def full_scans(db, statement, parameters):
+    return [detail for detail in query_plan(db, statement, parameters) if FULL_SCAN.match(detail)]
+
+
+def populate(db):
+    columns = [api.create_column(ColumnCreate(title=f"Column {i}"), db).id for i in range(2)]
+    for i in range(6):
+        api.create_card(CardCreate(title=f"Card {i}", column_id=columns[i % 2]), db)
+    return columns
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_card_writes_use_indexes(db, monkeypatch, mode):
+    """Creating, moving and deleting cards only searches indexes."""
+    monkeypatch.setattr(ranking, "ORDERING_MODE", mode)
+    columns = populate(db)
+    card_id = db.query(Card.id).filter(Card.column_id == columns[0]).first().id
+
+    def writes():
+        api.create_card(CardCreate(title="New", column_id=columns[0]), db)
+        api.move_card(card_id, CardMove(column_id=columns[1], position=1), BackgroundTasks(), db)
+        api.move_card(card_id, CardMove(column_id=columns[1], position=0), BackgroundTasks(), db)
+        api.delete_card(card_id, db)
+        api.delete_column(columns[0], BackgroundTasks(), db)
+
+    statements = capture_statements(db, writes)
+    assert statements
+    for statement, parameters in statements:
+        assert not full_scans(db, statement, parameters), statement
+    if mode == "position":
+        # The neighbour shifts are range scans on the composite index
+        plans = [detail for statement in statements for detail in query_plan(db, *statement)]
+        assert any("ix_cards_column_id_position (column_id=? AND position>" in detail for detail in plans)
+    board_cache.invalidate()
+
+
+@pytest.mark.parametrize("mode", ["position", "rank"])
+def test_card_reads_use_indexes(db, monkeypatch, mode):
+    """Per-column card reads and the change feed search indexes."""
+    monkeypatch.setattr(ranking, "ORDERING_MODE", mode)
+    columns = populate(db)
+
+    def reads():
+        queries.card_rows(db, Card, column_ids=[columns[1]])
+        ranking.rank_for_position(db, Card, columns[1], 1)
+        api.get_changes(since=3, limit=changes.MAX_CHANGES, db=db)
+
+    for statement, parameters in capture_statements(db, reads):
+        assert not full_scans(db, statement, parameters), statement
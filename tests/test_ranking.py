@@ -0,0 +1,51 @@
+"""Tests for rank-based card ordering."""
+import random
+
+import pytest
+
+from app import ranking
+
+
+def test_rank_between_orders_strictly():
+    """Generated ranks sort between their bounds."""
+    assert ranking.rank_between(None, None)
+    assert "a" < ranking.rank_between("a", "b") < "b"
+    assert ranking.rank_between(None, "1") < "1"
+    assert ranking.rank_between("z", None) > "z"
+    assert "a" < ranking.rank_between("a", "a1") < "a1"
+
+
+def test_rank_between_rejects_bad_bounds():
+    """Bounds must be increasing."""
+    with pytest.raises(ValueError):
+        ranking.rank_between("b", "a")
+
+
+def test_repeated_inserts_keep_order():
+    """Random inserts into a list keep it sorted by rank."""
+    rng = random.Random(7)
+    ranks = []
+    for _ in range(500):
+        index = rng.randint(0, len(ranks))
+        before = ranks[index - 1] if index > 0 else None
+        after = ranks[index] if index < len(ranks) else None
+        ranks.insert(index, ranking.rank_between(before, after))
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+
+
+def test_spaced_ranks_are_sorted_and_short():
+    """Rebalanced ranks are increasing and leave room on both sides."""
+    ranks = ranking.spaced_ranks(1000)
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == 1000
+    assert max(len(r) for r in ranks) <= 3
+    assert ranking.rank_between(None, ranks[0]) < ranks[0]
+    assert ranking.rank_between(ranks[-1], None) > ranks[-1]
+
+
+def test_ranks_between():
+    """A block of ranks fits between two neighbours."""
+    block = ranking.ranks_between("a", "b", 20)
+    assert block == sorted(block)
+    assert all("a" < r < "b" for r in block)
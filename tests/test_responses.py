@@ -0,0 +1,29 @@
+"""Tests for the fast JSON responses."""
+import pytest
+from fastapi.responses import JSONResponse
+
+from app import responses
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_same_bytes_as_json_response(monkeypatch, use_orjson):
+    """The fast encoder produces the bytes JSONResponse would."""
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson is not installed")
+    content = [{"id": 1, "title": "Ünïcode – card", "description": None, "share": 0.25, "tags": ["a"]}]
+    assert responses.FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_streamed_array_matches_json_response():
+    """Chunks stream into the bytes one JSON array would have, and into NDJSON lines."""
+    chunks = [[{"id": 1}, {"id": 2}], [], [{"id": 3}]]
+    rows = [row for chunk in chunks for row in chunk]
+
+    array = responses.ArrayEncoder()
+    body = array.head() + b"".join(array.chunk(chunk) for chunk in chunks) + array.tail()
+    assert body == responses.FastJSONResponse(rows).body
+
+    ndjson = responses.NDJSONEncoder()
+    assert b"".join(ndjson.chunk(chunk) for chunk in chunks) == b'{"id":1}\n{"id":2}\n{"id":3}\n'
@@ -0,0 +1,71 @@
+"""Tests for the synthetic board seeder."""
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import queries, ranking, seed
+from app.models import Base, BoardColumn, Card, Change
+
+
+def seeded_rows(**options):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        result = seed.seed_board(db, BoardColumn, Card, Change, **options)
+        rows = db.execute(select(Card.title, Card.description, Card.column_id, Card.position, Card.color)).all()
+        versions = db.execute(select(Change.entity, Change.op)).all()
+    return result, rows, versions
+
+
+def test_same_seed_same_board():
+    """A seed always produces the same cards, committed in batches with one change each."""
+    result, rows, versions = seeded_rows(columns=3, cards_per_column=10, batch_size=4, commit_every=3)
+    assert result == {"columns": 3, "cards": 30, "tags": 0, "card_tags": 0}
+    assert seeded_rows(columns=3, cards_per_column=10, batch_size=4, commit_every=3)[1] == rows
+    assert seeded_rows(columns=3, cards_per_column=10, seed=1)[1] != rows
+    # 8 statements of at most 4 rows: commits after the 3rd and 6th, and at the end
+    assert versions == [("board", "seed")] * 3
+    assert [(column_id, position) for _, _, column_id, position, _ in rows] == [
+        (column_id, position) for column_id in (1, 2, 3) for position in range(10)
+    ]
+
+
+def test_description_sizes():
+    """Descriptions are empty or within half and one and a half times the drawn size."""
+    _, rows, _ = seeded_rows(columns=1, cards_per_column=200, description_sizes={0: 1, 100: 1})
+    lengths = [len(description) if description else 0 for _, description, *_ in rows]
+    assert 0 in lengths and all(length == 0 or 50 < length <= 150 for length in lengths)
+
+
+def test_description_longer_than_corpus():
+    """Sizes beyond the generated corpus still give descriptions of that size."""
+    _, rows, _ = seeded_rows(columns=1, cards_per_column=2, description_sizes={200_000: 1})
+    assert all(100_000 < len(description) <= 300_000 for _, description, *_ in rows)
+
+
+def test_rank_mode_keeps_positions_in_order(monkeypatch):
+    """In rank mode the seeded ranks list every column in position order."""
+    monkeypatch.setattr(ranking, "ORDERING_MODE", "rank")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        seed.seed_board(db, BoardColumn, Card, columns=2, cards_per_column=50)
+        cards = queries.card_rows(db, Card)
+    assert [(card["column_id"], card["position"]) for card in cards] == [
+        (column_id, position) for column_id in (1, 2) for position in range(50)
+    ]
+
+
+def test_appends_after_existing_columns():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(BoardColumn(title="To Do", position=0))
+        db.commit()
+        seed.seed_board(db, BoardColumn, Card, columns=2, cards_per_column=1)
+        assert db.execute(select(BoardColumn.position).order_by(BoardColumn.id)).scalars().all() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("text, sizes", [("0=1,80=3", {0: 1, 80: 3}), ("200", {200: 1})])
+def test_parse_sizes(text, sizes):
+    assert seed.parse_sizes(text) == sizes
@@ -0,0 +1,42 @@
+"""Tests for the slow-query log."""
+import json
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import queries, slow_queries
+from app.models import Base, BoardColumn, Card
+
+
+def test_slow_statements_logged_with_plan(tmp_path):
+    """Statements over the threshold are logged with their parameter types, caller and plan."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    Base.metadata.create_all(engine)
+    log = tmp_path / "slow.log"
+    slow_queries.install(engine, threshold_ms=0, path=str(log))
+    with Session(engine) as db:
+        db.add(BoardColumn(title="To Do", position=0))
+        db.flush()
+        db.add_all([Card(title="Secret title", column_id=1, position=i) for i in range(2)])
+        db.commit()
+        queries.card_rows(db, Card, column_ids=[1])
+        db.query(Card).filter(Card.title == "Secret title").all()
+    engine.dispose()
+
+    entries = [json.loads(line) for line in log.read_text().splitlines()]
+    listing = next(e for e in entries if e["caller"] and e["caller"].startswith("app.queries:fetch_dicts"))
+    assert listing["parameters"] == ["int"]
+    assert listing["route"] is None
+    assert any("USING INDEX ix_cards_column_id_position" in step for step in listing["plan"])
+    by_title = next(e for e in entries if "cards.title = ?" in e["statement"])
+    assert by_title["plan"] == ["SCAN cards"]
+    assert "Secret title" not in log.read_text()
+    inserts = [e for e in entries if e["statement"].startswith("INSERT INTO cards")]
+    assert inserts and all(e["duration_ms"] >= 0 for e in inserts)
+
+
+def test_off_without_threshold(tmp_path, monkeypatch):
+    """Nothing is installed unless a threshold is configured."""
+    monkeypatch.setattr(slow_queries, "THRESHOLD_MS", None)
+    assert slow_queries.install(create_engine("sqlite://"), path=str(tmp_path / "slow.log")) is None
+    assert not (tmp_path / "slow.log").exists()
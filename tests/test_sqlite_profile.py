@@ -0,0 +1,35 @@
+"""Tests for the SQLite connection profile."""
+import pytest
+from sqlalchemy import create_engine
+
+from app.sqlite_profile import apply_sqlite_profile, sqlite_pragmas
+
+
+def test_profile_applied_to_connections(tmp_path):
+    """Every new connection gets the profile's PRAGMAs."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    apply_sqlite_profile(engine, "wal")
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+    engine.dispose()
+
+
+def test_foreign_keys_with_any_profile(tmp_path):
+    """Foreign keys are enforced even with SQLite's default settings."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'default.db'}")
+    assert apply_sqlite_profile(engine, "default") == {}
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+    engine.dispose()
+
+
+def test_environment_overrides(monkeypatch):
+    """Single PRAGMAs can be overridden and unknown profiles are rejected."""
+    monkeypatch.setenv("KANBAN_SQLITE_SYNCHRONOUS", "FULL")
+    assert sqlite_pragmas("wal")["synchronous"] == "FULL"
+    assert sqlite_pragmas("default") == {"synchronous": "FULL"}
+    with pytest.raises(ValueError):
+        sqlite_pragmas("turbo")